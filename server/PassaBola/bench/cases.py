@@ -0,0 +1,859 @@
+# Benchmarks pontuais dos caminhos otimizados, sobre a base de bench/seed.py.
+# Uso: python -m bench.cases [caso ...] [--repeat 3] [--baseline resultado.json]
+#
+# Casos (sem argumentos, todos):
+#   export         GET /export/bulk/user_match (NDJSON) inteiro: linhas/s e pico de memória
+#   export_csv     GET /export/matches/players/csv inteiro: linhas/s e pico de memória alocada,
+#                  comparado ao das primeiras 2 * EXPORT_YIELD_PER linhas (deve ficar perto de 1x)
+#   close_signups  fechamento de um campeonato novo com --participants inscritas; falha acima de
+#                  --close-max-ms (padrão 1000, para o mata-mata padrão)
+#   join_race      --joins inscrições simultâneas num campeonato de --capacity vagas: aceitas
+#                  exatamente --capacity, sem 500 (com --waitlist, as demais vão para a fila)
+#   login_storm    --logins logins simultâneos enquanto outras conexões leem um campeonato:
+#                  latência da leitura com e sem a rajada, 429s e pico de conexões do pool
+#   keyset         mesma página por OFFSET (page=N) e por cursor (after), na 2ª página, no meio e
+#                  na última, para campeonatos e jogos: latência de cada modo
+#   async_reads    as leituras quentes com --clients clientes simultâneos, nas rotas síncronas
+#                  (Session no threadpool) e nas de routers/async_reads.py (AsyncSession): req/s e p50/p99
+#   stats          GET /stats/recent (daily_stats) contra o GROUP BY em matches/user_match
+#   serialize      página de 100 jogos: response_model (dump_json) contra jsonable_encoder
+#   sse_idle       --subscribers conexões de push ociosas no broker: memória e entrega
+#   metrics        custo do MetricsMiddleware por requisição e dos hooks SQL por statement
+#   auth           AuthMiddleware + get_current_principal por requisição, com os caches de token e
+#                  de principal frios (JWT verificado e usuária lida do banco) e quentes, contra um
+#                  app sem autenticação
+# As requisições vão direto ao app ASGI (sem cliente HTTP, que guardaria o corpo inteiro):
+# o corpo é contado e descartado à medida que chega. close_signups e join_race escrevem na
+# base (criam um campeonato por repetição); os demais só leem. Cada métrica é a mediana de --repeat.
+import argparse
+import asyncio
+import json
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import timedelta
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlencode
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import case, create_engine, event, func, insert, select, text
+
+from bench import report
+from core.security import create_access_token
+from crud import championship as championship_crud
+from crud import match as match_crud
+from crud import stats as stats_crud
+from crud.pagination import encode_cursor
+from db.database import SessionLocal, engine, utcnow
+from db.loading import GAME_COLUMNS
+from models.championship import Championship
+from models.match import Match, MatchStatus
+from models.user import User
+from models.user_championship import UserChampionship
+from models.user_match import UserMatch
+from schemas.match import GameListResponse
+
+
+class Response:
+    __slots__ = ("status", "bytes", "lines", "body")
+
+    def __init__(self):
+        self.status = 0
+        self.bytes = 0
+        self.lines = 0
+        self.body = b""
+
+
+async def asgi_request(app, method: str, path: str, headers: Optional[dict] = None, params: Optional[dict] = None,
+                       json_body=None, keep_body: bool = False) -> Response:
+    body = json.dumps(json_body).encode() if json_body is not None else b""
+    raw_headers = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    if body:
+        raw_headers += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": urlencode(params or {}, doseq=True).encode(),
+        "root_path": "",
+        "headers": raw_headers,
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # Sem desconexão: a resposta termina quando o app termina
+        await asyncio.Event().wait()
+
+    response = Response()
+    chunks = []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response.status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunk = message.get("body", b"")
+            response.bytes += len(chunk)
+            response.lines += chunk.count(b"\n")
+            if keep_body:
+                chunks.append(chunk)
+
+    await app(scope, receive, send)
+    response.body = b"".join(chunks)
+    return response
+
+
+def _admin_headers() -> dict:
+    with SessionLocal() as db:
+        email = db.execute(select(User.email).where(User.admin.is_(True)).order_by(User.id).limit(1)).scalar_one_or_none()
+    if email is None:
+        raise SystemExit("Nenhuma admin na base: rode python -m bench.seed antes")
+    return {"Authorization": f"Bearer {create_access_token(email)}"}
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(engine, "after_cursor_execute", self)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(engine, "after_cursor_execute", self)
+
+
+def _peak_rss_bytes() -> int:
+    # ru_maxrss em KiB no Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def case_export(app, args) -> dict:
+    headers = _admin_headers()
+    peak_before = _peak_rss_bytes()
+    start = time.perf_counter()
+    response = asyncio.run(asgi_request(app, "GET", "/export/bulk/user_match", headers))
+    seconds = time.perf_counter() - start
+    if response.status != 200:
+        raise RuntimeError(f"export respondeu {response.status}")
+    return {
+        "rows": response.lines,
+        "bytes": response.bytes,
+        "total_s": round(seconds, 3),
+        "rows_per_s": round(response.lines / seconds, 1),
+        # Só cresce se a exportação passar do pico anterior do processo
+        "peak_rss_growth_bytes": max(0, _peak_rss_bytes() - peak_before),
+    }
+
+
+def _csv_stream_peak(stmt) -> tuple[int, int]:
+    # Gera o CSV pelo mesmo gerador da rota, descartando os blocos: (bytes, pico alocado)
+    from routers import export
+
+    header = ["Match ID", "Championship ID", "Scheduled At"] + export.PLAYER_HEADER
+    tracemalloc.start()
+    try:
+        size = sum(len(chunk) for chunk in export._stream_csv(header, stmt, export._match_player_row))
+        return size, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def case_export_csv(app, args) -> dict:
+    from core.config import settings
+    from routers import export
+
+    headers = _admin_headers()
+    start = time.perf_counter()
+    response = asyncio.run(asgi_request(app, "GET", "/export/matches/players/csv", headers))
+    seconds = time.perf_counter() - start
+    if response.status != 200:
+        raise RuntimeError(f"export_csv respondeu {response.status}")
+
+    # Pico com tracemalloc (mais lento, fora do tempo): a exportação inteira contra as primeiras
+    # 2 * EXPORT_YIELD_PER linhas. Em streaming, o pico depende do lote, não do total.
+    stmt = export._match_players_query().order_by(Match.id, User.id)
+    head_stmt = stmt.limit(2 * settings.EXPORT_YIELD_PER)
+    _csv_stream_peak(head_stmt)
+    head_bytes, head_peak = _csv_stream_peak(head_stmt)
+    all_bytes, all_peak = _csv_stream_peak(stmt)
+    return {
+        "rows": response.lines - 1,
+        "bytes": response.bytes,
+        "total_s": round(seconds, 3),
+        "rows_per_s": round((response.lines - 1) / seconds, 1),
+        "head_bytes": head_bytes,
+        "head_peak_bytes": head_peak,
+        "peak_bytes": all_peak,
+        "peak_growth": round(all_peak / head_peak, 2),
+    }
+
+
+def case_close_signups(app, args) -> dict:
+    headers = _admin_headers()
+    with SessionLocal() as db:
+        user_ids = db.execute(
+            select(User.id).where(User.admin.is_not(True)).order_by(User.id).limit(args.participants)
+        ).scalars().all()
+        if len(user_ids) < args.participants:
+            raise SystemExit(f"A base tem só {len(user_ids)} usuárias para --participants {args.participants}")
+        championship_id = db.execute(
+            insert(Championship).values(
+                name="Bench close_signups", number_players=args.players, is_closed=False,
+                participants_count=len(user_ids), updated_at=utcnow(),
+            ).returning(Championship.id)
+        ).scalar_one()
+        db.execute(insert(UserChampionship), [
+            {"user_id": user_id, "championship_id": championship_id, "updated_at": utcnow()} for user_id in user_ids
+        ])
+        db.commit()
+
+    with StatementCounter() as statements:
+        start = time.perf_counter()
+        response = asyncio.run(asgi_request(
+            app, "POST", f"/championships/{championship_id}/close_signups", headers,
+            json_body={"format": args.close_format}, keep_body=True,
+        ))
+        seconds = time.perf_counter() - start
+    if response.status != 200:
+        raise RuntimeError(f"close_signups respondeu {response.status}: {response.body[:200]!r}")
+    with SessionLocal() as db:
+        rosters = db.execute(
+            select(func.count()).select_from(UserMatch).join(Match, Match.id == UserMatch.match_id)
+            .where(Match.championship_id == championship_id)
+        ).scalar_one()
+    if seconds * 1000 > args.close_max_ms:
+        raise RuntimeError(
+            f"close_signups ({args.close_format}): {seconds * 1000:.0f} ms, acima de --close-max-ms {args.close_max_ms}"
+        )
+    return {
+        "participants": len(user_ids),
+        "games": json.loads(response.body)["created_games"],
+        "user_match_rows": rosters,
+        "statements": statements.count,
+        "total_ms": round(seconds * 1000, 1),
+    }
+
+
+async def _join_race(app, championship_id: int, tokens: list[str], waitlist: bool) -> list[int]:
+    params = {"waitlist": "true"} if waitlist else None
+    responses = await asyncio.gather(*(
+        asgi_request(app, "POST", f"/championships/{championship_id}/join", {"Authorization": f"Bearer {token}"}, params)
+        for token in tokens
+    ), return_exceptions=True)
+    # O app relança a exceção depois de enviar o 500
+    return [500 if isinstance(r, Exception) else r.status for r in responses]
+
+
+def case_join_race(app, args) -> dict:
+    with SessionLocal() as db:
+        emails = db.execute(
+            select(User.email).where(User.admin.is_not(True)).order_by(User.id).limit(args.joins)
+        ).scalars().all()
+        if len(emails) < args.joins:
+            raise SystemExit(f"A base tem só {len(emails)} usuárias para --joins {args.joins}")
+        championship_id = db.execute(
+            insert(Championship).values(
+                name="Bench join_race", number_players=1, is_closed=False, max_participants=args.capacity,
+                updated_at=utcnow(),
+            ).returning(Championship.id)
+        ).scalar_one()
+        db.commit()
+    tokens = [create_access_token(email) for email in emails]
+
+    start = time.perf_counter()
+    statuses = asyncio.run(_join_race(app, championship_id, tokens, args.waitlist))
+    seconds = time.perf_counter() - start
+
+    with SessionLocal() as db:
+        count = db.execute(select(Championship.participants_count).where(Championship.id == championship_id)).scalar_one()
+        links = db.execute(
+            select(func.count()).select_from(UserChampionship).where(UserChampionship.championship_id == championship_id)
+        ).scalar_one()
+    accepted = statuses.count(200)
+    # 503 (lock do banco além do limite, com Retry-After) é recusa controlada; erro é o resto dos 5xx
+    server_errors = sum(1 for s in statuses if s >= 500 and s != 503)
+    if accepted != args.capacity or links != args.capacity or count != args.capacity or server_errors:
+        raise RuntimeError(
+            f"join_race: {accepted} aceitas, {links} vínculos, participants_count={count}, {server_errors} erros 500 "
+            f"(esperado {args.capacity}, nenhum 500)"
+        )
+    return {
+        "joins": len(statuses),
+        "accepted": accepted,
+        "waitlisted": statuses.count(202),
+        "full": statuses.count(409),
+        "busy": statuses.count(503),
+        "server_errors": server_errors,
+        "total_ms": round(seconds * 1000, 1),
+        "joins_per_s": round(len(statuses) / seconds, 1),
+    }
+
+
+async def _probe(app, path: str, headers: dict, stop: asyncio.Event, latencies: list, statuses: list) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await asgi_request(app, "GET", path, headers)
+        latencies.append(time.perf_counter() - start)
+        statuses.append(response.status)
+
+
+async def _sample_pool(stop: asyncio.Event, samples: list) -> None:
+    while not stop.is_set():
+        samples.append(engine.pool.checkedout())
+        await asyncio.sleep(0.005)
+
+
+async def _login_storm(app, path: str, headers: dict, emails: list[str], password: str, probes: int) -> dict:
+    # Leituras sem carga, depois as mesmas leituras durante a rajada de logins
+    stop = asyncio.Event()
+    quiet, quiet_statuses = [], []
+    tasks = [asyncio.create_task(_probe(app, path, headers, stop, quiet, quiet_statuses)) for _ in range(probes)]
+    await asyncio.sleep(1)
+    stop.set()
+    await asyncio.gather(*tasks)
+
+    stop = asyncio.Event()
+    storm, storm_statuses, pool = [], [], []
+    tasks = [asyncio.create_task(_probe(app, path, headers, stop, storm, storm_statuses)) for _ in range(probes)]
+    tasks.append(asyncio.create_task(_sample_pool(stop, pool)))
+    start = time.perf_counter()
+    logins = await asyncio.gather(*(
+        asgi_request(app, "POST", "/auth/login", json_body={"email": email, "password": password})
+        for email in emails
+    ), return_exceptions=True)
+    seconds = time.perf_counter() - start
+    stop.set()
+    await asyncio.gather(*tasks)
+
+    statuses = [500 if isinstance(r, Exception) else r.status for r in logins]
+    quiet_ms = sorted(v * 1000 for v in quiet)
+    storm_ms = sorted(v * 1000 for v in storm)
+    return {
+        "logins": len(statuses),
+        "ok": statuses.count(200),
+        "throttled": statuses.count(429),
+        "errors": sum(1 for s in statuses if s not in (200, 429)),
+        "logins_per_s": round(len(statuses) / seconds, 1),
+        "read_errors": sum(1 for s in quiet_statuses + storm_statuses if s != 200),
+        "quiet_p50_ms": round(report.percentile(quiet_ms, 50), 2),
+        "quiet_p99_ms": round(report.percentile(quiet_ms, 99), 2),
+        "storm_p50_ms": round(report.percentile(storm_ms, 50), 2),
+        "storm_p99_ms": round(report.percentile(storm_ms, 99), 2),
+        "pool_checked_out_max": max(pool, default=0),
+    }
+
+
+def case_login_storm(app, args) -> dict:
+    from bench.seed import BENCH_PASSWORD
+
+    headers = _admin_headers()
+    with SessionLocal() as db:
+        emails = db.execute(
+            select(User.email).where(User.admin.is_not(True)).order_by(User.id).limit(args.logins)
+        ).scalars().all()
+        championship_id = db.execute(select(func.min(Championship.id))).scalar_one()
+    if championship_id is None or len(emails) < args.logins:
+        raise SystemExit(f"A base precisa de um campeonato e de {args.logins} usuárias para --logins")
+    result = asyncio.run(_login_storm(
+        app, f"/championships/{championship_id}", headers, emails, BENCH_PASSWORD, args.probes,
+    ))
+    if result["errors"] or result["read_errors"]:
+        raise RuntimeError(f"login_storm: {result['errors']} logins e {result['read_errors']} leituras com erro")
+    return result
+
+
+def _median_ms(fn, n: int = 20) -> float:
+    timings = []
+    for _ in range(n):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return round(statistics.median(timings) * 1000, 3)
+
+
+def case_keyset(app, args) -> dict:
+    # Os mesmos builders das rotas (include_total=false, sem ETag): só o custo de chegar à página.
+    # O cursor da página N é a chave do último item da página N - 1, como o next_cursor.
+    page_size = 20
+    games = select(*GAME_COLUMNS)
+    listings = {
+        "championships": (
+            lambda page: championship_crud.championship_page_query(None, None, page, page_size, with_total=False),
+            lambda after: championship_crud.championship_keyset_query(None, None, after, page_size),
+            select(func.count()).select_from(Championship),
+            championship_crud.championship_cursor_key,
+        ),
+        "games": (
+            lambda page: match_crud.page_query(games, page, page_size),
+            lambda after: match_crud.keyset_query(games, after, page_size),
+            match_crud.count_query(games),
+            match_crud.game_cursor_key,
+        ),
+    }
+    result = {}
+    with SessionLocal() as db:
+        for name, (offset_query, keyset_query, count_query, cursor_key) in listings.items():
+            last = max(2, -(-db.execute(count_query).scalar_one() // page_size))
+            result[f"{name}_pages"] = last
+            for label, page in (("page2", 2), ("middle", max(2, last // 2)), ("last", last)):
+                after = encode_cursor(cursor_key(db.execute(offset_query(page - 1)).all()[-1]))
+                if db.execute(offset_query(page)).all() != db.execute(keyset_query(after)).all():
+                    raise RuntimeError(f"keyset: {name} página {page} difere entre OFFSET e cursor")
+                result[f"{name}_{label}_offset_ms"] = _median_ms(lambda: db.execute(offset_query(page)).all())
+                result[f"{name}_{label}_cursor_ms"] = _median_ms(lambda: db.execute(keyset_query(after)).all())
+    return result
+
+
+async def _closed_loop(app, requests: list, headers: dict, clients: int) -> dict:
+    # clients corrotinas consomem a mesma lista de requisições; cada uma espera a resposta anterior
+    pending = iter(requests)
+    latencies, statuses = [], []
+
+    async def client() -> None:
+        for path, params in pending:
+            start = time.perf_counter()
+            try:
+                status = (await asgi_request(app, "GET", path, headers, params=params)).status
+            except Exception:
+                # Sem servidor na frente, o erro da rota (ex.: timeout do pool) chega até aqui
+                status = 500
+            latencies.append(time.perf_counter() - start)
+            statuses.append(status)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    summary = report.latency_summary(latencies, time.perf_counter() - start)
+    summary["errors"] = sum(1 for s in statuses if s != 200)
+    return summary
+
+
+async def _async_reads(sync_app, async_app, requests: list, headers: dict, clients: int, async_engine) -> dict:
+    try:
+        result = {}
+        for mode, app in (("sync", sync_app), ("async", async_app)):
+            await _closed_loop(app, requests[:clients], headers, clients)  # aquece pools e caches
+            summary = await _closed_loop(app, requests, headers, clients)
+            result.update({f"{mode}_{k}": v for k, v in summary.items() if k != "requests"})
+        return result
+    finally:
+        await async_engine.dispose()
+
+
+def case_async_reads(app, args) -> dict:
+    # Dois apps só com as rotas de leitura, um com cada implementação, sem o cache de corpos
+    # (core/http_cache.py): cada requisição vai ao banco. A autenticação é a mesma nos dois.
+    from fastapi import FastAPI
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    from core import http_cache
+    from core.config import settings
+    from db.database import create_async_db_engine, get_async_db
+    from routers import async_reads
+    from routers import championship as championship_router
+    from routers import match as match_router
+
+    with SessionLocal() as db:
+        user_id = db.execute(select(UserMatch.user_id).order_by(UserMatch.user_id).limit(1)).scalar_one_or_none()
+        championship_ids = db.execute(select(Championship.id).order_by(Championship.id).limit(50)).scalars().all()
+        game_ids = db.execute(select(Match.id).order_by(Match.id).limit(50)).scalars().all()
+        email = db.get(User, user_id).email if user_id is not None else None
+    if email is None or not championship_ids:
+        raise SystemExit("A base precisa de jogos com jogadoras: rode python -m bench.seed antes")
+    headers = {"Authorization": f"Bearer {create_access_token(email)}"}
+
+    mix = [
+        ("/championships", {"page": 1 + i % 10, "page_size": 20}) for i in range(10)
+    ] + [
+        (f"/championships/{cid}/games", {"page_size": 20}) for cid in championship_ids[:10]
+    ] + [
+        (f"/games/{gid}", {}) for gid in game_ids[:10]
+    ] + [
+        ("/me/games", {"status": status, "page_size": 20}) for status in ("upcoming", "completed") * 5
+    ]
+    requests = [mix[i % len(mix)] for i in range(args.reads)]
+
+    sync_app = FastAPI()
+    sync_app.include_router(championship_router.router)
+    sync_app.include_router(match_router.router)
+
+    async_engine = create_async_db_engine(settings.DATABASE_URL)
+    sessions = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    async def session():
+        async with sessions() as db:
+            yield db
+
+    async_app = FastAPI()
+    async_app.include_router(async_reads.router)
+    async_app.dependency_overrides[get_async_db] = session
+
+    body_cache, http_cache.body_cache = http_cache.body_cache, None
+    try:
+        result = asyncio.run(_async_reads(sync_app, async_app, requests, headers, args.clients, async_engine))
+    finally:
+        http_cache.body_cache = body_cache
+    if result["sync_errors"] or result["async_errors"]:
+        raise RuntimeError(f"async_reads: {result['sync_errors']} erros síncronos e {result['async_errors']} assíncronos")
+    result["clients"] = args.clients
+    return result
+
+
+def _naive_recent(db, days: int) -> list:
+    # O que /stats/recent calcularia sem os agregados: varre os jogos e os elencos da janela
+    day = stats_crud._day(db, Match.scheduled_at).label("day")
+    start = utcnow() - timedelta(days=days)
+    finished = Match.status == MatchStatus.finished
+    roster = select(UserMatch.match_id, func.count().label("players")).group_by(UserMatch.match_id).subquery()
+    return db.execute(
+        select(
+            day,
+            func.count(),
+            func.sum(case((finished, 1), else_=0)),
+            func.sum(case((finished, func.coalesce(Match.score_home, 0) + func.coalesce(Match.score_away, 0)), else_=0)),
+            func.sum(case((finished, func.coalesce(roster.c.players, 0)), else_=0)),
+        )
+        .outerjoin(roster, roster.c.match_id == Match.id)
+        .where(Match.scheduled_at >= start, Match.scheduled_at <= utcnow(), Match.status != MatchStatus.canceled)
+        .group_by(day)
+    ).all()
+
+
+def case_stats(app, args) -> dict:
+    headers = _admin_headers()
+    start = time.perf_counter()
+    response = asyncio.run(asgi_request(app, "GET", "/stats/recent", headers, params={"days": args.days}))
+    endpoint = time.perf_counter() - start
+    if response.status != 200:
+        raise RuntimeError(f"/stats/recent respondeu {response.status}")
+
+    with SessionLocal() as db:
+        start = time.perf_counter()
+        rows = _naive_recent(db, args.days)
+        naive = time.perf_counter() - start
+        user_match_rows = db.execute(select(func.count()).select_from(UserMatch)).scalar_one()
+    return {
+        "days": args.days,
+        "user_match_rows": user_match_rows,
+        "naive_days": len(rows),
+        "endpoint_ms": round(endpoint * 1000, 2),
+        "naive_group_by_ms": round(naive * 1000, 2),
+        "speedup": round(naive / endpoint, 1) if endpoint else None,
+    }
+
+
+def case_serialize(app, args) -> dict:
+    with SessionLocal() as db:
+        rows = db.execute(select(*GAME_COLUMNS).order_by(Match.id).limit(100)).all()
+    if not rows:
+        raise SystemExit("Nenhum jogo na base: rode python -m bench.seed antes")
+
+    def declared() -> bytes:
+        # Caminho atual: response_model, serializado pelo pydantic-core
+        return GameListResponse(
+            items=[match_crud.to_game_out(m) for m in rows], page=1, page_size=100, total=len(rows), next_cursor=None,
+        ).model_dump_json().encode()
+
+    def generic() -> bytes:
+        # Caminho genérico do FastAPI sem response_model: dicts, jsonable_encoder e json.dumps
+        payload = {
+            "items": [match_crud.game_fields(m) for m in rows],
+            "page": 1, "page_size": 100, "total": len(rows), "next_cursor": None,
+        }
+        return json.dumps(jsonable_encoder(payload), separators=(",", ":")).encode()
+
+    assert json.loads(declared()) == json.loads(generic())
+    n = 200
+    timings = {}
+    for name, fn in (("declared", declared), ("generic", generic)):
+        start = time.perf_counter()
+        for _ in range(n):
+            fn()
+        timings[name] = (time.perf_counter() - start) / n
+    return {
+        "items": len(rows),
+        "response_model_ms": round(timings["declared"] * 1000, 3),
+        "jsonable_encoder_ms": round(timings["generic"] * 1000, 3),
+        "speedup": round(timings["generic"] / timings["declared"], 2),
+    }
+
+
+async def _sse_idle(n: int) -> dict:
+    from core.events import Broker
+
+    broker = Broker(queue_size=64, replay_size=1000, max_subscribers=n)
+    received = 0
+    done = asyncio.Event()
+    target = n
+
+    async def connection(sub):
+        nonlocal received
+        try:
+            while True:
+                events = await sub.next_events(3600)
+                if events:
+                    received += len(events)
+                    if received >= target:
+                        done.set()
+        finally:
+            broker.unsubscribe(sub)
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    # Cada conexão segue um campeonato próprio (1 em 100) e um tópico comum
+    subs = [broker.subscribe([f"championship:{i % 100}", "championship:all"]) for i in range(n)]
+    tasks = [asyncio.create_task(connection(sub)) for sub in subs]
+    await asyncio.sleep(0)
+    subscribe = time.perf_counter() - start
+    per_subscriber = (tracemalloc.get_traced_memory()[0] - before) / n
+    tracemalloc.stop()
+
+    # Entrega para todas (um tópico comum) e para 1% (um campeonato)
+    start = time.perf_counter()
+    broker.publish("game.score", {"game_id": 1}, ["championship:all"])
+    await asyncio.wait_for(done.wait(), 60)
+    broadcast = time.perf_counter() - start
+
+    target = received + n // 100
+    done.clear()
+    start = time.perf_counter()
+    broker.publish("game.score", {"game_id": 2}, ["championship:0"])
+    await asyncio.wait_for(done.wait(), 60)
+    targeted = time.perf_counter() - start
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return {
+        "subscribers": n,
+        "subscribe_s": round(subscribe, 3),
+        "per_subscriber_bytes": round(per_subscriber),
+        "broadcast_ms": round(broadcast * 1000, 2),
+        "targeted_ms": round(targeted * 1000, 3),
+    }
+
+
+def case_sse_idle(app, args) -> dict:
+    return asyncio.run(_sse_idle(args.subscribers))
+
+
+async def _middleware_overhead(n: int) -> float:
+    from core.metrics import MetricsMiddleware
+
+    class Route:
+        path = "/games/{game_id}"
+
+    async def bare(scope, receive, send):
+        scope["route"] = Route
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    async def send(message):
+        pass
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def timed(target) -> float:
+        start = time.perf_counter()
+        for _ in range(n):
+            await target({"type": "http", "method": "GET", "path": "/games/1"}, receive, send)
+        return (time.perf_counter() - start) / n
+
+    wrapped = MetricsMiddleware(bare)
+    return await timed(wrapped) - await timed(bare)
+
+
+def _statement_overhead(n: int) -> float:
+    from core.metrics import instrument_engine
+
+    def timed(eng) -> float:
+        with eng.connect() as conn:
+            stmt = text("SELECT 1")
+            start = time.perf_counter()
+            for _ in range(n):
+                conn.execute(stmt)
+            return (time.perf_counter() - start) / n
+
+    plain = create_engine("sqlite://")
+    instrumented = create_engine("sqlite://")
+    instrument_engine(instrumented)
+    return timed(instrumented) - timed(plain)
+
+
+async def _auth_overhead(email: str, n: int, cold: bool) -> tuple[float, float]:
+    # Tempo por requisição de AuthMiddleware + get_current_principal (token e principal em
+    # cache ou, com cold, os dois caches vazios a cada requisição) e de um app sem autenticação
+    from starlette.requests import Request
+
+    from core.dependencies import get_current_principal, principal_cache
+    from core.security import verified_token_cache
+    from middleware.auth_middleware import AuthMiddleware
+
+    async def endpoint(scope, receive, send, authenticated: bool):
+        db = SessionLocal()
+        try:
+            if authenticated:
+                get_current_principal(Request(scope, receive), db)
+        finally:
+            db.close()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    async def bare(scope, receive, send):
+        await endpoint(scope, receive, send, authenticated=False)
+
+    async def protected(scope, receive, send):
+        await endpoint(scope, receive, send, authenticated=True)
+
+    statuses = []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    headers = [(b"authorization", f"Bearer {create_access_token(email)}".encode())]
+
+    async def timed(target, clear: bool) -> float:
+        elapsed = 0.0
+        for _ in range(n):
+            if clear:
+                verified_token_cache.clear()
+                principal_cache.clear()
+            scope = {"type": "http", "method": "GET", "path": "/championships/1", "headers": headers, "query_string": b""}
+            start = time.perf_counter()
+            await target(scope, receive, send)
+            elapsed += time.perf_counter() - start
+        return elapsed / n
+
+    wrapped = AuthMiddleware(protected, protected_prefixes=["/"], exclude_prefixes=["/auth"])
+    await timed(wrapped, clear=False)  # aquece os caches e o statement do principal
+    authenticated = await timed(wrapped, clear=cold)
+    baseline = await timed(bare, clear=False)
+    if set(statuses) != {200}:
+        raise RuntimeError(f"auth: respostas {sorted(set(statuses))}, esperado só 200")
+    return authenticated, baseline
+
+
+def case_auth(app, args) -> dict:
+    with SessionLocal() as db:
+        email = db.execute(select(User.email).order_by(User.id).limit(1)).scalar_one()
+    cold, cold_baseline = asyncio.run(_auth_overhead(email, 2_000, cold=True))
+    warm, warm_baseline = asyncio.run(_auth_overhead(email, 20_000, cold=False))
+    return {
+        "baseline_us": round(warm_baseline * 1e6, 2),
+        "cold_us": round(cold * 1e6, 2),
+        "warm_us": round(warm * 1e6, 2),
+        "cold_overhead_us": round((cold - cold_baseline) * 1e6, 2),
+        "warm_overhead_us": round((warm - warm_baseline) * 1e6, 2),
+    }
+
+
+def case_metrics(app, args) -> dict:
+    return {
+        "middleware_us": round(asyncio.run(_middleware_overhead(50_000)) * 1e6, 2),
+        "statement_hooks_us": round(_statement_overhead(50_000) * 1e6, 2),
+    }
+
+
+CASES = {
+    "export": case_export,
+    "export_csv": case_export_csv,
+    "close_signups": case_close_signups,
+    "join_race": case_join_race,
+    "login_storm": case_login_storm,
+    "keyset": case_keyset,
+    "async_reads": case_async_reads,
+    "stats": case_stats,
+    "serialize": case_serialize,
+    "sse_idle": case_sse_idle,
+    "metrics": case_metrics,
+    "auth": case_auth,
+}
+
+
+def _median(runs: list[dict]) -> dict:
+    merged = {}
+    for key in runs[0]:
+        values = [run[key] for run in runs]
+        if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+            # median_low: com número par de execuções, um valor medido (e do mesmo tipo)
+            merged[key] = statistics.median_low(values)
+        else:
+            merged[key] = values[-1]
+    return merged
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.cases", description="Benchmarks pontuais do Passa Bola")
+    parser.add_argument("cases", nargs="*", choices=list(CASES), metavar="caso", help=", ".join(CASES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--participants", type=int, default=2000, help="close_signups: inscritas")
+    parser.add_argument("--players", type=int, default=20, help="close_signups: jogadoras por time")
+    parser.add_argument("--close-format", choices=("round_robin", "knockout"), default="knockout")
+    parser.add_argument("--close-max-ms", type=float, default=1000, help="close_signups: tempo máximo do fechamento")
+    parser.add_argument("--joins", type=int, default=1000, help="join_race: inscrições simultâneas")
+    parser.add_argument("--capacity", type=int, default=100, help="join_race: vagas (max_participants)")
+    parser.add_argument("--waitlist", action="store_true", help="join_race: excedentes entram na fila de espera")
+    parser.add_argument("--logins", type=int, default=200, help="login_storm: logins simultâneos")
+    parser.add_argument("--probes", type=int, default=4, help="login_storm: conexões lendo durante a rajada")
+    parser.add_argument("--clients", type=int, default=500, help="async_reads: clientes simultâneos")
+    parser.add_argument("--reads", type=int, default=10_000, help="async_reads: requisições por modo")
+    parser.add_argument("--days", type=int, default=30, help="stats: janela em dias")
+    parser.add_argument("--subscribers", type=int, default=10_000, help="sse_idle: conexões ociosas")
+    parser.add_argument("--name", default="cases")
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--baseline", type=Path, default=None, help="Resultado anterior para comparar")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Piora tolerada na comparação (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    import main as app_module
+
+    items = {}
+    for name in args.cases or list(CASES):
+        runs = []
+        for i in range(args.repeat):
+            print(f"{name} ({i + 1}/{args.repeat})", flush=True)
+            runs.append(CASES[name](app_module.app, args))
+        items[name] = _median(runs)
+
+    params = {
+        "repeat": args.repeat,
+        "participants": args.participants,
+        "players": args.players,
+        "close_format": args.close_format,
+        "close_max_ms": args.close_max_ms,
+        "joins": args.joins,
+        "capacity": args.capacity,
+        "waitlist": args.waitlist,
+        "logins": args.logins,
+        "probes": args.probes,
+        "clients": args.clients,
+        "reads": args.reads,
+        "days": args.days,
+        "subscribers": args.subscribers,
+    }
+    return report.finish("cases", args.name, items, params, None, args.output, args.baseline, args.tolerance)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,320 @@
+# Teste de carga com uma mistura de cenários sobre a base de bench/seed.py.
+# Uso: python -m bench.load [--target asgi|uvicorn] [--url URL] [--concurrency 20]
+#      [--duration 30] [--mix browse=35,me_games=30,...] [--baseline resultado.json]
+#
+# asgi: o app roda no próprio processo (httpx.ASGITransport), sem rede; uvicorn: o script
+# sobe `uvicorn main:app` local (--workers) e mede por TCP; --url usa um servidor já no
+# ar, que precisa apontar para a mesma base do manifesto. Cada usuária virtual faz login
+# uma vez e repete cenários sorteados pelos pesos de --mix, em laço fechado, por
+# --duration segundos depois de --warmup. Status fora dos esperados contam como erro.
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+from bench import report
+from bench.seed import DEFAULT_MANIFEST
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+DEFAULT_MIX = "browse=35,me_games=30,join=10,login=8,score=5,signup=2,standings=10"
+
+COLUMNS = ["requests", "throughput_per_s", "p50_ms", "p95_ms", "p99_ms", "max_ms", "errors"]
+
+
+class Recorder:
+    def __init__(self):
+        self.recording = False
+        self.latencies: dict[str, list[float]] = {}
+        self.statuses: dict[str, Counter] = {}
+        self.errors: Counter = Counter()
+        self.samples: dict[str, str] = {}
+
+    def add(self, label: str, seconds: float, status: int, ok: bool, detail: str = "") -> None:
+        if not self.recording:
+            return
+        self.latencies.setdefault(label, []).append(seconds)
+        self.statuses.setdefault(label, Counter())[str(status)] += 1
+        if not ok:
+            self.errors[label] += 1
+            self.samples.setdefault(label, detail[:200])
+
+
+class VirtualUser:
+    def __init__(self, n: int, client: httpx.AsyncClient, recorder: Recorder, manifest: dict,
+                 rng: random.Random, run_id: str):
+        self.n = n
+        self.client = client
+        self.recorder = recorder
+        self.manifest = manifest
+        self.rng = rng
+        self.run_id = run_id
+        self.headers: dict = {}
+        self.admin_headers: dict = {}
+        self.signups = itertools.count()
+
+    async def call(self, label: str, method: str, url: str, expected=(200,), **kwargs) -> Optional[httpx.Response]:
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError as exc:
+            self.recorder.add(label, time.perf_counter() - start, 0, False, repr(exc))
+            return None
+        # O corpo já foi lido: a latência inclui a resposta inteira
+        elapsed = time.perf_counter() - start
+        ok = response.status_code in expected
+        self.recorder.add(label, elapsed, response.status_code, ok, "" if ok else response.text)
+        return response
+
+    def random_email(self) -> str:
+        # A usuária 1 é a admin
+        return self.manifest["email_format"].format(id=self.rng.randint(2, self.manifest["users"]))
+
+    async def login(self, email: str) -> dict:
+        response = await self.call("POST /auth/login", "POST", "/auth/login",
+                                   json={"email": email, "password": self.manifest["password"]})
+        if response is None or response.status_code != 200:
+            raise RuntimeError(f"login de {email} falhou: {response and response.text}")
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def start(self, admin_headers: dict) -> None:
+        self.headers = await self.login(self.random_email())
+        self.admin_headers = admin_headers
+
+    def championship_id(self) -> int:
+        return self.rng.choice(self.manifest["open_championships"] + self.manifest["closed_championships"])
+
+
+async def browse(vu: VirtualUser) -> None:
+    await vu.call("GET /championships", "GET", "/championships",
+                  params={"page": vu.rng.randint(1, 20)}, headers=vu.headers)
+    championship_id = vu.championship_id()
+    await vu.call("GET /championships/{id}", "GET", f"/championships/{championship_id}", headers=vu.headers)
+    await vu.call("GET /championships/{id}/games", "GET", f"/championships/{championship_id}/games", headers=vu.headers)
+
+
+async def me_games(vu: VirtualUser) -> None:
+    # Polling do app: quase sempre os próximos jogos
+    status = "upcoming" if vu.rng.random() < 0.75 else "completed"
+    await vu.call("GET /me/games", "GET", "/me/games", params={"status": status}, headers=vu.headers)
+
+
+async def standings(vu: VirtualUser) -> None:
+    championship_id = vu.rng.choice(vu.manifest["closed_championships"])
+    await vu.call("GET /championships/{id}/standings", "GET", f"/championships/{championship_id}/standings",
+                  headers=vu.headers)
+
+
+async def join(vu: VirtualUser) -> None:
+    # 409 (já inscrita) faz parte da carga: a base sorteia as inscrições
+    championship_id = vu.rng.choice(vu.manifest["open_championships"])
+    await vu.call("POST /championships/{id}/join", "POST", f"/championships/{championship_id}/join",
+                  expected=(200, 409), headers=vu.headers)
+
+
+async def login(vu: VirtualUser) -> None:
+    await vu.call("POST /auth/login", "POST", "/auth/login",
+                  json={"email": vu.random_email(), "password": vu.manifest["password"]})
+
+
+async def signup(vu: VirtualUser) -> None:
+    email = f"load-{vu.run_id}-{vu.n}-{next(vu.signups)}@bench.passabola.dev"
+    await vu.call("POST /auth/signup", "POST", "/auth/signup", expected=(201,),
+                  json={"name": "Carga", "email": email, "password": vu.manifest["password"]})
+
+
+async def signup_queued(vu: VirtualUser) -> None:
+    # Servidor com INGEST_ENABLED: o cadastro entra na fila de ingestão (202)
+    email = f"load-{vu.run_id}-{vu.n}-q{next(vu.signups)}@bench.passabola.dev"
+    await vu.call("POST /auth/signup (fila)", "POST", "/auth/signup", expected=(202,),
+                  json={"name": "Carga", "email": email, "password": vu.manifest["password"]},
+                  headers={"Idempotency-Key": email})
+
+
+async def score(vu: VirtualUser) -> None:
+    # 409: outra usuária virtual corrigiu o mesmo jogo ao mesmo tempo
+    game_id = vu.rng.choice(vu.manifest["scorable_games"])
+    await vu.call("PATCH /games/{id}/score", "PATCH", f"/games/{game_id}/score", expected=(200, 409),
+                  json={"home_score": vu.rng.randint(0, 5), "away_score": vu.rng.randint(0, 5)},
+                  headers=vu.admin_headers)
+
+
+SCENARIOS = {
+    "browse": browse,
+    "me_games": me_games,
+    "standings": standings,
+    "join": join,
+    "login": login,
+    "signup": signup,
+    "signup_queued": signup_queued,
+    "score": score,
+}
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"cenário desconhecido: {name} (disponíveis: {', '.join(SCENARIOS)})")
+        mix[name] = float(weight or 1)
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+async def _run_user(vu: VirtualUser, mix: dict, deadline: float) -> None:
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    while time.perf_counter() < deadline:
+        await SCENARIOS[vu.rng.choices(names, weights)[0]](vu)
+
+
+async def run_load(client: httpx.AsyncClient, manifest: dict, args) -> tuple[dict, float]:
+    recorder = Recorder()
+    rng = random.Random(args.seed)
+    run_id = f"{int(time.time()):x}{os.getpid():x}"
+    users = [
+        VirtualUser(n, client, recorder, manifest, random.Random(rng.random()), run_id)
+        for n in range(args.concurrency)
+    ]
+    admin_headers = await users[0].login(manifest["admin_email"])
+    # Logins iniciais em lotes: no pool de hash, todos de uma vez dariam 429
+    for i in range(0, len(users), 8):
+        await asyncio.gather(*(vu.start(admin_headers) for vu in users[i:i + 8]))
+
+    started = time.perf_counter()
+    deadline = started + args.warmup + args.duration
+    tasks = [asyncio.create_task(_run_user(vu, args.mix, deadline)) for vu in users]
+    await asyncio.sleep(args.warmup)
+    recorder.recording = True
+    recording_started = time.perf_counter()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - recording_started
+    recorder.recording = False
+
+    items = {}
+    all_latencies = []
+    for label in sorted(recorder.latencies):
+        latencies = recorder.latencies[label]
+        all_latencies.extend(latencies)
+        items[label] = {
+            **report.latency_summary(latencies, elapsed),
+            "errors": recorder.errors[label],
+            "statuses": dict(recorder.statuses[label]),
+        }
+        if label in recorder.samples:
+            items[label]["error_sample"] = recorder.samples[label]
+    items["total"] = {**report.latency_summary(all_latencies, elapsed), "errors": sum(recorder.errors.values())}
+    return items, elapsed
+
+
+@contextlib.asynccontextmanager
+async def asgi_client(concurrency: int):
+    import main
+
+    # ASGITransport não dispara o lifespan: ele roda aqui, como no servidor
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            yield client
+
+
+@contextlib.asynccontextmanager
+async def http_client(url: str, concurrency: int):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        yield client
+
+
+@contextlib.contextmanager
+def uvicorn_server(port: int, workers: int):
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", str(workers),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=APP_DIR,
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(300):
+            if process.poll() is not None:
+                raise SystemExit(f"uvicorn terminou com código {process.returncode}")
+            try:
+                # /health fica atrás do AuthMiddleware: qualquer resposta indica que subiu
+                if httpx.get(f"{url}/health", timeout=1).status_code < 500:
+                    break
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.1)
+        else:
+            raise SystemExit("uvicorn não respondeu em /health em 30s")
+        yield url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+async def _main_async(args, manifest: dict, url: Optional[str]) -> tuple[dict, float]:
+    if url is None:
+        client_cm = asgi_client(args.concurrency)
+    else:
+        client_cm = http_client(url, args.concurrency)
+    async with client_cm as client:
+        return await run_load(client, manifest, args)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.load", description="Teste de carga do Passa Bola")
+    parser.add_argument("--target", choices=("asgi", "uvicorn"), default="asgi")
+    parser.add_argument("--url", default=None, help="Servidor já no ar (ignora --target)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1, help="Workers do uvicorn com --target uvicorn")
+    parser.add_argument("--concurrency", type=int, default=20, help="Usuárias virtuais")
+    parser.add_argument("--duration", type=float, default=30, help="Segundos medidos")
+    parser.add_argument("--warmup", type=float, default=5, help="Segundos descartados no início")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX))
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--manifest", type=Path, default=DEFAULT_MANIFEST)
+    parser.add_argument("--name", default=None, help="Nome do resultado (padrão: o alvo)")
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--baseline", type=Path, default=None, help="Resultado anterior para comparar")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Piora tolerada na comparação (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    manifest = json.loads(args.manifest.read_text())
+    target = "url" if args.url else args.target
+    with contextlib.ExitStack() as stack:
+        url = args.url
+        if url is None and args.target == "uvicorn":
+            url = stack.enter_context(uvicorn_server(args.port, args.workers))
+        items, elapsed = asyncio.run(_main_async(args, manifest, url))
+
+    params = {
+        "target": target,
+        "url": args.url,
+        "workers": args.workers if target == "uvicorn" else None,
+        "concurrency": args.concurrency,
+        "duration_s": round(elapsed, 2),
+        "warmup_s": args.warmup,
+        "mix": args.mix,
+        "seed": args.seed,
+        "dataset": {key: manifest.get(key) for key in ("seed", "base_date", "rows")},
+    }
+    return report.finish("load", args.name or target, items, params, COLUMNS, args.output, args.baseline, args.tolerance)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+# Resultados dos benchmarks em JSON, para comparar execuções. Cada arquivo traz o
+# ambiente (commit, Python, banco, CPUs) e um dicionário de itens (endpoint ou caso) com
+# as métricas medidas. O sufixo do nome da métrica diz a direção: *_ms, *_us, *_s e *_bytes
+# (menor é melhor) e *_per_s (maior é melhor); as demais são informativas.
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy.engine import make_url
+
+from core.config import settings
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+LOWER_IS_BETTER = ("_ms", "_us", "_s", "_bytes")
+HIGHER_IS_BETTER = ("_per_s",)
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    # Nearest-rank sobre valores já ordenados
+    if not sorted_values:
+        return 0.0
+    rank = max(1, min(len(sorted_values), round(q / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[rank - 1]
+
+
+def latency_summary(seconds: list[float], elapsed: float) -> dict:
+    values = sorted(seconds)
+    ms = [v * 1000 for v in values]
+    return {
+        "requests": len(values),
+        "throughput_per_s": round(len(values) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(ms) / len(ms), 3) if ms else 0.0,
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "max_ms": round(ms[-1], 3) if ms else 0.0,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent, capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment() -> dict:
+    return {
+        "commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "database": make_url(settings.DATABASE_URL).get_backend_name(),
+        "db_async": settings.DB_ASYNC,
+    }
+
+
+def write_result(kind: str, name: str, items: dict, params: dict, path: Optional[Path] = None) -> Path:
+    started = datetime.now(timezone.utc)
+    path = path or RESULTS_DIR / f"{kind}-{name}-{started:%Y%m%dT%H%M%S}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({
+        "kind": kind,
+        "name": name,
+        "created_at": started.isoformat(),
+        "environment": environment(),
+        "params": params,
+        "items": items,
+    }, indent=2, default=str))
+    return path
+
+
+def _direction(metric: str) -> int:
+    if metric.endswith(HIGHER_IS_BETTER):
+        return 1
+    if metric.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    # Linhas de regressão: métricas que pioraram mais que `tolerance` (0.1 = 10%)
+    regressions = []
+    for item, metrics in current["items"].items():
+        base = baseline["items"].get(item)
+        if not base:
+            continue
+        for metric, value in metrics.items():
+            direction = _direction(metric)
+            old = base.get(metric)
+            if not direction or not isinstance(old, (int, float)) or not isinstance(value, (int, float)) or not old:
+                continue
+            change = (value - old) / old
+            if change * direction < -tolerance:
+                regressions.append(f"{item} {metric}: {old} -> {value} ({change:+.1%})")
+    return regressions
+
+
+def load_result(path: Path) -> dict:
+    return json.loads(Path(path).read_text())
+
+
+def print_table(items: dict, columns: Optional[list[str]]) -> None:
+    # Sem colunas fixas (casos com métricas próprias): uma linha "item: métrica=valor" por item
+    if columns is None:
+        for name, metrics in items.items():
+            print(f"{name}: " + " ".join(f"{k}={v}" for k, v in metrics.items()))
+        return
+    width = max([len(name) for name in items] + [4])
+    print(f"{'item':<{width}}  " + "  ".join(f"{c:>12}" for c in columns))
+    for name, metrics in items.items():
+        cells = []
+        for c in columns:
+            value = metrics.get(c, "")
+            cells.append(f"{value:>12.2f}" if isinstance(value, float) else f"{value!s:>12}")
+        print(f"{name:<{width}}  " + "  ".join(cells))
+
+
+def finish(kind: str, name: str, items: dict, params: dict, columns: Optional[list[str]],
+           output: Optional[Path], baseline: Optional[Path], tolerance: float) -> int:
+    # Imprime, grava e compara com a linha de base; retorna o código de saída do script
+    print_table(items, columns)
+    path = write_result(kind, name, items, params, output)
+    print(f"resultado em {path}")
+    if baseline is None:
+        return 0
+    regressions = compare(load_result(path), load_result(baseline), tolerance)
+    for line in regressions:
+        print(f"REGRESSÃO {line}")
+    if not regressions:
+        print(f"sem regressões acima de {tolerance:.0%} em relação a {baseline}")
+    return 1 if regressions else 0
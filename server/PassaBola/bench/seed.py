@@ -0,0 +1,285 @@
+# Gera uma base sintética para os benchmarks (bench/load.py, bench/cases.py).
+# Uso: python -m bench.seed [--scale 0.01] [--users N] [--championships N] [--user-matches N]
+#
+# Com a mesma semente e a mesma --base-date a base é idêntica. As linhas seguem as regras
+# da API: times sorteados com fixtures.assign_teams, tabela de fixtures.round_robin /
+# knockout e allocate_slots, jogos passados encerrados (no mata-mata o vencedor avança),
+# elencos em user_match para os lados com time definido. Os campeonatos são fechados até
+# atingir --user-matches; os demais ficam abertos, com parte das vagas preenchida.
+# Classificação e agregados de estatísticas são reconstruídos no fim (recompute_*).
+# Todas as usuárias têm a senha BENCH_PASSWORD (um único hash, calculado uma vez);
+# o manifesto JSON lista e-mails, senha e ids usados pela carga.
+import argparse
+import json
+import random
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import func, insert, select, text
+
+from core.security import get_password_hash
+from crud import fixtures
+from crud.standings import recompute_standings
+from crud.stats import recompute_stats
+from db.database import SessionLocal, utcnow
+from models.championship import Championship
+from models.daily_stats import DailyStats  # noqa: F401
+from models.match import Match, MatchStatus
+from models.standing import Standing  # noqa: F401
+from models.user import PositionEnum, User
+from models.user_championship import UserChampionship
+from models.user_daily_stats import UserDailyStats  # noqa: F401
+from models.user_match import UserMatch
+
+BENCH_PASSWORD = "bench-password"
+EMAIL_FORMAT = "user{id}@bench.passabola.dev"
+ADMIN_ID = 1
+DEFAULT_MANIFEST = Path(__file__).resolve().parent / "seed.json"
+
+VENUES = ["Arena Norte", "Arena Sul", "Campo Leste", "Campo Oeste", "Quadra Central"]
+POSITIONS = list(PositionEnum)
+
+# Amostras guardadas no manifesto (a carga sorteia dentro delas)
+MANIFEST_SAMPLE = 2000
+
+
+class Writer:
+    # Acumula linhas por tabela e grava em executemany de `batch` linhas
+    def __init__(self, db, batch: int):
+        self.db = db
+        self.batch = batch
+        self.pending: dict = {}
+        self.written: dict = {}
+        self.started = time.perf_counter()
+
+    def progress(self, message: str) -> None:
+        print(f"  {message} ({time.perf_counter() - self.started:.0f}s)", flush=True)
+
+    def add(self, model, row: dict) -> None:
+        rows = self.pending.setdefault(model, [])
+        rows.append(row)
+        if len(rows) >= self.batch:
+            self.flush(model)
+
+    def flush(self, model=None) -> None:
+        for m in [model] if model is not None else list(self.pending):
+            rows = self.pending.get(m)
+            if rows:
+                self.db.connection().execute(insert(m.__table__), rows)
+                self.written[m.__tablename__] = self.written.get(m.__tablename__, 0) + len(rows)
+                rows.clear()
+
+
+def _users(w: Writer, rng: random.Random, n_users: int, password_hash: str) -> None:
+    for user_id in range(1, n_users + 1):
+        w.add(User, {
+            "id": user_id,
+            "name": "Admin Bench" if user_id == ADMIN_ID else f"Jogadora {user_id}",
+            "email": EMAIL_FORMAT.format(id=user_id),
+            "phone_number": f"+5511{user_id:09d}",
+            "document": f"{user_id:011d}",
+            "password_hash": password_hash,
+            "birth_date": date(1975, 1, 1) + timedelta(days=rng.randrange(365 * 33)),
+            "admin": user_id == ADMIN_ID,
+            "position": rng.choice(POSITIONS),
+        })
+        if user_id % 100_000 == 0:
+            w.progress(f"usuárias: {user_id}/{n_users}")
+
+
+def _play(rng: random.Random, games: list[dict], fmt: str, reference: datetime) -> None:
+    # Encerra os jogos passados com times definidos; no mata-mata (rodadas em ordem) o
+    # vencedor ocupa o lado correspondente do jogo seguinte, como em advance_winner
+    by_key = {(g["round"], g["slot"]): g for g in games}
+    for g in games:
+        if g["home_team"] is None or g["away_team"] is None or g["scheduled_at"] >= reference:
+            continue
+        home, away = rng.randint(0, 5), rng.randint(0, 5)
+        if fmt == fixtures.KNOCKOUT and home == away:
+            home += 1
+        g.update(status=MatchStatus.finished, score_home=home, score_away=away)
+        if fmt == fixtures.KNOCKOUT:
+            nxt = by_key.get((g["round"] + 1, g["slot"] // 2))
+            if nxt is not None:
+                winner = g["home_team"] if home > away else g["away_team"]
+                nxt["home_team" if g["slot"] % 2 == 0 else "away_team"] = winner
+
+
+def _closed(w: Writer, rng: random.Random, championship_id: int, user_ids: list[int], players: int,
+            reference: datetime, now: datetime, next_match_id: int) -> tuple[int, int, list[int]]:
+    # Retorna (próximo id de jogo, linhas de user_match, ids dos jogos de pontos corridos)
+    fmt = fixtures.KNOCKOUT if rng.random() < 0.3 else fixtures.ROUND_ROBIN
+    teams = fixtures.assign_teams(user_ids, players)
+    n_teams = max(teams.values())
+    plan = fixtures.round_robin(n_teams) if fmt == fixtures.ROUND_ROBIN else fixtures.knockout(n_teams)
+    # Início entre 60 dias antes e 30 dias depois da referência
+    start = reference + timedelta(days=rng.randrange(-60, 30), hours=rng.choice((9, 14, 19)))
+    slots = fixtures.allocate_slots(plan, start, rng.sample(VENUES, 2), 4, timedelta(minutes=90))
+
+    games = []
+    for f, (scheduled_at, location) in zip(plan, slots):
+        games.append({
+            "id": next_match_id,
+            "championship_id": championship_id,
+            "round": f.round,
+            "slot": f.slot,
+            "home_team": f.home_team,
+            "away_team": f.away_team,
+            "scheduled_at": scheduled_at,
+            "location": location,
+            "status": MatchStatus.scheduled,
+            "score_home": None,
+            "score_away": None,
+            "updated_at": now,
+        })
+        next_match_id += 1
+    _play(rng, games, fmt, reference)
+
+    w.add(Championship, {
+        "id": championship_id,
+        "name": f"Campeonato {championship_id}",
+        "number_players": players,
+        "is_closed": True,
+        "participants_count": len(user_ids),
+        "format": fmt,
+        "version": 1,
+        "updated_at": now,
+    })
+    roster: dict[int, list[int]] = {}
+    for user_id, team in teams.items():
+        w.add(UserChampionship, {"user_id": user_id, "championship_id": championship_id, "team": team, "updated_at": now})
+        roster.setdefault(team, []).append(user_id)
+
+    user_matches = 0
+    for g in games:
+        w.add(Match, g)
+        for side in ("home", "away"):
+            team = g[f"{side}_team"]
+            for user_id in roster.get(team, ()):
+                w.add(UserMatch, {"user_id": user_id, "match_id": g["id"], "team_side": side, "updated_at": now})
+                user_matches += 1
+    scorable = [g["id"] for g in games if fmt == fixtures.ROUND_ROBIN]
+    return next_match_id, user_matches, scorable
+
+
+def _open(w: Writer, championship_id: int, user_ids: list[int], players: int, now: datetime) -> None:
+    w.add(Championship, {
+        "id": championship_id,
+        "name": f"Campeonato {championship_id}",
+        "number_players": players,
+        "is_closed": False,
+        "participants_count": len(user_ids),
+        "format": None,
+        "version": len(user_ids),
+        "updated_at": now,
+    })
+    for user_id in user_ids:
+        w.add(UserChampionship, {"user_id": user_id, "championship_id": championship_id, "team": None, "updated_at": now})
+
+
+def _reset_sequences(db) -> None:
+    # Ids explícitos não avançam as sequências do PostgreSQL
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    for table in ("users", "championships", "matches"):
+        db.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE((SELECT MAX(id) FROM {table}), 1))"
+        ))
+
+
+def seed(n_users: int, n_championships: int, target_user_matches: int, seed_value: int,
+         base_date: date, batch: int) -> dict:
+    rng = random.Random(seed_value)
+    now = utcnow()
+    # Jogos antes da meia-noite da data base estão encerrados (e não antes do horário do seed:
+    # a base não depende da hora em que foi gerada)
+    reference = datetime.combine(base_date, datetime.min.time())
+
+    db = SessionLocal()
+    try:
+        if db.execute(select(func.count()).select_from(User)).scalar_one():
+            raise SystemExit("A base já tem usuárias: use um banco vazio (DATABASE_URL) para o seed")
+
+        w = Writer(db, batch)
+        print(f"usuárias: {n_users}", flush=True)
+        _users(w, rng, n_users, get_password_hash(BENCH_PASSWORD))
+        w.flush()
+
+        print(f"campeonatos: {n_championships} (alvo de user_match: {target_user_matches})", flush=True)
+        next_match_id = 1
+        user_matches = 0
+        open_ids, closed_ids, scorable = [], [], []
+        for championship_id in range(1, n_championships + 1):
+            players = rng.choice((1, 3, 5, 5, 7, 11))
+            # Fechado enquanto user_match estiver abaixo da proporção do alvo
+            if user_matches < target_user_matches * championship_id / n_championships:
+                n_teams = rng.choice((4, 6, 8, 8, 10)) if players > 1 else rng.randint(4, 16)
+                user_ids = rng.sample(range(ADMIN_ID + 1, n_users + 1), min(n_teams * players, n_users - 1))
+                if len(user_ids) // players >= 2:
+                    next_match_id, added, games = _closed(w, rng, championship_id, sorted(user_ids), players,
+                                                          reference, now, next_match_id)
+                    user_matches += added
+                    closed_ids.append(championship_id)
+                    if len(scorable) < MANIFEST_SAMPLE:
+                        scorable.extend(games)
+                    continue
+            user_ids = rng.sample(range(ADMIN_ID + 1, n_users + 1), min(rng.randint(0, 4 * players), n_users - 1))
+            _open(w, championship_id, user_ids, players, now)
+            open_ids.append(championship_id)
+            if championship_id % 5000 == 0:
+                w.progress(f"campeonatos: {championship_id}/{n_championships}, user_match: {user_matches}")
+        w.flush()
+        _reset_sequences(db)
+        db.commit()
+
+        print("classificação e estatísticas (recompute)", flush=True)
+        recompute_standings(db)
+        recompute_stats(db)
+        db.commit()
+    finally:
+        db.close()
+
+    return {
+        "seed": seed_value,
+        "base_date": base_date.isoformat(),
+        "created_at": now.isoformat(),
+        "seconds": round(time.perf_counter() - w.started, 1),
+        "rows": w.written,
+        "users": n_users,
+        "admin_email": EMAIL_FORMAT.format(id=ADMIN_ID),
+        "email_format": EMAIL_FORMAT,
+        "password": BENCH_PASSWORD,
+        "open_championships": open_ids[:MANIFEST_SAMPLE],
+        "closed_championships": closed_ids[:MANIFEST_SAMPLE],
+        "scorable_games": scorable[:MANIFEST_SAMPLE],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench.seed", description="Gera a base sintética dos benchmarks")
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--championships", type=int, default=50_000)
+    parser.add_argument("--user-matches", type=int, default=5_000_000, help="Linhas alvo em user_match")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplica os três volumes (ex.: 0.01)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--base-date", type=date.fromisoformat, default=None,
+                        help="Data de referência dos jogos (padrão: hoje, UTC)")
+    parser.add_argument("--batch", type=int, default=10_000, help="Linhas por executemany")
+    parser.add_argument("--manifest", type=Path, default=DEFAULT_MANIFEST)
+    args = parser.parse_args(argv)
+
+    manifest = seed(
+        n_users=max(2, int(args.users * args.scale)),
+        n_championships=max(1, int(args.championships * args.scale)),
+        target_user_matches=int(args.user_matches * args.scale),
+        seed_value=args.seed,
+        base_date=args.base_date or utcnow().date(),
+        batch=args.batch,
+    )
+    args.manifest.write_text(json.dumps(manifest, indent=2))
+    print(f"{manifest['rows']} em {manifest['seconds']}s; manifesto em {args.manifest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# Comandos administrativos de manutenção. Uso: python cli.py <comando> [opções]
+import argparse
+
+from db.database import SessionLocal, run_migrations
+from models import user as _user  # noqa: F401
+from models import championship as _championship  # noqa: F401
+from models import user_championship as _user_championship  # noqa: F401
+from models import match as _match  # noqa: F401
+from models import user_match as _user_match  # noqa: F401
+from models import standing as _standing  # noqa: F401
+from models import daily_stats as _daily_stats  # noqa: F401
+from models import user_daily_stats as _user_daily_stats  # noqa: F401
+from models import championship_waitlist as _championship_waitlist  # noqa: F401
+from models import championship_list_version as _championship_list_version  # noqa: F401
+from models import job as _job  # noqa: F401
+
+
+def migrate(args):
+    # Como alembic upgrade, mas marca antes os bancos criados sem o Alembic (revisão 0001)
+    run_migrations(args.revision)
+    print(f"banco migrado até {args.revision}")
+
+
+def recount_participants(args):
+    from crud.championship import recount_participants as _recount
+
+    db = SessionLocal()
+    try:
+        updated = _recount(db, args.championship_id)
+    finally:
+        db.close()
+    print(f"participants_count recalculado em {updated} campeonato(s)")
+
+
+def recompute_standings(args):
+    from crud.standings import recompute_standings as _recompute
+
+    db = SessionLocal()
+    try:
+        updated = _recompute(db, args.championship_id)
+    finally:
+        db.close()
+    print(f"classificação recalculada em {updated} campeonato(s)")
+
+
+def recompute_stats(args):
+    from crud.stats import recompute_stats as _recompute
+
+    db = SessionLocal()
+    try:
+        days = _recompute(db)
+    finally:
+        db.close()
+    print(f"estatísticas recalculadas ({days} dia(s) com jogos)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="cli.py", description="Comandos de manutenção do Passa Bola")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("migrate", help="Aplica as migrações do Alembic (padrão: head)")
+    p.add_argument("revision", nargs="?", default="head")
+    p.set_defaults(func=migrate)
+
+    p = sub.add_parser("recount-participants", help="Recalcula championships.participants_count a partir de user_championship")
+    p.add_argument("--championship-id", type=int, default=None)
+    p.set_defaults(func=recount_participants)
+
+    p = sub.add_parser("recompute-standings", help="Reconstrói a tabela standings a partir dos jogos encerrados")
+    p.add_argument("--championship-id", type=int, default=None)
+    p.set_defaults(func=recompute_standings)
+
+    p = sub.add_parser("recompute-stats", help="Reconstrói daily_stats e user_daily_stats a partir de matches/user_match")
+    p.set_defaults(func=recompute_stats)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,416 @@
+# Cache compartilhado entre workers, com backend escolhido por CACHE_URL:
+#   - vazio: MemoryCache, LRU do próprio processo (core/cache.py);
+#   - redis://...: RedisCache, visível a todos os workers, com uma cópia local curta na
+#     frente (CACHE_LOCAL_*). Deleções e invalidações são publicadas num canal do Redis e
+#     cada worker descarta as suas cópias locais.
+# Os valores podem ter tags (ex.: "user:1"); invalidate_tags descarta todas as chaves
+# marcadas. get_or_set (e get_or_set_async, para loaders assíncronos) coalesce as faltas
+# (single-flight): no processo, um lock (ou uma tarefa) por chave; entre workers, um lock no
+# Redis (SET NX) enquanto o primeiro calcula o valor.
+import asyncio
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Hashable, Iterable, Optional, Union
+
+from core.cache import TTLCache
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "passabola:"
+INVALIDATION_CHANNEL = KEY_PREFIX + "invalidate"
+
+_MISSING = object()
+
+# Tags fixas ou calculadas a partir do valor (ex.: o id do usuário carregado)
+Tags = Union[Iterable[str], Callable[[Any], Iterable[str]]]
+
+
+class CacheBackend(ABC):
+    def __init__(self):
+        self._flights: dict[Hashable, threading.Lock] = {}
+        self._flights_lock = threading.Lock()
+        self._async_flights: dict[Hashable, asyncio.Future] = {}
+
+    @abstractmethod
+    def get(self, key: str, default: Any = None) -> Any:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, tags: Iterable[str] = ()) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def invalidate_tags(self, *tags: str) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    @abstractmethod
+    def stats(self) -> dict:
+        ...
+
+    def get_or_set(self, key: str, loader: Callable[[], Any], ttl: Optional[float] = None, tags: Tags = ()) -> Any:
+        # Na falta, só uma thread do processo chama loader; as outras esperam e leem o
+        # valor gravado. None não é guardado.
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        with self._flights_lock:
+            lock = self._flights.setdefault(key, threading.Lock())
+        with lock:
+            try:
+                value = self.get(key, _MISSING)
+                if value is _MISSING:
+                    value = self._load(key, loader, ttl, tags)
+            finally:
+                with self._flights_lock:
+                    if self._flights.get(key) is lock:
+                        del self._flights[key]
+        return value
+
+    def _load(self, key: str, loader: Callable[[], Any], ttl: Optional[float], tags: Tags) -> Any:
+        value = loader()
+        if value is not None:
+            self.set(key, value, ttl, tags(value) if callable(tags) else tags)
+        return value
+
+    async def get_or_set_async(
+        self, key: str, loader: Callable[[], Awaitable[Any]], ttl: Optional[float] = None, tags: Tags = (),
+    ) -> Any:
+        # Como get_or_set, no event loop: as faltas simultâneas aguardam a mesma tarefa.
+        # Uma requisição cancelada não cancela a carga das outras (shield).
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        flight = self._async_flights.get(key)
+        if flight is None or flight.done():
+            flight = asyncio.ensure_future(self._load_async(key, loader, ttl, tags))
+            self._async_flights[key] = flight
+            flight.add_done_callback(lambda f: self._end_async_flight(key, f))
+        return await asyncio.shield(flight)
+
+    def _end_async_flight(self, key: Hashable, flight: asyncio.Future) -> None:
+        if self._async_flights.get(key) is flight:
+            del self._async_flights[key]
+
+    async def _load_async(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: Optional[float], tags: Tags) -> Any:
+        value = await loader()
+        if value is not None:
+            self.set(key, value, ttl, tags(value) if callable(tags) else tags)
+        return value
+
+
+class MemoryCache(CacheBackend):
+    def __init__(self, maxsize: int, ttl: float):
+        super().__init__()
+        self.ttl = ttl
+        # Cada entrada guarda (valor, tags)
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        entry = self._cache.get(key, _MISSING)
+        return default if entry is _MISSING else entry[0]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, tags: Iterable[str] = ()) -> None:
+        self._cache.set(key, (value, frozenset(tags)), ttl)
+
+    def delete(self, key: str) -> None:
+        self._cache.delete(key)
+
+    def invalidate_tags(self, *tags: str) -> None:
+        targets = set(tags)
+        self._cache.delete_where(lambda _key, entry: not targets.isdisjoint(entry[1]))
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return {"backend": "memory", **self._cache.stats()}
+
+
+# Cópias locais dos RedisCache deste processo, por namespace, para o assinante do canal
+_local_caches: dict[str, MemoryCache] = {}
+_listener_pid: Optional[int] = None
+_listener_lock = threading.Lock()
+
+
+def _on_invalidation(message: dict) -> None:
+    try:
+        data = json.loads(message["data"])
+    except (TypeError, ValueError):
+        return
+    local = _local_caches.get(data.get("ns"))
+    if local is None:
+        return
+    if data.get("clear"):
+        local.clear()
+    for key in data.get("keys", ()):
+        local.delete(key)
+    if data.get("tags"):
+        local.invalidate_tags(*data["tags"])
+
+
+def _ensure_listener(client) -> None:
+    # Uma thread assinante por processo, iniciada no primeiro uso (depois do fork dos workers)
+    global _listener_pid
+    if _listener_pid == os.getpid():
+        return
+    with _listener_lock:
+        if _listener_pid == os.getpid():
+            return
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{INVALIDATION_CHANNEL: _on_invalidation})
+        pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+        _listener_pid = os.getpid()
+
+
+class RedisCache(CacheBackend):
+    # client: qualquer cliente com a API do redis-py (redis.Redis, fakeredis.FakeRedis)
+    # Depois de uma falha, o Redis é ignorado por retry_after segundos (só a cópia local vale)
+    retry_after = 5.0
+
+    def __init__(
+        self,
+        client,
+        namespace: str,
+        ttl: float,
+        local: Optional[MemoryCache] = None,
+        lock_timeout: float = 5.0,
+    ):
+        super().__init__()
+        self.client = client
+        self.namespace = namespace
+        self.ttl = ttl
+        self.local = local
+        self.lock_timeout = lock_timeout
+        self._prefix = f"{KEY_PREFIX}{namespace}:"
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._retry_at = 0.0
+        if local is not None:
+            _local_caches[namespace] = local
+
+    def _key(self, key: str) -> str:
+        return self._prefix + key
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self._prefix}tag:{tag}"
+
+    def _failed(self, operation: str, exc: Exception) -> None:
+        # Redis indisponível degrada para falta de cache, sem derrubar a requisição
+        self.errors += 1
+        self._retry_at = time.monotonic() + self.retry_after
+        logger.warning("cache %s: %s falhou: %s", self.namespace, operation, exc)
+
+    def _available(self) -> bool:
+        if time.monotonic() < self._retry_at:
+            return False
+        if self.local is not None:
+            try:
+                _ensure_listener(self.client)
+            except Exception as exc:
+                self._failed("subscribe", exc)
+                return False
+        return True
+
+    def _publish(self, **payload) -> None:
+        # Publicado mesmo sem cópia local aqui: os outros workers podem ter a sua
+        self.client.publish(INVALIDATION_CHANNEL, json.dumps({"ns": self.namespace, **payload}))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if not self._available():
+            return default if self.local is None else self.local.get(key, default)
+        if self.local is not None:
+            value = self.local.get(key, _MISSING)
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+        try:
+            data = self.client.get(self._key(key))
+        except Exception as exc:
+            self._failed("get", exc)
+            return default
+        if data is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        value, tags = pickle.loads(data)
+        if self.local is not None:
+            self.local.set(key, value, tags=tags)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, tags: Iterable[str] = ()) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        tags = tuple(tags)
+        if not self._available():
+            return
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.set(self._key(key), pickle.dumps((value, tags), pickle.HIGHEST_PROTOCOL), px=int(ttl * 1000))
+            for tag in tags:
+                # O conjunto da tag vive tanto quanto a entrada mais longa do namespace
+                pipe.sadd(self._tag_key(tag), key)
+                pipe.pexpire(self._tag_key(tag), int(self.ttl * 1000))
+            pipe.execute()
+        except Exception as exc:
+            self._failed("set", exc)
+            return
+        if self.local is not None:
+            self.local.set(key, value, ttl, tags)
+
+    def delete(self, key: str) -> None:
+        if self.local is not None:
+            self.local.delete(key)
+        if not self._available():
+            return
+        try:
+            self.client.delete(self._key(key))
+            self._publish(keys=[key])
+        except Exception as exc:
+            self._failed("delete", exc)
+
+    def invalidate_tags(self, *tags: str) -> None:
+        if self.local is not None:
+            self.local.invalidate_tags(*tags)
+        if not self._available():
+            logger.warning("cache %s: Redis indisponível, tags %s não invalidadas", self.namespace, tags)
+            return
+        try:
+            # SMEMBERS + DEL da tag numa transação: uma chave marcada depois disso entra
+            # num conjunto novo e não é perdida
+            pipe = self.client.pipeline(transaction=True)
+            for tag in tags:
+                pipe.smembers(self._tag_key(tag))
+                pipe.delete(self._tag_key(tag))
+            results = pipe.execute()
+            keys = {self._key(k.decode() if isinstance(k, bytes) else k) for members in results[::2] for k in members}
+            if keys:
+                self.client.delete(*keys)
+            self._publish(tags=list(tags))
+        except Exception as exc:
+            self._failed("invalidate_tags", exc)
+
+    def clear(self) -> None:
+        if self.local is not None:
+            self.local.clear()
+        if not self._available():
+            return
+        try:
+            keys = list(self.client.scan_iter(match=self._prefix + "*", count=1000))
+            if keys:
+                self.client.delete(*keys)
+            self._publish(clear=True)
+        except Exception as exc:
+            self._failed("clear", exc)
+
+    def _try_lock(self, lock_key: str, token: str) -> Optional[bool]:
+        # None: o Redis falhou, e quem chama calcula sem lock
+        try:
+            return bool(self.client.set(lock_key, token, nx=True, px=int(self.lock_timeout * 1000)))
+        except Exception as exc:
+            self._failed("lock", exc)
+            return None
+
+    def _unlock(self, lock_key: str, token: str) -> None:
+        try:
+            if self.client.get(lock_key) in (token, token.encode()):
+                self.client.delete(lock_key)
+        except Exception as exc:
+            self._failed("unlock", exc)
+
+    def _load(self, key: str, loader: Callable[[], Any], ttl: Optional[float], tags: Tags) -> Any:
+        # Entre workers: quem obtém o lock calcula; os demais aguardam o valor até
+        # lock_timeout e, esgotado o prazo, calculam por conta própria
+        if not self._available():
+            return super()._load(key, loader, ttl, tags)
+        lock_key = self._key("lock:" + key)
+        token = uuid.uuid4().hex
+        acquired = self._try_lock(lock_key, token)
+
+        deadline = time.monotonic() + self.lock_timeout
+        while acquired is False and time.monotonic() < deadline:
+            time.sleep(0.02)
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            acquired = self._try_lock(lock_key, token)
+
+        try:
+            return super()._load(key, loader, ttl, tags)
+        finally:
+            if acquired:
+                self._unlock(lock_key, token)
+
+    async def _load_async(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: Optional[float], tags: Tags) -> Any:
+        # O mesmo protocolo de _load, esperando com asyncio.sleep
+        if not self._available():
+            return await super()._load_async(key, loader, ttl, tags)
+        lock_key = self._key("lock:" + key)
+        token = uuid.uuid4().hex
+        acquired = self._try_lock(lock_key, token)
+
+        deadline = time.monotonic() + self.lock_timeout
+        while acquired is False and time.monotonic() < deadline:
+            await asyncio.sleep(0.02)
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            acquired = self._try_lock(lock_key, token)
+
+        try:
+            return await super()._load_async(key, loader, ttl, tags)
+        finally:
+            if acquired:
+                self._unlock(lock_key, token)
+
+    def stats(self) -> dict:
+        out = {
+            "backend": "redis",
+            "namespace": self.namespace,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
+        if self.local is not None:
+            out["local"] = self.local.stats()
+        return out
+
+
+_redis_client = None
+
+
+def redis_client():
+    # Cliente único por processo (o pool do redis-py é thread-safe); requer o extra "cache"
+    global _redis_client
+    if _redis_client is None:
+        import redis
+
+        _redis_client = redis.Redis.from_url(settings.CACHE_URL)
+    return _redis_client
+
+
+def make_cache(namespace: str, maxsize: int, ttl: float) -> CacheBackend:
+    if not settings.CACHE_URL:
+        return MemoryCache(maxsize, ttl)
+    local = None
+    if settings.CACHE_LOCAL_MAX_ENTRIES > 0 and settings.CACHE_LOCAL_TTL_SECONDS > 0:
+        local = MemoryCache(min(maxsize, settings.CACHE_LOCAL_MAX_ENTRIES), min(ttl, settings.CACHE_LOCAL_TTL_SECONDS))
+    return RedisCache(redis_client(), namespace, ttl, local=local, lock_timeout=settings.CACHE_LOCK_TIMEOUT_SECONDS)
@@ -1,12 +1,117 @@
-﻿from typing import List
-from pydantic_settings import BaseSettings, SettingsConfigDict
+﻿import json
+import os
+from typing import Annotated, List
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
 from pydantic import field_validator
 
 class Settings(BaseSettings):
     DATABASE_URL: str
     API_PREFIX: str = "/api"
     DEBUG: bool = True
-    ALLOWED_ORIGINS: List[str] = []
+    # Aceita lista separada por vírgulas (como no .env) ou JSON
+    ALLOWED_ORIGINS: Annotated[List[str], NoDecode] = []
+
+    # Validade do total em cache nas listagens paginadas por cursor
+    PAGINATION_TOTAL_CACHE_SECONDS: float = 30
+
+    # Exportações CSV: linhas lidas por lote e tamanho aproximado de cada bloco enviado
+    EXPORT_YIELD_PER: int = 1_000
+    EXPORT_CHUNK_SIZE: int = 65_536
+
+    # Aplica as migrações do Alembic (upgrade head) ao iniciar a aplicação. Desligado por
+    # padrão: com vários workers, migre uma vez no deploy (python cli.py migrate)
+    DB_AUTO_MIGRATE: bool = False
+    # Serve as rotas de leitura mais acessadas com AsyncSession (requer o extra "async")
+    DB_ASYNC: bool = False
+    # Pool de conexões do banco (ignorado para SQLite em memória)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Timeout por statement no PostgreSQL (0 desativa)
+    DB_STATEMENT_TIMEOUT_MS: int = 30_000
+    # PRAGMAs aplicados quando DATABASE_URL é SQLite (além de WAL e synchronous=NORMAL)
+    SQLITE_BUSY_TIMEOUT_MS: int = 5_000
+    SQLITE_MMAP_SIZE: int = 268_435_456
+
+    # Backend dos caches compartilhados (core/cache_backend.py): vazio usa a memória de cada
+    # processo; redis://host:6379/0 compartilha entre os workers (requer o extra "cache").
+    # Com Redis, cada worker mantém uma cópia local curta, invalidada via pub/sub.
+    CACHE_URL: str = ""
+    CACHE_LOCAL_MAX_ENTRIES: int = 1_000
+    CACHE_LOCAL_TTL_SECONDS: float = 5
+    # Quanto um worker espera outro calcular o mesmo valor antes de calculá-lo por conta própria
+    CACHE_LOCK_TIMEOUT_SECONDS: float = 5
+    # Classificação em cache (invalidada a cada placar)
+    STANDINGS_CACHE_TTL_SECONDS: float = 60
+
+    # Cache do usuário autenticado (principal)
+    AUTH_CACHE_TTL_SECONDS: float = 60
+    AUTH_CACHE_MAX_ENTRIES: int = 10_000
+    # Cache de tokens JWT já verificados (limitado também pelo exp de cada token)
+    TOKEN_CACHE_TTL_SECONDS: float = 300
+    TOKEN_CACHE_MAX_ENTRIES: int = 10_000
+
+    # Respostas condicionais (ETag): LRU de corpos serializados por processo (0 desativa)
+    # e max-age da listagem de campeonatos; as demais rotas sempre revalidam
+    HTTP_CACHE_MAX_ENTRIES: int = 1_000
+    HTTP_CACHE_TTL_SECONDS: float = 300
+    HTTP_CACHE_LIST_MAX_AGE_SECONDS: int = 5
+
+    # Push de eventos (SSE/WebSocket, core/events.py): eventos pendentes por conexão antes de
+    # descartá-la, eventos guardados para retomada (Last-Event-ID), intervalo dos heartbeats e
+    # limite de conexões por worker
+    EVENTS_QUEUE_SIZE: int = 64
+    EVENTS_REPLAY_SIZE: int = 1_000
+    EVENTS_HEARTBEAT_SECONDS: float = 15
+    EVENTS_MAX_SUBSCRIBERS: int = 20_000
+
+    # Instrumentação (core/metrics.py): latência por rota, statements SQL por requisição e
+    # GET /metrics. METRICS_TOKEN libera a rota para o scraper sem JWT (senão exige admin).
+    # Statements acima de SLOW_QUERY_MS são registrados no log com a rota (0 desativa).
+    METRICS_ENABLED: bool = True
+    METRICS_TOKEN: str = ""
+    SLOW_QUERY_MS: float = 500
+
+    # Modo de ingestão (core/ingest.py): com INGEST_ENABLED, cadastros e inscrições com o
+    # header Idempotency-Key vão para uma fila SQLite local e são gravados em lotes por um
+    # worker em cada processo. Acima de INGEST_MAX_PENDING pedidos na fila a resposta é 503;
+    # pedidos concluídos (e suas chaves) ficam INGEST_RESULT_TTL_SECONDS para consulta.
+    INGEST_ENABLED: bool = False
+    INGEST_QUEUE_PATH: str = "./ingest_queue.db"
+    INGEST_BATCH_SIZE: int = 200
+    INGEST_LINGER_MS: float = 20
+    INGEST_POLL_SECONDS: float = 0.5
+    INGEST_MAX_PENDING: int = 50_000
+    INGEST_MAX_ATTEMPTS: int = 3
+    INGEST_RESULT_TTL_SECONDS: float = 86_400
+
+    # Jobs em segundo plano (core/jobs.py): threads por processo, separadas do threadpool das
+    # rotas (0 = este processo só enfileira), intervalo de leitura da tabela jobs, tempo sem
+    # heartbeat até um job running ser considerado de um worker que caiu, tentativas por job,
+    # pasta dos arquivos gerados (exportações) e retenção dos jobs concluídos e seus arquivos
+    JOBS_WORKERS: int = 2
+    JOBS_POLL_SECONDS: float = 1
+    JOBS_LEASE_SECONDS: float = 300
+    JOBS_MAX_ATTEMPTS: int = 3
+    JOBS_OUTPUT_DIR: str = "./job_output"
+    JOBS_RETENTION_SECONDS: float = 7 * 86_400
+
+    # Hash de senhas: rounds do pbkdf2_sha256 e pool dedicado com limite de fila
+    PASSWORD_HASH_ROUNDS: int = 310_000
+    PASSWORD_HASH_WORKERS: int = max(1, (os.cpu_count() or 2) // 2)
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
+    @field_validator("ALLOWED_ORIGINS", mode="before")
+    @classmethod
+    def _split_origins(cls, value):
+        if isinstance(value, str):
+            value = value.strip()
+            if value.startswith("["):
+                return json.loads(value)
+            return [origin.strip() for origin in value.split(",") if origin.strip()]
+        return value
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -1,46 +1,107 @@
 ﻿# Dependência para usar nas rotas protegidas
+from dataclasses import dataclass
 from typing import Optional
 
 from fastapi.params import Depends
 from jose import JWTError
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 
 from db.database import get_db
+from db.loading import USER_ACCOUNT
 from fastapi import Depends, HTTPException, status
 from models.user import User
-from core.security import decode_access_token
+from core.cache_backend import make_cache
+from core.config import settings
+from core.security import decode_access_token_cached
 from fastapi import Request
 
-def get_current_user(request: Request, db: Session = Depends(get_db)) -> User:
-    # Tenta extrair o token do header Authorization
-    auth = request.headers.get("Authorization")
-    token: Optional[str] = None
-    if auth and auth.lower().startswith("bearer "):
-        token = auth.split(" ", 1)[1].strip()
-    # Fallback: token definido pelo middleware em request.state
-    if not token:
-        token = getattr(request.state, "access_token", None)
-
-    if not token:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Não autenticado")
-
-    try:
-        payload = decode_access_token(token)
-        sub = payload.get("sub")
-    except JWTError:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token Inválido")
+
+# Representação leve do usuário autenticado, suficiente para autorização
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    email: str
+    admin: bool
+
+
+# Principals por subject do token (e-mail), com a tag user:<id>. Invalidado quando o usuário
+# é alterado (em todos os workers, com CACHE_URL).
+principal_cache = make_cache("principal", settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+
+
+def invalidate_principal(user_id: int) -> None:
+    principal_cache.invalidate_tags(f"user:{user_id}")
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_principal_on_change(_mapper, _connection, target: User) -> None:
+    invalidate_principal(target.id)
+
+
+def get_current_principal(request: Request, db: Session = Depends(get_db)) -> Principal:
+    # Resolvido no máximo uma vez por requisição
+    cached = getattr(request.state, "principal", None)
+    if cached is not None:
+        return cached
+
+    # Claims já verificadas pelo AuthMiddleware para o mesmo token
+    payload: Optional[dict] = getattr(request.state, "token_claims", None)
+
+    if payload is None:
+        # Tenta extrair o token do header Authorization
+        auth = request.headers.get("Authorization")
+        token: Optional[str] = None
+        if auth and auth.lower().startswith("bearer "):
+            token = auth.split(" ", 1)[1].strip()
+        # Fallback: token definido pelo middleware em request.state
+        if not token:
+            token = getattr(request.state, "access_token", None)
+
+        if not token:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Não autenticado")
+
+        try:
+            payload = decode_access_token_cached(token)
+        except JWTError:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token Inválido")
+
+    sub = payload.get("sub")
 
     if not sub:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Payload de token inválido")
 
-    user = db.query(User).filter(User.email == sub).first()
+    principal = load_principal(db, sub)
+    request.state.principal = principal
+    return principal
+
+
+def load_principal(db: Session, sub: str) -> Principal:
+    # Principal do subject do token, via cache; 401 se o usuário não existe
+    def load() -> Principal:
+        row = db.query(User.id, User.email, User.admin).filter(User.email == sub).first()
+        # Encerra a leitura: a conexão volta ao pool enquanto a requisição espera a thread do
+        # endpoint. Sem isso, picos de requisições seguram todas as conexões e esgotam o pool.
+        db.rollback()
+        if not row:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuário não encontrado")
+        return Principal(id=row.id, email=row.email, admin=bool(row.admin))
+
+    return principal_cache.get_or_set(sub, load, tags=lambda p: (f"user:{p.id}",))
+
+
+# Dependência para rotas que precisam do registro completo do usuário (ex.: /auth/me)
+def get_current_user(principal: Principal = Depends(get_current_principal), db: Session = Depends(get_db)) -> User:
+    user = db.query(User).options(*USER_ACCOUNT).filter(User.id == principal.id).first()
     if not user:
+        invalidate_principal(principal.id)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuário não encontrado")
 
     return user
 
 # Dependência para usar nas rotas protegidas em que apenas admins podem acessar
-def admin_required(current_user: User = Depends(get_current_user)):
+def admin_required(current_user: Principal = Depends(get_current_principal)):
     if not current_user.admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,190 @@
+# Broker de eventos em processo para o push de placares e agendamentos (routers/events.py).
+# As rotas de escrita publicam depois do commit nos tópicos championship:<id> e game:<id>;
+# cada conexão SSE/WebSocket é um Subscriber com fila limitada. A distribuição roda no event
+# loop (publish de uma thread agenda com call_soon_threadsafe) e o payload é serializado uma
+# vez por evento, não por conexão. Conexão cuja fila enche é descartada: o cliente reconecta
+# com o último id recebido e recebe o que perdeu do buffer de retomada. Com CACHE_URL os
+# eventos passam pelo canal passabola:events do Redis, para chegar aos outros workers.
+import asyncio
+import json
+import logging
+import os
+import threading
+from collections import deque
+from typing import Any, Iterable, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+EVENTS_CHANNEL = "passabola:events"
+
+
+class BrokerFull(Exception):
+    pass
+
+
+class Event:
+    __slots__ = ("seq", "id", "type", "topics", "sse", "text")
+
+    def __init__(self, seq: int, event_id: str, event_type: str, topics: frozenset, data: str):
+        self.seq = seq
+        self.id = event_id
+        self.type = event_type
+        self.topics = topics
+        # Quadro SSE e mensagem WebSocket prontos, compartilhados por todas as conexões
+        self.sse = f"id: {event_id}\nevent: {event_type}\ndata: {data}\n\n"
+        self.text = f'{{"id":"{event_id}","type":"{event_type}","data":{data}}}'
+
+
+class Subscriber:
+    __slots__ = ("topics", "queue", "wakeup", "dropped", "last_seq")
+
+    def __init__(self, topics: frozenset):
+        self.topics = topics
+        self.queue: deque = deque()
+        self.wakeup = asyncio.Event()
+        self.dropped = False
+        self.last_seq = 0
+
+    async def next_events(self, timeout: float) -> list:
+        # Eventos pendentes; lista vazia se nada chegou em timeout (hora do heartbeat)
+        if not self.queue and not self.dropped:
+            self.wakeup.clear()
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
+            except TimeoutError:
+                return []
+        events = list(self.queue)
+        self.queue.clear()
+        return events
+
+
+class Broker:
+    def __init__(self, queue_size: int, replay_size: int, max_subscribers: int):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        # Ids "<epoch>-<seq>": a sequência só vale neste processo
+        self.epoch = f"{os.getpid():x}{id(self) & 0xffff:04x}"
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._replay: deque = deque(maxlen=replay_size)
+        self._topics: dict[str, set] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._bridge = None
+        self.subscribers = 0
+        self.published = 0
+        self.dropped = 0
+
+    def publish(self, event_type: str, data: Any, topics: Iterable[str]) -> None:
+        # Chamado de qualquer thread, depois do commit
+        payload = json.dumps(jsonable_encoder(data), separators=(",", ":"), ensure_ascii=False)
+        topics = list(topics)
+        if self._bridge is not None:
+            try:
+                self._bridge.publish(EVENTS_CHANNEL, json.dumps({"type": event_type, "topics": topics, "data": payload}))
+                return
+            except Exception as exc:
+                logger.warning("eventos: publicação no Redis falhou, entregando só neste worker: %s", exc)
+        self._publish_local(event_type, topics, payload)
+
+    def _publish_local(self, event_type: str, topics: list, payload: str) -> None:
+        with self._lock:
+            self._seq += 1
+            event = Event(self._seq, f"{self.epoch}-{self._seq}", event_type, frozenset(topics), payload)
+            self._replay.append(event)
+            self.published += 1
+            loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._fanout, event)
+
+    def _fanout(self, event: Event) -> None:
+        for topic in event.topics:
+            for sub in tuple(self._topics.get(topic, ())):
+                # last_seq evita duplicar eventos de vários tópicos (e já reenviados na retomada)
+                if sub.dropped or event.seq <= sub.last_seq:
+                    continue
+                if len(sub.queue) >= self.queue_size:
+                    self._drop(sub)
+                    continue
+                sub.queue.append(event)
+                sub.last_seq = event.seq
+                sub.wakeup.set()
+
+    def _drop(self, sub: Subscriber) -> None:
+        sub.dropped = True
+        self._detach(sub)
+        self.dropped += 1
+        sub.wakeup.set()
+
+    def _detach(self, sub: Subscriber) -> None:
+        for topic in sub.topics:
+            subs = self._topics.get(topic)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._topics[topic]
+
+    def subscribe(self, topics: Iterable[str], last_event_id: Optional[str] = None) -> Subscriber:
+        # No event loop. Com last_event_id, a fila começa com os eventos perdidos desde ele,
+        # ou com um evento "reset" se não estão mais no buffer (o cliente recarrega via REST).
+        if self.subscribers >= self.max_subscribers:
+            raise BrokerFull()
+        self._loop = asyncio.get_running_loop()
+        sub = Subscriber(frozenset(topics))
+        with self._lock:
+            if last_event_id:
+                sub.queue.extend(self._missed(last_event_id, sub.topics))
+            for topic in sub.topics:
+                self._topics.setdefault(topic, set()).add(sub)
+            sub.last_seq = self._seq
+        self.subscribers += 1
+        return sub
+
+    def _missed(self, last_event_id: str, topics: frozenset) -> list:
+        epoch, _, seq = last_event_id.rpartition("-")
+        try:
+            last_seq = int(seq)
+        except ValueError:
+            last_seq = -1
+        oldest = self._replay[0].seq if self._replay else self._seq + 1
+        if epoch != self.epoch or last_seq < oldest - 1 or last_seq > self._seq:
+            return [Event(0, f"{self.epoch}-{self._seq}", "reset", frozenset(), "{}")]
+        return [e for e in self._replay if e.seq > last_seq and not topics.isdisjoint(e.topics)]
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        if not sub.dropped:
+            self._detach(sub)
+        self.subscribers -= 1
+
+    def start_bridge(self, client) -> None:
+        # Recebe pelo Redis os eventos publicados por qualquer worker (inclusive este)
+        def on_message(message: dict) -> None:
+            try:
+                event = json.loads(message["data"])
+                self._publish_local(event["type"], event["topics"], event["data"])
+            except (KeyError, TypeError, ValueError):
+                logger.warning("eventos: mensagem inválida no canal %s", EVENTS_CHANNEL)
+
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{EVENTS_CHANNEL: on_message})
+        pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+        self._bridge = client
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": self.subscribers,
+            "topics": len(self._topics),
+            "published": self.published,
+            "dropped": self.dropped,
+            "replay": len(self._replay),
+        }
+
+
+broker = Broker(
+    queue_size=settings.EVENTS_QUEUE_SIZE,
+    replay_size=settings.EVENTS_REPLAY_SIZE,
+    max_subscribers=settings.EVENTS_MAX_SUBSCRIBERS,
+)
@@ -0,0 +1,68 @@
+# Respostas condicionais (ETag / If-None-Match) das rotas de leitura.
+# O ETag combina caminho, query string e uma versão barata de ler (championships.version,
+# incrementada pelas escritas na mesma transação): com o ETag do cliente igual ao atual a
+# rota responde 304 sem montar o payload. Os corpos serializados ficam no cache compartilhado
+# (core/cache_backend.py), indexados pelo próprio ETag; uma versão nova gera outra chave, então
+# não há invalidação.
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from core.cache_backend import make_cache
+from core.config import settings
+
+# Jogos e detalhes mudam com placares ao vivo: o cliente sempre revalida
+REVALIDATE = "private, no-cache"
+LIST_CACHE_CONTROL = f"private, max-age={settings.HTTP_CACHE_LIST_MAX_AGE_SECONDS}"
+
+# HTTP_CACHE_MAX_ENTRIES=0 desativa o cache de corpos
+body_cache = (
+    make_cache("http", settings.HTTP_CACHE_MAX_ENTRIES, settings.HTTP_CACHE_TTL_SECONDS)
+    if settings.HTTP_CACHE_MAX_ENTRIES > 0
+    else None
+)
+
+
+def make_etag(request: Request, *version: Any) -> str:
+    query = sorted(request.query_params.multi_items())
+    raw = repr((request.url.path, query, version)).encode()
+    return '"' + hashlib.blake2b(raw, digest_size=16).hexdigest() + '"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match usa comparação fraca: W/"x" equivale a "x"
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def _headers(etag: str, cache_control: str) -> dict:
+    return {"ETag": etag, "Cache-Control": cache_control}
+
+
+def cached_response(request: Request, etag: str, cache_control: str) -> Optional[Response]:
+    # 304 se o cliente já tem esta versão; senão o corpo em cache, se houver. None: a rota
+    # monta o payload e chama json_response.
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=_headers(etag, cache_control))
+    body = body_cache.get(etag) if body_cache is not None else None
+    if body is not None:
+        return Response(body, media_type="application/json", headers=_headers(etag, cache_control))
+    return None
+
+
+def json_response(etag: str, cache_control: str, payload: Any) -> Response:
+    # Modelos de resposta são serializados direto pelo pydantic-core, como o FastAPI faz com
+    # response_model; outros payloads passam pelo jsonable_encoder. O corpo fica em cache.
+    if isinstance(payload, BaseModel):
+        body = payload.model_dump_json().encode()
+    else:
+        body = JSONResponse(jsonable_encoder(payload)).body
+    if body_cache is not None:
+        body_cache.set(etag, body)
+    return Response(body, media_type="application/json", headers=_headers(etag, cache_control))
@@ -0,0 +1,358 @@
+# Fila de ingestão para picos de cadastros e inscrições (INGEST_ENABLED). Com o header
+# Idempotency-Key, POST /auth/signup e POST /championships/{id}/join só validam o corpo,
+# gravam o pedido num SQLite local (INGEST_QUEUE_PATH, separado do banco principal) e
+# respondem 202 com o id para consulta em GET /requests/{id}. Um worker por processo retira
+# os pedidos em lotes e grava cada lote numa transação só (crud/ingest.py); o resultado é
+# publicado no broker, no tópico request:<id>, para quem espera com ?wait=.
+# A chave vale por escopo (cadastro é anônimo, inscrição é por usuária): repetir a chave com o
+# mesmo corpo devolve o mesmo pedido, sem criar outro; com outro corpo, 422. A senha do
+# cadastro fica no arquivo (criado com permissão 0600) só até o pedido ser processado.
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+
+from core.config import settings
+from core.events import BrokerFull, broker
+from schemas.ingest import IngestRequestOut
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+PROCESSING = "processing"
+DONE = "done"
+FAILED = "failed"
+
+# Pedido em processamento há mais que isso é de um worker que caiu: volta para a fila
+LEASE_SECONDS = 300
+MAINTENANCE_SECONDS = 60
+# Campos que não entram na comparação de corpos da mesma chave (nem ficam após o processamento)
+SECRET_FIELDS = frozenset({"password"})
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ingest_requests (
+    seq INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    scope TEXT NOT NULL,
+    idempotency_key TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    payload TEXT,
+    status TEXT NOT NULL,
+    status_code INTEGER,
+    result TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (scope, idempotency_key)
+);
+CREATE INDEX IF NOT EXISTS ix_ingest_requests_status_seq ON ingest_requests (status, seq);
+"""
+
+_COLUMNS = "id, kind, status, status_code, result, created_at, updated_at, fingerprint"
+
+
+class IngestQueueFull(Exception):
+    pass
+
+
+class IdempotencyConflict(Exception):
+    pass
+
+
+class IngestQueue:
+    # Uma conexão por thread (threadpool das rotas e worker), em autocommit: cada statement é
+    # uma transação. WAL deixa as leituras de status livres durante a gravação de um lote.
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._ready = False
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        with self._schema_lock:
+            if not self._ready:
+                # O SQLite cria -wal e -shm com as permissões do arquivo principal
+                os.close(os.open(self.path, os.O_CREAT | os.O_WRONLY, 0o600))
+        conn = sqlite3.connect(self.path, timeout=settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+                               isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        # 202 é a promessa de que o pedido não se perde: fsync a cada commit
+        conn.execute("PRAGMA synchronous=FULL")
+        with self._schema_lock:
+            if not self._ready:
+                conn.executescript(_SCHEMA)
+                self._ready = True
+        self._local.conn = conn
+        return conn
+
+    def submit(self, kind: str, scope: str, key: str, payload: dict, fingerprint: str) -> tuple[sqlite3.Row, bool]:
+        # (pedido, criado agora?). Mesma chave com outro corpo: IdempotencyConflict
+        conn = self._conn()
+        row = conn.execute(
+            f"SELECT {_COLUMNS} FROM ingest_requests WHERE scope = ? AND idempotency_key = ?", (scope, key)
+        ).fetchone()
+        created = False
+        if row is None:
+            if self.pending(conn) >= settings.INGEST_MAX_PENDING:
+                raise IngestQueueFull()
+            now = time.time()
+            row = conn.execute(
+                "INSERT INTO ingest_requests (id, scope, idempotency_key, kind, fingerprint, payload, status,"
+                " created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                f" ON CONFLICT (scope, idempotency_key) DO NOTHING RETURNING {_COLUMNS}",
+                (secrets.token_urlsafe(16), scope, key, kind, fingerprint, json.dumps(payload), PENDING, now, now),
+            ).fetchone()
+            created = row is not None
+            if row is None:
+                # Outra requisição com a mesma chave gravou entre a leitura e o INSERT
+                row = conn.execute(
+                    f"SELECT {_COLUMNS} FROM ingest_requests WHERE scope = ? AND idempotency_key = ?", (scope, key)
+                ).fetchone()
+        if row["kind"] != kind or row["fingerprint"] != fingerprint:
+            raise IdempotencyConflict()
+        return row, created
+
+    def pending(self, conn: Optional[sqlite3.Connection] = None) -> int:
+        # Limitado a INGEST_MAX_PENDING: só interessa saber se a fila passou do limite
+        conn = conn or self._conn()
+        return conn.execute(
+            "SELECT count(*) FROM (SELECT 1 FROM ingest_requests WHERE status IN (?, ?) LIMIT ?)",
+            (PENDING, PROCESSING, settings.INGEST_MAX_PENDING),
+        ).fetchone()[0]
+
+    def get(self, request_id: str) -> Optional[sqlite3.Row]:
+        return self._conn().execute(f"SELECT {_COLUMNS} FROM ingest_requests WHERE id = ?", (request_id,)).fetchone()
+
+    def claim(self, limit: int) -> list[sqlite3.Row]:
+        # Retira até `limit` pedidos, na ordem de chegada; o UPDATE é atômico entre processos
+        rows = self._conn().execute(
+            "UPDATE ingest_requests SET status = ?, attempts = attempts + 1, updated_at = ?"
+            " WHERE seq IN (SELECT seq FROM ingest_requests WHERE status = ? ORDER BY seq LIMIT ?)"
+            " RETURNING seq, id, kind, payload",
+            (PROCESSING, time.time(), PENDING, limit),
+        ).fetchall()
+        return sorted(rows, key=lambda r: r["seq"])
+
+    def complete(self, results: dict[str, tuple[int, dict]]) -> None:
+        # Grava os resultados de um lote numa transação e apaga os payloads
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "UPDATE ingest_requests SET status = ?, status_code = ?, result = ?, payload = NULL, updated_at = ?"
+                " WHERE id = ?",
+                [(DONE if code < 400 else FAILED, code, json.dumps(body), now, request_id)
+                 for request_id, (code, body) in results.items()],
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def release(self, request_ids: list[str], max_attempts: int) -> list[str]:
+        # Lote que falhou: os pedidos voltam para a fila, exceto os que já esgotaram as
+        # tentativas, que terminam com 500. Retorna os ids encerrados.
+        now = time.time()
+        conn = self._conn()
+        marks = ",".join("?" * len(request_ids))
+        failed = [r[0] for r in conn.execute(
+            "UPDATE ingest_requests SET status = ?, status_code = 500, result = ?, payload = NULL, updated_at = ?"
+            f" WHERE id IN ({marks}) AND status = ? AND attempts >= ? RETURNING id",
+            (FAILED, json.dumps({"detail": "Request processing failed"}), now, *request_ids, PROCESSING, max_attempts),
+        ).fetchall()]
+        conn.execute(
+            f"UPDATE ingest_requests SET status = ?, updated_at = ? WHERE id IN ({marks}) AND status = ?",
+            (PENDING, now, *request_ids, PROCESSING),
+        )
+        return failed
+
+    def maintain(self, result_ttl: float) -> None:
+        # Devolve à fila os pedidos de workers que caíram e apaga os concluídos há mais de result_ttl
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "UPDATE ingest_requests SET status = ?, updated_at = ? WHERE status = ? AND updated_at < ?",
+            (PENDING, now, PROCESSING, now - LEASE_SECONDS),
+        )
+        conn.execute(
+            "DELETE FROM ingest_requests WHERE status IN (?, ?) AND updated_at < ?", (DONE, FAILED, now - result_ttl)
+        )
+
+    def stats(self) -> dict:
+        counts = dict(self._conn().execute("SELECT status, count(*) FROM ingest_requests GROUP BY status").fetchall())
+        return {f"queue_{s}": counts.get(s, 0) for s in (PENDING, PROCESSING, DONE, FAILED)}
+
+
+class IngestWorker:
+    # Thread que grava os pedidos em lotes. Acordada a cada pedido novo deste processo e, para
+    # os de outros processos, a cada INGEST_POLL_SECONDS. Depois de acordar espera
+    # INGEST_LINGER_MS, para que os pedidos de um pico entrem no mesmo lote (group commit).
+    def __init__(self, queue: IngestQueue):
+        self.queue = queue
+        self._processors: dict[str, Callable[[list], dict]] = {}
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.batches = 0
+        self.processed = 0
+        self.errors = 0
+
+    def start(self, processors: dict[str, Callable[[list], dict]]) -> None:
+        self._processors = processors
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ingest-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 30) -> None:
+        # Termina o lote em andamento; o que não terminar a tempo volta para a fila (LEASE_SECONDS)
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    def _run(self) -> None:
+        last_maintenance = 0.0
+        while not self._stop.is_set():
+            try:
+                if time.monotonic() - last_maintenance >= MAINTENANCE_SECONDS:
+                    self.queue.maintain(settings.INGEST_RESULT_TTL_SECONDS)
+                    last_maintenance = time.monotonic()
+                batch = self.queue.claim(settings.INGEST_BATCH_SIZE)
+            except sqlite3.Error:
+                logger.exception("ingestão: falha ao ler a fila %s", self.queue.path)
+                self._stop.wait(settings.INGEST_POLL_SECONDS)
+                continue
+            if batch:
+                self._process(batch)
+                continue
+            if self._wakeup.wait(settings.INGEST_POLL_SECONDS):
+                self._wakeup.clear()
+                self._stop.wait(settings.INGEST_LINGER_MS / 1000)
+
+    def _process(self, batch: list[sqlite3.Row]) -> None:
+        by_kind: dict[str, list] = {}
+        for row in batch:
+            by_kind.setdefault(row["kind"], []).append(row)
+        for kind, rows in by_kind.items():
+            ids = [row["id"] for row in rows]
+            # Se o processo cair entre o commit no banco e o complete(), o lote é refeito: a
+            # unicidade do e-mail e da inscrição impede duplicatas (a repetição sai como recusa)
+            try:
+                results = self._processors[kind]([(row["id"], json.loads(row["payload"])) for row in rows])
+                self.queue.complete(results)
+            except Exception:
+                self.errors += 1
+                logger.exception("ingestão: lote de %d pedidos %s falhou", len(rows), kind)
+                try:
+                    finished = self.queue.release(ids, settings.INGEST_MAX_ATTEMPTS)
+                except sqlite3.Error:
+                    logger.exception("ingestão: falha ao devolver o lote à fila")
+                    continue
+                for request_id in finished:
+                    broker.publish("request", {"id": request_id, "status": FAILED}, [f"request:{request_id}"])
+                continue
+            self.batches += 1
+            self.processed += len(results)
+            for request_id, (code, _body) in results.items():
+                broker.publish(
+                    "request", {"id": request_id, "status": DONE if code < 400 else FAILED, "status_code": code},
+                    [f"request:{request_id}"],
+                )
+
+    def stats(self) -> dict:
+        return {"batches": self.batches, "processed": self.processed, "errors": self.errors}
+
+
+ingest_queue = IngestQueue(settings.INGEST_QUEUE_PATH)
+ingest_worker = IngestWorker(ingest_queue)
+
+
+def _fingerprint(kind: str, payload: dict) -> str:
+    public = {k: v for k, v in payload.items() if k not in SECRET_FIELDS}
+    return hashlib.sha256(json.dumps([kind, public], sort_keys=True).encode()).hexdigest()
+
+
+def _timestamp(value: float) -> datetime:
+    return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None)
+
+
+def to_out(row: sqlite3.Row) -> IngestRequestOut:
+    return IngestRequestOut(
+        id=row["id"],
+        kind=row["kind"],
+        status=row["status"],
+        status_code=row["status_code"],
+        result=json.loads(row["result"]) if row["result"] else None,
+        created_at=_timestamp(row["created_at"]),
+        updated_at=_timestamp(row["updated_at"]),
+    )
+
+
+def accept(kind: str, scope: str, key: str, payload: dict) -> JSONResponse:
+    # Síncrono (SQLite local): rotas async chamam via run_in_threadpool. 202 enquanto o pedido
+    # está na fila; uma repetição depois de processado recebe 200 com o resultado.
+    try:
+        row, created = ingest_queue.submit(kind, scope, key, payload, _fingerprint(kind, payload))
+    except IngestQueueFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Ingest queue is full, try again later",
+            headers={"Retry-After": "1"},
+        )
+    except IdempotencyConflict:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="Idempotency-Key already used with a different request",
+        )
+    if created:
+        ingest_worker.notify()
+    finished = row["status"] in (DONE, FAILED)
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if finished else status.HTTP_202_ACCEPTED,
+        content=to_out(row).model_dump(mode="json"),
+        headers={"Location": f"/requests/{row['id']}"},
+    )
+
+
+async def wait_finished(request_id: str, timeout: float) -> Optional[sqlite3.Row]:
+    # Espera o resultado pelo broker (acorda assim que o worker publica) e relê a fila a cada
+    # INGEST_POLL_SECONDS, para pedidos processados por outro worker sem Redis
+    try:
+        sub = broker.subscribe([f"request:{request_id}"])
+    except BrokerFull:
+        sub = None
+    deadline = time.monotonic() + timeout
+    try:
+        while True:
+            row = await run_in_threadpool(ingest_queue.get, request_id)
+            remaining = deadline - time.monotonic()
+            if row is None or row["status"] in (DONE, FAILED) or remaining <= 0:
+                return row
+            if sub is not None:
+                await sub.next_events(min(remaining, settings.INGEST_POLL_SECONDS))
+            else:
+                await asyncio.sleep(min(remaining, settings.INGEST_POLL_SECONDS))
+    finally:
+        if sub is not None:
+            broker.unsubscribe(sub)
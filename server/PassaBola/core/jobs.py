@@ -0,0 +1,353 @@
+# Jobs em segundo plano para as operações administrativas pesadas (fechamento de inscrições,
+# recálculos, exportações). A tabela jobs é ao mesmo tempo fila e registro: a rota grava o job
+# (queued) e responde 202 com o id, e GET /jobs/{id} mostra status, progresso e resultado.
+# Em cada processo com JOBS_WORKERS > 0, um despachante retira os jobs com um UPDATE
+# condicional, então vários processos dividem a mesma tabela sem broker externo. Os jobs rodam
+# num pool próprio, fora do threadpool das rotas. Os handlers são registrados por tipo com
+# register(), no módulo da rota que os enfileira.
+#
+# O handler só escreve no banco dentro da própria transação (no SQLite ela pode segurar o lock
+# de escrita). Progresso e cancelamento ficam na memória do processo: o despachante grava o
+# progresso e lê os pedidos de cancelamento a cada JOBS_POLL_SECONDS, junto com o heartbeat.
+# ctx.progress()/ctx.check() marcam os pontos em que o handler pode parar. Ali o cancelamento
+# levanta JobCancelled, e a transação do handler é desfeita.
+# JobError é falha definitiva (entrada inválida). As demais exceções são tentadas de novo até
+# max_attempts, com espera exponencial (run_after).
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable, Optional
+
+from fastapi import status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from db.database import SessionLocal, utcnow
+from models.job import Job
+from schemas.job import JobOut
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+MAINTENANCE_SECONDS = 60
+# Tentativas de gravar o fim de um job quando o banco está ocupado
+FINISH_ATTEMPTS = 3
+
+
+class JobError(Exception):
+    # Falha definitiva, sem nova tentativa; a mensagem vai para jobs.error
+    pass
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobContext:
+    def __init__(self, job_id: int, kind: str, params: dict, attempt: int, max_attempts: int):
+        self.job_id = job_id
+        self.kind = kind
+        self.params = params
+        self.attempt = attempt
+        self.max_attempts = max_attempts
+        self.done = 0
+        self.total: Optional[int] = None
+        self.message: Optional[str] = None
+        self.dirty = False
+        self.cancel_requested = False
+        # Parada do processo: o job volta para a fila em vez de terminar como cancelado
+        self.interrupted = False
+
+    def check(self) -> None:
+        if self.cancel_requested or self.interrupted:
+            raise JobCancelled()
+
+    def progress(self, done: int, total: Optional[int] = None, message: Optional[str] = None) -> None:
+        self.done = done
+        if total is not None:
+            self.total = total
+        if message is not None:
+            self.message = message
+        self.dirty = True
+        self.check()
+
+    def output_path(self, suffix: str) -> Path:
+        directory = Path(settings.JOBS_OUTPUT_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        return directory / f"job-{self.job_id}.{suffix}"
+
+
+def output_files(job_id: int) -> list[Path]:
+    directory = Path(settings.JOBS_OUTPUT_DIR)
+    return list(directory.glob(f"job-{job_id}.*")) if directory.is_dir() else []
+
+
+_handlers: dict[str, Callable[[JobContext], Optional[dict]]] = {}
+
+
+def register(kind: str, handler: Callable[[JobContext], Optional[dict]]) -> None:
+    _handlers[kind] = handler
+
+
+class JobRunner:
+    def __init__(self):
+        self.workers = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._running: dict[int, JobContext] = {}
+        self._counts = {"started": 0, SUCCEEDED: 0, FAILED: 0, CANCELLED: 0, "retried": 0}
+
+    def start(self, workers: int) -> None:
+        if workers <= 0:
+            return
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._dispatch, name="job-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 30) -> None:
+        # Os jobs em andamento param no próximo checkpoint e voltam para a fila
+        self._stop.set()
+        self._wakeup.set()
+        with self._lock:
+            for ctx in self._running.values():
+                ctx.interrupted = True
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._executor is not None:
+            deadline = time.monotonic() + timeout
+            while self._running and time.monotonic() < deadline:
+                time.sleep(0.1)
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self.workers = 0
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    def request_cancel(self, job_id: int) -> None:
+        with self._lock:
+            ctx = self._running.get(job_id)
+            if ctx is not None:
+                ctx.cancel_requested = True
+
+    def local(self, job_id: int) -> Optional[JobContext]:
+        return self._running.get(job_id)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] += 1
+
+    def _dispatch(self) -> None:
+        last_maintenance = 0.0
+        while not self._stop.is_set():
+            try:
+                self._sync()
+                if time.monotonic() - last_maintenance >= MAINTENANCE_SECONDS:
+                    self._maintain()
+                    last_maintenance = time.monotonic()
+                while len(self._running) < self.workers and not self._stop.is_set():
+                    ctx = self._claim()
+                    if ctx is None:
+                        break
+                    with self._lock:
+                        self._running[ctx.job_id] = ctx
+                    self._executor.submit(self._run, ctx)
+            except DBAPIError as exc:
+                # Ex.: SQLite com o lock de escrita ocupado por um job longo; tenta no próximo ciclo
+                logger.warning("jobs: banco indisponível para o despachante: %s", exc)
+            except Exception:
+                logger.exception("jobs: falha no despachante")
+            self._wakeup.wait(settings.JOBS_POLL_SECONDS)
+            self._wakeup.clear()
+
+    def _sync(self) -> None:
+        # Heartbeat e progresso dos jobs deste processo; traz os pedidos de cancelamento
+        with self._lock:
+            contexts = list(self._running.values())
+        if not contexts:
+            return
+        now = utcnow()
+        with SessionLocal() as db:
+            for ctx in contexts:
+                values = {"heartbeat_at": now}
+                if ctx.dirty:
+                    values.update(progress=ctx.done, total=ctx.total, message=ctx.message)
+                db.execute(update(Job).where(Job.id == ctx.job_id, Job.status == RUNNING).values(**values))
+            cancelled = set(db.execute(
+                select(Job.id).where(Job.id.in_([ctx.job_id for ctx in contexts]), Job.cancel_requested.is_(True))
+            ).scalars())
+            db.commit()
+        for ctx in contexts:
+            ctx.dirty = False
+            if ctx.job_id in cancelled:
+                ctx.cancel_requested = True
+
+    def _claim(self) -> Optional[JobContext]:
+        # SELECT do candidato + UPDATE condicional: se outro processo levou o job, tenta o próximo
+        while _handlers:
+            now = utcnow()
+            with SessionLocal() as db:
+                job = db.execute(
+                    select(Job.id, Job.kind, Job.params, Job.attempts, Job.max_attempts)
+                    .where(
+                        Job.status == QUEUED,
+                        or_(Job.run_after.is_(None), Job.run_after <= now),
+                        Job.kind.in_(list(_handlers)),
+                    )
+                    .order_by(Job.id)
+                    .limit(1)
+                ).first()
+                if job is None:
+                    return None
+                claimed = db.execute(
+                    update(Job)
+                    .where(Job.id == job.id, Job.status == QUEUED)
+                    .values(status=RUNNING, attempts=Job.attempts + 1, started_at=now, heartbeat_at=now)
+                ).rowcount
+                db.commit()
+            if claimed:
+                return JobContext(job.id, job.kind, job.params or {}, job.attempts + 1, job.max_attempts)
+        return None
+
+    def _run(self, ctx: JobContext) -> None:
+        self._count("started")
+        try:
+            result = _handlers[ctx.kind](ctx)
+        except JobCancelled:
+            if ctx.interrupted and not ctx.cancel_requested:
+                self._finish(ctx, QUEUED, requeue=True)
+            else:
+                self._finish(ctx, CANCELLED)
+        except JobError as e:
+            self._finish(ctx, FAILED, error=str(e))
+        except Exception as e:
+            logger.exception("jobs: job %d (%s) falhou na tentativa %d", ctx.job_id, ctx.kind, ctx.attempt)
+            error = f"{type(e).__name__}: {e}"
+            if ctx.attempt < ctx.max_attempts:
+                self._finish(ctx, QUEUED, error=error, run_after=utcnow() + timedelta(seconds=2 ** ctx.attempt))
+            else:
+                self._finish(ctx, FAILED, error=error)
+        else:
+            if ctx.total is not None:
+                ctx.done = ctx.total
+            self._finish(ctx, SUCCEEDED, result=jsonable_encoder(result))
+        finally:
+            with self._lock:
+                self._running.pop(ctx.job_id, None)
+            self._wakeup.set()
+
+    def _finish(self, ctx: JobContext, new_status: str, result=None, error: Optional[str] = None,
+                run_after=None, requeue: bool = False) -> None:
+        values = {
+            "status": new_status,
+            "progress": ctx.done,
+            "total": ctx.total,
+            "message": ctx.message,
+            "result": result,
+            "error": error,
+        }
+        if new_status in FINISHED:
+            values["finished_at"] = utcnow()
+        else:
+            values["run_after"] = run_after
+            if requeue:
+                # Interrompido pela parada do processo: a tentativa não conta
+                values["attempts"] = Job.attempts - 1
+        for attempt in range(FINISH_ATTEMPTS):
+            try:
+                with SessionLocal() as db:
+                    db.execute(update(Job).where(Job.id == ctx.job_id, Job.status == RUNNING).values(**values))
+                    db.commit()
+                break
+            except DBAPIError:
+                # Sem registro o job fica running e volta para a fila pelo lease (JOBS_LEASE_SECONDS)
+                logger.warning("jobs: falha ao gravar o fim do job %d", ctx.job_id, exc_info=attempt == FINISH_ATTEMPTS - 1)
+                time.sleep(1)
+        self._count("retried" if new_status == QUEUED else new_status)
+
+    def _maintain(self) -> None:
+        # Jobs running sem heartbeat há JOBS_LEASE_SECONDS são de um worker que caiu: voltam
+        # para a fila, ou falham se esgotaram as tentativas. Jobs concluídos há mais de
+        # JOBS_RETENTION_SECONDS são apagados junto com seus arquivos.
+        now = utcnow()
+        stale = [
+            Job.status == RUNNING,
+            Job.heartbeat_at < now - timedelta(seconds=settings.JOBS_LEASE_SECONDS),
+            Job.id.not_in(list(self._running)),
+        ]
+        with SessionLocal() as db:
+            db.execute(
+                update(Job).where(*stale, Job.attempts < Job.max_attempts)
+                .values(status=QUEUED, error="Worker stopped responding")
+            )
+            db.execute(update(Job).where(*stale).values(status=FAILED, error="Worker stopped responding", finished_at=now))
+            expired = db.execute(
+                select(Job.id).where(
+                    Job.status.in_(FINISHED),
+                    Job.finished_at < now - timedelta(seconds=settings.JOBS_RETENTION_SECONDS),
+                )
+            ).scalars().all()
+            if expired:
+                db.execute(delete(Job).where(Job.id.in_(expired)))
+            db.commit()
+        for job_id in expired:
+            for path in output_files(job_id):
+                path.unlink(missing_ok=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"workers": self.workers, "running": len(self._running), **self._counts}
+
+
+job_runner = JobRunner()
+
+
+def submit(db: Session, kind: str, params: dict, created_by: Optional[int] = None) -> Job:
+    job = Job(
+        kind=kind,
+        status=QUEUED,
+        params=jsonable_encoder(params),
+        created_by=created_by,
+        max_attempts=settings.JOBS_MAX_ATTEMPTS,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    job_runner.notify()
+    return job
+
+
+def to_out(job: Job) -> JobOut:
+    out = JobOut.model_validate(job)
+    # Progresso ainda não gravado pelo despachante, se o job roda neste processo
+    ctx = job_runner.local(job.id)
+    if ctx is not None and job.status == RUNNING:
+        out.progress, out.total, out.message = ctx.done, ctx.total, ctx.message
+    return out
+
+
+def accepted(job: Job) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=to_out(job).model_dump(mode="json"),
+        headers={"Location": f"/jobs/{job.id}"},
+    )
@@ -0,0 +1,281 @@
+# Instrumentação do processo, exposta em GET /metrics (formato de texto do Prometheus).
+# MetricsMiddleware mede cada requisição HTTP (latência por rota, em andamento) e deixa num
+# ContextVar um RequestStats; os hooks do SQLAlchemy (instrument_engine) somam nele os
+# statements e o tempo de banco da requisição e registram as consultas lentas com a
+# rota de origem. As rotas entram como o template do caminho ("/games/{game_id}"), para o
+# número de séries não crescer com os ids. Os valores são do processo: com vários workers,
+# cada um expõe os seus.
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Iterable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "passabola_"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Requisição sem rota (404) e statements fora de requisição (CLI, migrações, threads)
+UNMATCHED = "unmatched"
+NO_REQUEST = "-"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = (), lock: Optional[threading.Lock] = None):
+        self.name = PREFIX + name
+        self.help = help
+        self.label_names = tuple(labels)
+        # Métricas atualizadas sempre juntas podem dividir o lock (ver _record_request)
+        self._lock = lock or threading.Lock()
+        self._values: dict = {}
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self._lock:
+            self._inc(labels, amount)
+
+    def _inc(self, labels: tuple, amount: float) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [f"{self.name}{_labels(self.label_names, k)} {_number(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Iterable[str] = (),
+        buckets: tuple = LATENCY_BUCKETS,
+        lock: Optional[threading.Lock] = None,
+    ):
+        super().__init__(name, help, labels, lock)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels) -> None:
+        with self._lock:
+            self._observe(value, labels)
+
+    def _observe(self, value: float, labels: tuple) -> None:
+        # Contagem por faixa (não cumulativa) + soma + total; acumulada só na exposição
+        entry = self._values.get(labels)
+        if entry is None:
+            entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = [(k, (list(v[0]), v[1], v[2])) for k, v in self._values.items()]
+        lines = self.header()
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {count}")
+        return lines
+
+
+# As métricas de requisição são gravadas juntas, com um lock só, no fim de cada requisição
+_request_lock = threading.Lock()
+requests_total = Counter(
+    "http_requests_total", "Requisições HTTP concluídas", ("method", "route", "status"), lock=_request_lock,
+)
+request_seconds = Histogram(
+    "http_request_duration_seconds", "Latência das requisições HTTP (até o fim da resposta)", ("method", "route"),
+    lock=_request_lock,
+)
+requests_in_flight = Gauge(
+    "http_requests_in_flight", "Requisições HTTP em andamento (inclui conexões SSE abertas)", lock=_request_lock,
+)
+request_statements = Histogram(
+    "http_request_db_statements", "Statements SQL por requisição", ("method", "route"), buckets=COUNT_BUCKETS,
+    lock=_request_lock,
+)
+request_db_seconds = Histogram(
+    "http_request_db_seconds", "Tempo em statements SQL por requisição", ("method", "route"), lock=_request_lock,
+)
+statement_seconds = Histogram("db_statement_duration_seconds", "Duração dos statements SQL", ("route",), buckets=STATEMENT_BUCKETS)
+statement_rows = Counter(
+    "db_rows_total", "Linhas informadas pelo driver (rowcount: afetadas; no PostgreSQL também as lidas)", ("route",),
+)
+slow_statements = Counter("db_slow_statements_total", "Statements acima de SLOW_QUERY_MS", ("route",))
+
+METRICS = [
+    requests_total, request_seconds, requests_in_flight, request_statements, request_db_seconds, statement_seconds,
+    statement_rows, slow_statements,
+]
+
+# Coletores chamados a cada exposição, para valores que já são mantidos em outro lugar
+# (caches, pool, broker): cada um retorna linhas no formato de texto
+_collectors: list[Callable[[], Iterable[str]]] = []
+
+
+def register_collector(collector: Callable[[], Iterable[str]]) -> None:
+    _collectors.append(collector)
+
+
+def render() -> str:
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    for collector in _collectors:
+        try:
+            lines.extend(collector())
+        except Exception:
+            logger.exception("métricas: coletor %s falhou", getattr(collector, "__name__", collector))
+    return "\n".join(lines) + "\n"
+
+
+def samples(name: str, kind: str, help: str, values: Iterable[tuple[dict, float]]) -> list[str]:
+    # Linhas de uma métrica calculada por um coletor: values é [(labels, valor)]
+    name = PREFIX + name
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    for labels, value in values:
+        lines.append(f"{name}{_labels(tuple(labels), tuple(labels.values()))} {_number(value)}")
+    return lines
+
+
+class RequestStats:
+    __slots__ = ("scope", "statements", "seconds")
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.statements = 0
+        self.seconds = 0.0
+
+
+# Mutável e compartilhado: as rotas síncronas rodam no threadpool com uma cópia do contexto,
+# mas somam no mesmo objeto
+_current: ContextVar[Optional[RequestStats]] = ContextVar("passabola_request_stats", default=None)
+
+
+def route_label(scope: dict) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = _current.set(stats)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        with _request_lock:
+            requests_in_flight._inc((), 1)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _current.reset(token)
+            _record_request(scope["method"], route_label(scope), str(status_code), elapsed, stats)
+
+
+def _record_request(method: str, route: str, status: str, elapsed: float, stats: RequestStats) -> None:
+    labels = (method, route)
+    with _request_lock:
+        requests_in_flight._inc((), -1)
+        requests_total._inc((method, route, status), 1)
+        request_seconds._observe(elapsed, labels)
+        request_statements._observe(stats.statements, labels)
+        request_db_seconds._observe(stats.seconds, labels)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_metrics_start", None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    rows = cursor.rowcount if cursor.rowcount and cursor.rowcount > 0 else 0
+
+    stats = _current.get()
+    if stats is None:
+        route = NO_REQUEST
+    else:
+        route = route_label(stats.scope)
+        stats.statements += 1
+        stats.seconds += elapsed
+    statement_seconds.observe(elapsed, route)
+    if rows:
+        statement_rows.inc(route, amount=rows)
+
+    if settings.SLOW_QUERY_MS and elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        slow_statements.inc(route)
+        origin = f"{stats.scope['method']} {route}" if stats is not None else NO_REQUEST
+        logger.warning(
+            "consulta lenta (%.1f ms%s) em %s: %s",
+            elapsed * 1000, ", executemany" if executemany else "", origin, " ".join(statement.split())[:1000],
+        )
+
+
+def instrument_engine(engine: Engine) -> None:
+    # Para o AsyncEngine, passe async_engine.sync_engine
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -1,14 +1,24 @@
-﻿from datetime import datetime, timedelta, timezone
-from typing import Optional
+﻿import asyncio
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
 
 from jose import jwt
 from passlib.context import CryptContext
 
-# Hashing das senhas
+from core.cache import TTLCache
+from core.config import settings
+
+# Hashing das senhas. min_rounds == default_rounds faz com que hashes antigos (menos
+# rounds ou outro esquema) sejam marcados por needs_update e refeitos no login.
 pwd_context = CryptContext(
     schemes=["pbkdf2_sha256"],
     deprecated="auto",
-    pbkdf2_sha256__default_rounds=310_000,
+    pbkdf2_sha256__default_rounds=settings.PASSWORD_HASH_ROUNDS,
+    pbkdf2_sha256__min_rounds=settings.PASSWORD_HASH_ROUNDS,
 )
 
 def get_password_hash(password: str) -> str:
@@ -19,6 +29,53 @@ def verify_password(plain_password: str, password_hash: str) -> bool:
     return pwd_context.verify(plain_password, password_hash)
 
 
+class PasswordHasherBusy(Exception):
+    pass
+
+
+class PasswordHasher:
+    # Executa hash/verificação fora do event loop e do threadpool das rotas, em um pool
+    # próprio. O PBKDF2 do hashlib libera o GIL, então threads já rodam em paralelo.
+    # Com mais de max_pending operações em andamento/na fila, novas chamadas falham
+    # imediatamente com PasswordHasherBusy (a rota responde 429).
+    def __init__(self, max_workers: int, max_pending: int):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    async def _run(self, fn: Callable, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy()
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # Libera a vaga só quando o trabalho termina, mesmo se a requisição for cancelada
+        future.add_done_callback(lambda _: self._slots.release())
+        return await asyncio.wrap_future(future)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(pwd_context.hash, password)
+
+    async def verify_and_update(self, plain_password: str, password_hash: str) -> tuple[bool, Optional[str]]:
+        # Retorna (válida, novo_hash); novo_hash != None quando o hash deve ser atualizado
+        return await self._run(pwd_context.verify_and_update, plain_password, password_hash)
+
+    def hash_many(self, passwords: list[str]) -> list[str]:
+        # Síncrono, para o worker de ingestão: divide o lote pelo mesmo pool, sem o limite
+        # de fila das rotas (a própria fila de ingestão limita o que chega aqui)
+        return list(self._executor.map(pwd_context.hash, passwords))
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+
 SECRET_KEY = "SEGREDO_SUPER_SECRETO_DO_PASSA_A_BOLA"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 120
@@ -33,3 +90,21 @@ def create_access_token(subject: str, expires_delta: Optional[timedelta] = None)
 
 def decode_access_token(token: str) -> dict:
     return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+
+# Tokens já verificados, indexados pelo hash do token e válidos no máximo até o exp.
+# Evita refazer a verificação HMAC quando o mesmo bearer token é reapresentado.
+verified_token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_MAX_ENTRIES, ttl=settings.TOKEN_CACHE_TTL_SECONDS)
+
+
+def decode_access_token_cached(token: str) -> dict:
+    key = hashlib.sha256(token.encode()).digest()
+    payload = verified_token_cache.get(key)
+    if payload is not None:
+        return payload
+
+    payload = decode_access_token(token)
+    exp = payload.get("exp")
+    if exp is not None:
+        verified_token_cache.set(key, payload, ttl=float(exp) - time.time())
+    return payload
@@ -1,14 +1,25 @@
+from typing import TYPE_CHECKING, Optional
+
+from sqlalchemy import and_, delete, func, or_, select, update
 from sqlalchemy.orm import Session
+from db.database import dialect_insert, utcnow
 from models.championship import Championship
+from models.championship_list_version import LIST_VERSION_ID, ChampionshipListVersion
+from models.championship_waitlist import ChampionshipWaitlist
 from models.user_championship import UserChampionship
 from schemas.championship import createChampionship
+from crud.pagination import InvalidCursor, cached_total, cached_total_async, decode_cursor
 
 from models import user_championship
 
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
 
 def create_championship(db: Session, data: createChampionship):
-    championship = Championship(number_players=data.number_players, name=data.name)
+    championship = Championship(number_players=data.number_players, name=data.name, max_participants=data.max_participants)
     db.add(championship)
+    bump_list_version(db)
     db.commit()
     db.refresh(championship)
     return championship
@@ -18,3 +29,352 @@ def list_championships(db: Session):
 
 def list_user_championships(db: Session, user_id: int):
     return db.query(Championship).join(user_championship).filter(UserChampionship.user_id == user_id).all()
+
+def participants_count_subquery():
+    # Subquery correlacionada: conta os inscritos da linha de Championship externa
+    return (
+        select(func.count())
+        .select_from(UserChampionship)
+        .where(UserChampionship.championship_id == Championship.id)
+        .correlate(Championship)
+        .scalar_subquery()
+    )
+
+def supports_window_functions(dialect) -> bool:
+    # SQLite só suporta funções de janela a partir da 3.25
+    if dialect.name != "sqlite":
+        return True
+    return (dialect.server_version_info or (0,)) >= (3, 25)
+
+def _filter_championships(stmt, status: Optional[str] = None, q: Optional[str] = None):
+    if q:
+        stmt = stmt.where(Championship.name.ilike(f"%{q}%"))
+
+    if status == "open":
+        stmt = stmt.where(Championship.is_closed == False)  # noqa: E712
+    elif status:
+        stmt = stmt.where(Championship.is_closed == True)  # noqa: E712
+
+    return stmt
+
+def _with_count_columns():
+    return select(
+        Championship.id,
+        Championship.name,
+        Championship.number_players,
+        Championship.is_closed,
+        Championship.participants_count,
+        Championship.max_participants,
+    )
+
+# Os builders abaixo são compartilhados pelas rotas síncronas (Session) e assíncronas (AsyncSession)
+
+def championship_page_query(status: Optional[str], q: Optional[str], page: int, page_size: int, with_total: bool):
+    # Página de campeonatos com a contagem de inscritos (coluna desnormalizada).
+    # Com with_total, o total vem na mesma consulta via COUNT(*) OVER ().
+    stmt = _filter_championships(_with_count_columns(), status=status, q=q)
+    if with_total:
+        stmt = stmt.add_columns(func.count().over().label("total"))
+    return stmt.order_by(Championship.id.asc()).offset((page - 1) * page_size).limit(page_size)
+
+def championship_keyset_query(status: Optional[str], q: Optional[str], after: Optional[str], page_size: int):
+    # Página seguinte ao cursor (id do último campeonato recebido)
+    stmt = _filter_championships(_with_count_columns(), status=status, q=q)
+    if after:
+        (last_id,) = decode_cursor(after, 1)
+        if not isinstance(last_id, int):
+            raise InvalidCursor("Cursor inválido")
+        stmt = stmt.where(Championship.id > last_id)
+    return stmt.order_by(Championship.id.asc()).limit(page_size)
+
+def championship_total_query(status: Optional[str], q: Optional[str]):
+    return _filter_championships(select(func.count()).select_from(Championship), status=status, q=q)
+
+def championship_with_count_query(championship_id: int):
+    return _with_count_columns().where(Championship.id == championship_id)
+
+def version_query(championship_id: int):
+    # Validador dos ETags do campeonato e dos seus jogos (None se não existe)
+    return select(Championship.version).where(Championship.id == championship_id)
+
+def list_version_query():
+    # Validador da listagem (ver bump_list_version)
+    return select(ChampionshipListVersion.version).where(ChampionshipListVersion.id == LIST_VERSION_ID)
+
+def bump_version(db: Session, championship_id: int) -> None:
+    # Sem commit: a versão muda na mesma transação da escrita
+    db.execute(
+        update(Championship)
+        .where(Championship.id == championship_id)
+        .values(version=Championship.version + 1)
+    )
+
+def bump_list_version(db: Session) -> None:
+    # Sem commit, na transação de toda escrita nas linhas de championships (criação,
+    # inscrições, fila de espera, recontagem, fechamento). Cada commit muda o contador, ao
+    # contrário de max(updated_at): no PostgreSQL uma transação que carimbou updated_at antes
+    # e fez commit depois não mudava o máximo, e a listagem respondia 304 (e o corpo em cache)
+    # desatualizados. As escritas nos jogos só mudam version, que a listagem não mostra.
+    db.execute(
+        update(ChampionshipListVersion)
+        .where(ChampionshipListVersion.id == LIST_VERSION_ID)
+        .values(version=ChampionshipListVersion.version + 1)
+    )
+
+def championship_cursor_key(row) -> list:
+    return [row.id]
+
+def list_championships_with_count(
+    db: Session,
+    status: Optional[str] = None,
+    q: Optional[str] = None,
+    page: int = 1,
+    page_size: int = 20,
+    after: Optional[str] = None,
+    include_total: bool = True,
+):
+    # Retorna (rows, total); total é None com include_total=False.
+    # Com after (modo cursor) o total vem de uma contagem em cache de validade curta.
+    if after is not None:
+        rows = db.execute(championship_keyset_query(status, q, after, page_size)).all()
+        total = None
+        if include_total:
+            total = cached_total(
+                ("championships", status, q),
+                lambda: db.execute(championship_total_query(status, q)).scalar_one(),
+            )
+        return rows, total
+
+    # Sem suporte a janela (ou com a página vazia) o total vem de uma segunda consulta
+    use_window = include_total and supports_window_functions(db.get_bind().dialect)
+    rows = db.execute(championship_page_query(status, q, page, page_size, with_total=use_window)).all()
+
+    if not include_total:
+        total = None
+    elif use_window and rows:
+        total = rows[0].total
+    else:
+        total = db.execute(championship_total_query(status, q)).scalar_one()
+
+    return rows, total
+
+async def list_championships_with_count_async(
+    db: "AsyncSession",
+    status: Optional[str] = None,
+    q: Optional[str] = None,
+    page: int = 1,
+    page_size: int = 20,
+    after: Optional[str] = None,
+    include_total: bool = True,
+):
+    if after is not None:
+        rows = (await db.execute(championship_keyset_query(status, q, after, page_size))).all()
+        total = None
+        if include_total:
+            async def count():
+                return (await db.execute(championship_total_query(status, q))).scalar_one()
+            total = await cached_total_async(("championships", status, q), count)
+        return rows, total
+
+    use_window = include_total and supports_window_functions(db.bind.dialect)
+    rows = (await db.execute(championship_page_query(status, q, page, page_size, with_total=use_window))).all()
+
+    if not include_total:
+        total = None
+    elif use_window and rows:
+        total = rows[0].total
+    else:
+        total = (await db.execute(championship_total_query(status, q))).scalar_one()
+
+    return rows, total
+
+def get_championship_with_count(db: Session, championship_id: int):
+    return db.execute(championship_with_count_query(championship_id)).first()
+
+class AlreadyJoined(ValueError):
+    pass
+
+class JoinRefused(Exception):
+    # Inscrição recusada, com o status HTTP e a mensagem da resposta
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+def _open_championship(championship_id: int):
+    return and_(
+        Championship.id == championship_id,
+        or_(Championship.is_closed.is_(False), Championship.is_closed.is_(None)),
+    )
+
+def _insert_participant(db: Session, championship_id: int, user_id: int) -> bool:
+    inserted = db.execute(
+        dialect_insert(db.get_bind(), UserChampionship)
+        .values(user_id=user_id, championship_id=championship_id, updated_at=utcnow())
+        .on_conflict_do_nothing()
+        .returning(UserChampionship.user_id)
+    ).first()
+    return inserted is not None
+
+def add_participant(db: Session, championship_id: int, user_id: int) -> Optional[int]:
+    # Inscrição sem check-then-insert (sem commit). O UPDATE condicional reserva a vaga
+    # (campeonato aberto e abaixo de max_participants) e trava a linha do campeonato até o
+    # commit, serializando as inscrições concorrentes; o vínculo entra com ON CONFLICT DO
+    # NOTHING. Retorna o novo participants_count, ou None sem vaga (lotado, fechado ou
+    # inexistente). Já inscrita: AlreadyJoined, e quem chama desfaz a transação (e a reserva).
+    count = db.execute(
+        update(Championship)
+        .where(
+            _open_championship(championship_id),
+            or_(Championship.max_participants.is_(None), Championship.participants_count < Championship.max_participants),
+        )
+        .values(participants_count=Championship.participants_count + 1, version=Championship.version + 1)
+        .returning(Championship.participants_count)
+    ).scalar_one_or_none()
+    if count is None:
+        return None
+    if not _insert_participant(db, championship_id, user_id):
+        raise AlreadyJoined()
+    bump_list_version(db)
+    return count
+
+def _waitlist_position(db: Session, championship_id: int, user_id: int) -> int:
+    mine = select(ChampionshipWaitlist.created_at).where(
+        ChampionshipWaitlist.championship_id == championship_id,
+        ChampionshipWaitlist.user_id == user_id,
+    ).scalar_subquery()
+    return db.execute(
+        select(func.count())
+        .select_from(ChampionshipWaitlist)
+        .where(
+            ChampionshipWaitlist.championship_id == championship_id,
+            or_(
+                ChampionshipWaitlist.created_at < mine,
+                and_(ChampionshipWaitlist.created_at == mine, ChampionshipWaitlist.user_id <= user_id),
+            ),
+        )
+    ).scalar_one()
+
+def add_to_waitlist(db: Session, championship_id: int, user_id: int) -> Optional[int]:
+    # Entra na fila de espera de um campeonato lotado (sem commit); repetir mantém a
+    # posição. O UPDATE trava a linha do campeonato, como em add_participant (a vaga não
+    # pode abrir entre a verificação e a entrada na fila), e incrementa a versão.
+    # Retorna a posição (1 = próxima), ou None se o campeonato não está aberto e lotado.
+    full = db.execute(
+        update(Championship)
+        .where(
+            _open_championship(championship_id),
+            Championship.max_participants.is_not(None),
+            Championship.participants_count >= Championship.max_participants,
+        )
+        .values(version=Championship.version + 1)
+        .returning(Championship.id)
+    ).first()
+    if full is None:
+        return None
+    if db.get(UserChampionship, (user_id, championship_id)) is not None:
+        raise AlreadyJoined()
+    bump_list_version(db)
+    db.execute(
+        dialect_insert(db.get_bind(), ChampionshipWaitlist)
+        .values(championship_id=championship_id, user_id=user_id, created_at=utcnow())
+        .on_conflict_do_nothing()
+    )
+    return _waitlist_position(db, championship_id, user_id)
+
+def join(db: Session, championship_id: int, user_id: int, waitlist: bool) -> tuple[Optional[int], Optional[int]]:
+    # Inscrição completa (sem commit): (participants_count, None) se entrou, (None, posição)
+    # se foi para a fila de espera, ou JoinRefused. Roda num savepoint, então uma recusa
+    # desfaz só esta inscrição: o worker de ingestão grava várias na mesma transação.
+    savepoint = db.begin_nested()
+    position = None
+    try:
+        count = add_participant(db, championship_id, user_id)
+        if count is None and waitlist:
+            position = add_to_waitlist(db, championship_id, user_id)
+            if position is None:
+                # Uma vaga abriu entre as duas tentativas
+                count = add_participant(db, championship_id, user_id)
+    except AlreadyJoined:
+        savepoint.rollback()
+        raise JoinRefused(409, "Already joined")
+    if count is not None or position is not None:
+        savepoint.commit()
+        return count, position
+
+    # Sem vaga: o motivo só é lido aqui, fora do caminho de sucesso
+    savepoint.rollback()
+    is_closed = db.execute(select(Championship.is_closed).where(Championship.id == championship_id)).first()
+    if is_closed is None:
+        raise JoinRefused(404, "Championship not found")
+    if is_closed[0]:
+        raise JoinRefused(400, "Championship is not open for signup")
+    if db.get(UserChampionship, (user_id, championship_id)) is not None:
+        raise JoinRefused(409, "Already joined")
+    raise JoinRefused(409, "Championship is full")
+
+def remove_participant(db: Session, championship_id: int, user_id: int) -> Optional[tuple[int, Optional[int]]]:
+    # Saída de um campeonato aberto (sem commit): apaga o vínculo, ou a entrada na fila de
+    # espera, e passa a vaga liberada para a primeira da fila. Retorna (participants_count,
+    # user_id promovida ou None), ou None se a usuária não estava inscrita nem na fila.
+    count = db.execute(
+        update(Championship)
+        .where(_open_championship(championship_id))
+        .values(participants_count=Championship.participants_count)
+        .returning(Championship.participants_count)
+    ).scalar_one_or_none()
+    if count is None:
+        return None
+
+    removed = db.execute(
+        delete(UserChampionship)
+        .where(UserChampionship.championship_id == championship_id, UserChampionship.user_id == user_id)
+    ).rowcount
+    if not removed:
+        left_waitlist = db.execute(
+            delete(ChampionshipWaitlist)
+            .where(ChampionshipWaitlist.championship_id == championship_id, ChampionshipWaitlist.user_id == user_id)
+        ).rowcount
+        if not left_waitlist:
+            return None
+        return _bump_participants_count(db, championship_id, 0), None
+
+    promoted = db.execute(
+        select(ChampionshipWaitlist.user_id)
+        .where(ChampionshipWaitlist.championship_id == championship_id)
+        .order_by(ChampionshipWaitlist.created_at, ChampionshipWaitlist.user_id)
+        .limit(1)
+    ).scalar_one_or_none()
+    delta = -1
+    if promoted is not None:
+        db.execute(
+            delete(ChampionshipWaitlist)
+            .where(ChampionshipWaitlist.championship_id == championship_id, ChampionshipWaitlist.user_id == promoted)
+        )
+        if _insert_participant(db, championship_id, promoted):
+            delta = 0
+    return _bump_participants_count(db, championship_id, delta), promoted if delta == 0 else None
+
+def _bump_participants_count(db: Session, championship_id: int, delta: int) -> int:
+    count = db.execute(
+        update(Championship)
+        .where(Championship.id == championship_id)
+        .values(participants_count=Championship.participants_count + delta, version=Championship.version + 1)
+        .returning(Championship.participants_count)
+    ).scalar_one()
+    bump_list_version(db)
+    return count
+
+def recount_participants(db: Session, championship_id: Optional[int] = None) -> int:
+    # Recalcula participants_count a partir de user_championship. Retorna quantos
+    # campeonatos foram atualizados.
+    stmt = update(Championship).values(
+        participants_count=participants_count_subquery(),
+        version=Championship.version + 1,
+    )
+    if championship_id is not None:
+        stmt = stmt.where(Championship.id == championship_id)
+    result = db.execute(stmt, execution_options={"synchronize_session": False})
+    bump_list_version(db)
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,246 @@
+# Geração da tabela de jogos ao fechar as inscrições.
+# As inscritas são divididas em times de number_players (as que sobram entram como
+# reservas, espalhadas entre os times) e os times se enfrentam em pontos corridos
+# (método do círculo) ou mata-mata simples. Datas e locais vêm de allocate_slots.
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import DateTime, and_, delete, insert, literal, select, union_all, update
+from sqlalchemy.orm import Session, load_only
+
+from crud.standings import create_standings
+
+from db.database import utcnow
+from db.loading import GAME_COLUMNS
+from models.match import Match, MatchStatus
+from models.user_championship import UserChampionship
+from models.user_match import UserMatch
+
+ROUND_ROBIN = "round_robin"
+KNOCKOUT = "knockout"
+
+
+class FixtureConflict(ValueError):
+    pass
+
+
+@dataclass
+class Fixture:
+    round: int
+    slot: int
+    home_team: Optional[int]
+    away_team: Optional[int]
+
+
+def team_name(team: Optional[int]) -> Optional[str]:
+    return f"Time {team}" if team else None
+
+
+def assign_teams(user_ids: list[int], players_per_team: int) -> dict[int, int]:
+    # user_id -> time (1..n). Com menos de dois times completos não há tabela.
+    n_teams = len(user_ids) // max(1, players_per_team)
+    if n_teams < 2:
+        return {}
+    return {user_id: i % n_teams + 1 for i, user_id in enumerate(user_ids)}
+
+
+def round_robin(n_teams: int) -> list[Fixture]:
+    # Método do círculo: o time 1 fica fixo e os demais giram uma posição por rodada.
+    # Com número ímpar de times entra um "fantasma" (None): quem o enfrenta folga.
+    teams: list[Optional[int]] = list(range(1, n_teams + 1))
+    if n_teams % 2:
+        teams.append(None)
+    n = len(teams)
+
+    fixtures = []
+    for r in range(n - 1):
+        slot = 0
+        for i in range(n // 2):
+            home, away = teams[i], teams[n - 1 - i]
+            if home is None or away is None:
+                continue
+            # Só o jogo do time fixo alterna o mando; os demais times já se alternam
+            # entre as duas metades do círculo ao girar (diferença máxima de 1 mando)
+            if i == 0 and r % 2:
+                home, away = away, home
+            fixtures.append(Fixture(r + 1, slot, home, away))
+            slot += 1
+        teams.insert(1, teams.pop())
+    return fixtures
+
+
+def knockout(n_teams: int) -> list[Fixture]:
+    # Chave com tamanho potência de 2: os primeiros times recebem bye e entram direto na
+    # 2ª rodada. O vencedor do slot s da rodada r vai para o slot s // 2 da rodada r + 1
+    # (mandante se s for par); confrontos ainda indefinidos ficam com time None.
+    size = 1 << (n_teams - 1).bit_length()
+    byes = size - n_teams
+    rest = list(range(byes + 1, n_teams + 1))
+
+    fixtures = []
+    entrants: list[Optional[int]] = []
+    for s in range(size // 2):
+        if s < byes:
+            entrants.append(s + 1)
+        else:
+            fixtures.append(Fixture(1, s, rest.pop(0), rest.pop()))
+            entrants.append(None)
+
+    r = 2
+    while len(entrants) > 1:
+        for s in range(len(entrants) // 2):
+            fixtures.append(Fixture(r, s, entrants[2 * s], entrants[2 * s + 1]))
+        entrants = [None] * (len(entrants) // 2)
+        r += 1
+    return fixtures
+
+
+def allocate_slots(
+    fixtures: list[Fixture],
+    start: datetime,
+    venues: list[str],
+    matches_per_day: int,
+    interval: timedelta,
+) -> list[tuple[datetime, str]]:
+    # (data, local) de cada jogo, na ordem de fixtures (ordenada por rodada). Restrições:
+    # um jogo por local e horário, no máximo matches_per_day horários por local e dia,
+    # rodadas em ordem e cada rodada começando num dia novo; como ninguém joga duas vezes
+    # na mesma rodada, nenhum time joga duas vezes no mesmo dia.
+    per_day = len(venues) * matches_per_day
+    day = 0
+    used = 0
+    current_round = None
+
+    slots = []
+    for f in fixtures:
+        if current_round is not None and (f.round != current_round or used == per_day):
+            day += 1
+            used = 0
+        current_round = f.round
+        time_index, venue_index = divmod(used, len(venues))
+        slots.append((start + timedelta(days=day) + interval * time_index, venues[venue_index]))
+        used += 1
+    return slots
+
+
+def create_fixtures(
+    db: Session,
+    championship_id: int,
+    players_per_team: int,
+    fmt: str,
+    start: datetime,
+    venues: list[str],
+    matches_per_day: int,
+    interval: timedelta,
+) -> list:
+    # Sorteia os times, insere os jogos e os vínculos jogadora/jogo em lote, sem commit.
+    # Retorna as linhas inseridas (GAME_COLUMNS e slot).
+    user_ids = db.execute(
+        select(UserChampionship.user_id)
+        .where(UserChampionship.championship_id == championship_id)
+        .order_by(UserChampionship.user_id)
+    ).scalars().all()
+    teams = assign_teams(user_ids, players_per_team)
+    if not teams:
+        return []
+
+    db.execute(
+        update(UserChampionship),
+        [
+            {"user_id": user_id, "championship_id": championship_id, "team": team}
+            for user_id, team in teams.items()
+        ],
+    )
+
+    n_teams = max(teams.values())
+    create_standings(db, championship_id, n_teams)
+    fixtures = round_robin(n_teams) if fmt == ROUND_ROBIN else knockout(n_teams)
+    slots = allocate_slots(fixtures, start, venues, matches_per_day, interval)
+
+    # Sem sort_by_parameter_order (no SQLite vira um INSERT por linha): a ordem do
+    # RETURNING não é garantida, mas (round, slot) identifica cada jogo
+    rows = db.execute(
+        insert(Match).returning(*GAME_COLUMNS, Match.slot),
+        [
+            {
+                "championship_id": championship_id,
+                "round": f.round,
+                "slot": f.slot,
+                "home_team": f.home_team,
+                "away_team": f.away_team,
+                "scheduled_at": scheduled_at,
+                "location": location,
+                "status": MatchStatus.scheduled,
+            }
+            for f, (scheduled_at, location) in zip(fixtures, slots)
+        ],
+    ).all()
+    rows.sort(key=lambda row: (row.round, row.slot))
+
+    # Elencos dos dois lados de cada jogo com times definidos, em um INSERT ... SELECT no
+    # próprio banco. As duas condições de campeonato usam o parâmetro (e não a igualdade
+    # entre as tabelas) para o planejador partir de matches e achar o elenco pelo índice
+    # (championship_id, team).
+    now = utcnow()
+    sides = [
+        select(UserChampionship.user_id, Match.id, literal(side), literal(now, DateTime))
+        .select_from(Match)
+        .join(UserChampionship, and_(
+            UserChampionship.championship_id == championship_id,
+            UserChampionship.team == team_column,
+        ))
+        .where(Match.championship_id == championship_id)
+        for side, team_column in (("home", Match.home_team), ("away", Match.away_team))
+    ]
+    db.execute(
+        insert(UserMatch).from_select(
+            [UserMatch.user_id, UserMatch.match_id, UserMatch.team_side, UserMatch.updated_at],
+            union_all(*sides),
+        )
+    )
+    return rows
+
+
+def _insert_roster(db: Session, championship_id: int, match_id: int, team: int, side: str) -> None:
+    db.execute(
+        insert(UserMatch).from_select(
+            [UserMatch.user_id, UserMatch.match_id, UserMatch.team_side, UserMatch.updated_at],
+            select(UserChampionship.user_id, literal(match_id), literal(side), literal(utcnow(), DateTime))
+            .where(UserChampionship.championship_id == championship_id, UserChampionship.team == team),
+        )
+    )
+
+
+def advance_winner(db: Session, match: Match, winner: int) -> bool:
+    # Mata-mata: leva o vencedor do jogo (rodada r, slot s) ao jogo (r + 1, s // 2), com o
+    # elenco. Numa correção que muda o vencedor, troca o time e o elenco do jogo seguinte,
+    # desde que ele ainda não tenha sido encerrado. Retorna False na final.
+    nxt = db.execute(
+        select(Match)
+        .options(load_only(Match.id, Match.status, Match.home_team, Match.away_team))
+        .where(
+            Match.championship_id == match.championship_id,
+            Match.round == match.round + 1,
+            Match.slot == match.slot // 2,
+        )
+    ).scalar_one_or_none()
+    if nxt is None:
+        return False
+
+    side = "home" if match.slot % 2 == 0 else "away"
+    current = nxt.home_team if side == "home" else nxt.away_team
+    if current == winner:
+        return True
+    if nxt.status == MatchStatus.finished:
+        raise FixtureConflict("Next round game already completed")
+
+    if side == "home":
+        nxt.home_team = winner
+    else:
+        nxt.away_team = winner
+    if current is not None:
+        db.execute(delete(UserMatch).where(UserMatch.match_id == nxt.id, UserMatch.team_side == side))
+    _insert_roster(db, match.championship_id, nxt.id, winner, side)
+    return True
+
@@ -0,0 +1,209 @@
+# Placares e agendamentos em lote (POST /games/bulk/score e /games/bulk/schedule).
+# Um SELECT carrega todos os jogos, cada item é validado com as mesmas regras das rotas
+# de um jogo só, e os válidos são gravados com um UPDATE em executemany; agregados,
+# classificação e versões dos campeonatos são atualizados uma vez para o lote. Com
+# atomic=True, qualquer item inválido faz o lote inteiro ser recusado sem escrita; senão
+# os itens válidos são aplicados e os demais voltam com o erro. Sem commit: a rota faz o
+# commit, invalida os caches e publica os eventos a partir dos resultados.
+from typing import Optional
+
+from sqlalchemy import bindparam, select, tuple_, update
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy.orm.attributes import set_committed_value
+
+from crud import fixtures, standings
+from crud import stats as stats_crud
+from crud.championship import bump_version
+from crud.match import score_error, to_game_out, utc_naive
+from db.loading import MATCH_CARD
+from models.championship import Championship
+from models.match import Match, MatchStatus
+
+
+class GameConflict(ValueError):
+    pass
+
+
+def _result(game_id: int, error: Optional[str] = None) -> dict:
+    return {"game_id": game_id, "ok": error is None, "error": error}
+
+
+def _load(db: Session, ids: list[int], with_format: bool = False) -> dict:
+    # FOR UPDATE trava os jogos até o commit no PostgreSQL (no SQLite não é emitido)
+    stmt = select(Match).options(*MATCH_CARD).where(Match.id.in_(ids)).with_for_update(of=Match)
+    if with_format:
+        stmt = stmt.add_columns(Championship.format).join(Championship, Championship.id == Match.championship_id)
+        return {m.id: (m, fmt) for m, fmt in db.execute(stmt)}
+    return {m.id: m for m in db.execute(stmt).scalars()}
+
+
+def _validate(items: list, games: dict, check) -> list[dict]:
+    # Um resultado por item, na ordem recebida; check(item) retorna o erro de negócio ou None
+    results = []
+    seen = set()
+    for item in items:
+        if item.game_id not in games:
+            error = "Game not found"
+        elif item.game_id in seen:
+            error = "Duplicate game in batch"
+        else:
+            error = check(item)
+        seen.add(item.game_id)
+        results.append(_result(item.game_id, error))
+    return results
+
+
+def _next_games(db: Session, keys: set) -> dict:
+    # Jogos da rodada seguinte do mata-mata, por (campeonato, rodada, slot)
+    if not keys:
+        return {}
+    rows = db.execute(
+        select(Match)
+        .options(load_only(Match.id, Match.championship_id, Match.round, Match.slot, Match.status, Match.home_team, Match.away_team))
+        .where(tuple_(Match.championship_id, Match.round, Match.slot).in_(keys))
+    ).scalars()
+    return {(m.championship_id, m.round, m.slot): m for m in rows}
+
+
+def apply_scores(db: Session, items: list, atomic: bool) -> list[dict]:
+    games = _load(db, list({item.game_id for item in items}), with_format=True)
+
+    def check(item) -> Optional[str]:
+        m, championship_format = games[item.game_id]
+        return score_error(m, championship_format, item.home_score, item.away_score)
+
+    results = _validate(items, games, check)
+    valid = [(item, r) for item, r in zip(items, results) if r["ok"]]
+
+    # Mata-mata: o vencedor só pode mudar no jogo seguinte se ele não foi encerrado (nem
+    # está sendo encerrado neste lote)
+    knockout = [
+        (item, r) for item, r in valid
+        if games[item.game_id][1] == fixtures.KNOCKOUT and games[item.game_id][0].round is not None
+    ]
+    next_games = _next_games(db, {
+        (m.championship_id, m.round + 1, m.slot // 2)
+        for m in (games[item.game_id][0] for item, _ in knockout)
+    })
+    scored = {item.game_id for item, _ in valid}
+    for item, r in knockout:
+        m = games[item.game_id][0]
+        nxt = next_games.get((m.championship_id, m.round + 1, m.slot // 2))
+        if nxt is None:
+            continue
+        winner = m.home_team if item.home_score > item.away_score else m.away_team
+        current = nxt.home_team if m.slot % 2 == 0 else nxt.away_team
+        if current != winner and (nxt.status == MatchStatus.finished or nxt.id in scored):
+            r.update(_result(item.game_id, "Next round game already completed"))
+
+    valid = [(item, r) for item, r in valid if r["ok"]]
+    if not valid or (atomic and len(valid) < len(items)):
+        return results
+
+    applied = [(games[item.game_id][0], item, r) for item, r in valid]
+    before = {m.id: stats_crud.match_state(m) for m, _, _ in applied}
+    previous = {
+        m.id: (m.score_home, m.score_away)
+        for m, _, _ in applied
+        if m.status == MatchStatus.finished and m.score_home is not None and m.score_away is not None
+    }
+
+    # UPDATE condicional ao estado lido, como em PATCH /games/{id}/score; uma escrita
+    # concorrente em qualquer jogo faz o lote inteiro ser refeito
+    updated = db.connection().execute(
+        update(Match)
+        .where(
+            Match.id == bindparam("b_id"),
+            Match.status == bindparam("b_status"),
+            Match.score_home.is_not_distinct_from(bindparam("b_old_home")),
+            Match.score_away.is_not_distinct_from(bindparam("b_old_away")),
+        )
+        .values(score_home=bindparam("b_home"), score_away=bindparam("b_away"), status=MatchStatus.finished),
+        [
+            {
+                "b_id": m.id,
+                "b_status": m.status,
+                "b_old_home": m.score_home,
+                "b_old_away": m.score_away,
+                "b_home": item.home_score,
+                "b_away": item.away_score,
+            }
+            for m, item, _ in applied
+        ],
+    ).rowcount
+    # A soma do rowcount só é confiável com supports_sane_multi_rowcount; sem ela resta a
+    # trava do SELECT ... FOR UPDATE
+    if db.get_bind().dialect.supports_sane_multi_rowcount and updated != len(applied):
+        raise GameConflict("Games were updated concurrently, try again")
+
+    for m, item, _ in applied:
+        set_committed_value(m, "score_home", item.home_score)
+        set_committed_value(m, "score_away", item.away_score)
+        set_committed_value(m, "status", MatchStatus.finished)
+
+    stats_crud.apply_match_changes(db, [(m.id, before[m.id], stats_crud.match_state(m)) for m, _, _ in applied])
+    standings.apply_scores(db, [
+        (m.championship_id, m.home_team, m.away_team, (item.home_score, item.away_score), previous.get(m.id))
+        for m, item, _ in applied
+        if m.home_team is not None and m.away_team is not None
+    ])
+
+    for m, item, r in applied:
+        r["advanced"] = False
+        if games[m.id][1] == fixtures.KNOCKOUT and m.round is not None:
+            winner = m.home_team if item.home_score > item.away_score else m.away_team
+            r["advanced"] = fixtures.advance_winner(db, m, winner)
+
+    championship_ids = {m.championship_id for m, _, _ in applied}
+    for championship_id in sorted(championship_ids):
+        bump_version(db, championship_id)
+    pending = set(db.execute(
+        select(Match.championship_id)
+        .where(Match.championship_id.in_(championship_ids), Match.status != MatchStatus.finished)
+        .distinct()
+    ).scalars())
+    for m, _, r in applied:
+        r["game"] = to_game_out(m)
+        r["championship_completed"] = m.championship_id not in pending
+    return results
+
+
+def apply_schedules(db: Session, items: list, atomic: bool) -> list[dict]:
+    # Sem regra de negócio além da existência do jogo; data e local ausentes mantêm os atuais
+    games = _load(db, list({item.game_id for item in items}))
+    results = _validate(items, games, lambda item: None)
+    applied = [(games[item.game_id], item, r) for item, r in zip(items, results) if r["ok"]]
+    if not applied or (atomic and len(applied) < len(items)):
+        return results
+
+    before = {m.id: stats_crud.match_state(m) for m, _, _ in applied}
+    rows = []
+    for m, item, _ in applied:
+        rows.append({
+            "b_id": m.id,
+            "b_scheduled_at": utc_naive(item.date) if item.date else m.scheduled_at,
+            "b_location": item.location or m.location,
+            # Jogo encerrado mantém o status (e o placar contabilizado na classificação)
+            "b_status": m.status if m.status == MatchStatus.finished else MatchStatus.scheduled,
+        })
+    db.connection().execute(
+        update(Match)
+        .where(Match.id == bindparam("b_id"))
+        .values(
+            scheduled_at=bindparam("b_scheduled_at"),
+            location=bindparam("b_location"),
+            status=bindparam("b_status"),
+        ),
+        rows,
+    )
+    for (m, _, _), row in zip(applied, rows):
+        set_committed_value(m, "scheduled_at", row["b_scheduled_at"])
+        set_committed_value(m, "location", row["b_location"])
+        set_committed_value(m, "status", row["b_status"])
+
+    stats_crud.apply_match_changes(db, [(m.id, before[m.id], stats_crud.match_state(m)) for m, _, _ in applied])
+    for championship_id in sorted({m.championship_id for m, _, _ in applied}):
+        bump_version(db, championship_id)
+    for m, _, r in applied:
+        r["game"] = to_game_out(m)
+    return results
@@ -0,0 +1,106 @@
+# Gravação em lote dos pedidos da fila de ingestão (core/ingest.py). Cada processador recebe
+# [(id, payload)] na ordem de chegada e devolve {id: (status, corpo)} com o status das rotas
+# síncronas. O lote é gravado numa transação só, com uma sessão própria; recusas (e-mail já
+# cadastrado, campeonato lotado...) valem só para o seu pedido. O corpo fica legível em
+# GET /requests/{id}, sem autenticação: no cadastro ele traz só o id da usuária criada,
+# nunca os dados pessoais (e-mail, telefone, documento) de UserOut.
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from core.security import password_hasher
+from crud import championship as championship_crud
+from db.database import SessionLocal
+from models.user import User
+from schemas.auth import SignupIn
+from schemas.championship import JoinOut
+
+EMAIL_TAKEN = (400, {"detail": "Email já cadastrado"})
+UNIQUE_TAKEN = (400, {"detail": "Email ou telefone já cadastrado"})
+
+
+def _user_row(data: SignupIn, password_hash: str) -> dict:
+    return {
+        "name": data.name,
+        "email": str(data.email),
+        "phone_number": data.phone_number,
+        "document": data.document,
+        "password_hash": password_hash,
+        "birth_date": data.birth_date,
+        "admin": False,
+        "position": data.position,
+    }
+
+
+def process_signups(items: list[tuple[str, dict]]) -> dict[str, tuple[int, dict]]:
+    results = {}
+    signups = []
+    for request_id, payload in items:
+        # Já validado ao entrar na fila; só falha se o schema mudou entre versões
+        try:
+            signups.append((request_id, SignupIn.model_validate(payload)))
+        except ValidationError as e:
+            results[request_id] = (422, {"detail": e.errors(include_url=False, include_context=False, include_input=False)})
+    # Um SELECT para o lote; o e-mail repetido dentro do lote fica com o primeiro pedido
+    with SessionLocal() as db:
+        taken = set(db.execute(
+            select(User.email).where(User.email.in_({str(data.email) for _, data in signups}))
+        ).scalars())
+    accepted = []
+    for request_id, data in signups:
+        if str(data.email) in taken:
+            results[request_id] = EMAIL_TAKEN
+        else:
+            taken.add(str(data.email))
+            accepted.append((request_id, data))
+    if not accepted:
+        return results
+
+    # Só os aceitos pagam o hash, dividido pelo pool de hash e sem conexão aberta
+    hashes = password_hasher.hash_many([data.password for _, data in accepted])
+    rows = [_user_row(data, password_hash) for (_, data), password_hash in zip(accepted, hashes)]
+    stmt = insert(User).returning(User.id, sort_by_parameter_order=True)
+    with SessionLocal() as db:
+        try:
+            created = db.execute(stmt, rows).all()
+            db.commit()
+        except IntegrityError:
+            # Um cadastro síncrono levou um e-mail (ou telefone) do lote: grava um a um
+            db.rollback()
+            created = []
+            for row in rows:
+                try:
+                    created.append(db.execute(stmt, [row]).one())
+                    db.commit()
+                except IntegrityError:
+                    db.rollback()
+                    created.append(None)
+        for (request_id, _), user in zip(accepted, created):
+            results[request_id] = UNIQUE_TAKEN if user is None else (201, {"id": user.id})
+    return results
+
+
+def process_joins(items: list[tuple[str, dict]]) -> dict[str, tuple[int, dict]]:
+    results = {}
+    with SessionLocal() as db:
+        for request_id, payload in items:
+            championship_id = payload["championship_id"]
+            try:
+                count, position = championship_crud.join(db, championship_id, payload["user_id"], payload["waitlist"])
+            except championship_crud.JoinRefused as e:
+                results[request_id] = (e.status_code, {"detail": e.detail})
+                continue
+            if count is not None:
+                out = JoinOut(championship_id=championship_id, joined=True, participants_count=count)
+                results[request_id] = (200, out.model_dump(mode="json"))
+            else:
+                out = JoinOut(championship_id=championship_id, joined=False, waitlist_position=position)
+                results[request_id] = (202, out.model_dump(mode="json"))
+        db.commit()
+    return results
+
+
+PROCESSORS = {
+    "signup": process_signups,
+    "join": process_joins,
+}
@@ -1,10 +1,23 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import and_, func, or_, select
 from sqlalchemy.orm import Session
+from db.loading import GAME_COLUMNS
 from models.match import Match
-from schemas.match import CreateMatch
+from models.user_match import UserMatch
+from crud import stats as stats_crud
+from crud.championship import bump_version
+from crud.fixtures import KNOCKOUT, team_name
+from models.championship import Championship
+from crud.pagination import InvalidCursor, cached_total, cached_total_async, decode_cursor
+from schemas.match import CreateMatch, GameOut, MeGame
 
 def create_match(db:Session, data:CreateMatch):
     match = Match(championship_id=data.championship_id, scheduled_at=data.scheduled_at,location=data.location)
     db.add(match)
+    stats_crud.record_new_matches(db, [match])
+    bump_version(db, data.championship_id)
     db.commit()
     db.refresh(match)
     return match
@@ -13,4 +26,132 @@ def list_matches_championships(db:Session, championship_id:int):
     return db.query(Match).filter(Match.championship_id == championship_id).all()
 
 def list_future_matches(db:Session, championship_id:int):
-    return db.query(Match).filter(Match.championship_id == championship_id).filter(Match.status == 'scheduled').all()
\ No newline at end of file
+    return db.query(Match).filter(Match.championship_id == championship_id).filter(Match.status == 'scheduled').all()
+
+# Regras compartilhadas pelas rotas de um jogo e pelas em lote (crud/game_batch.py)
+
+def utc_naive(value:datetime) -> datetime:
+    # Datas são gravadas sem fuso, em UTC (os agregados diários usam a data em UTC)
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def score_error(m, championship_format:Optional[str], home_score:int, away_score:int) -> Optional[str]:
+    # Jogos da tabela gerada só recebem placar com os dois times definidos
+    if m.round is not None and (m.home_team is None or m.away_team is None):
+        return "Game teams are not defined yet"
+    if championship_format == KNOCKOUT and home_score == away_score:
+        return "Knockout games cannot end in a draw"
+    return None
+
+# Projeção única dos jogos nos payloads, a partir de uma entidade Match ou de uma linha
+# de GAME_COLUMNS (listagens, RETURNING da tabela gerada)
+
+def game_fields(m) -> dict:
+    return {
+        "id": m.id,
+        "championship_id": m.championship_id,
+        "round": m.round or 1,
+        "home_team_name": team_name(m.home_team),
+        "away_team_name": team_name(m.away_team),
+        "date": m.scheduled_at,
+        "location": m.location,
+        "home_score": m.score_home,
+        "away_score": m.score_away,
+        "status": m.status.value if m.status is not None else None,
+    }
+
+def to_game_out(m) -> GameOut:
+    return GameOut(**game_fields(m))
+
+def to_me_game(m) -> MeGame:
+    return MeGame(**game_fields(m))
+
+# Builders de consulta compartilhados pelas rotas síncronas e assíncronas.
+# Os de leitura selecionam GAME_COLUMNS: as linhas vão direto para game_fields.
+
+def game_query(game_id:int):
+    return select(*GAME_COLUMNS).where(Match.id == game_id)
+
+def game_version_query(game_id:int):
+    # Versão do campeonato do jogo, usada no ETag de GET /games/{id} (None se o jogo não existe)
+    return (
+        select(Championship.version)
+        .join(Match, Match.championship_id == Championship.id)
+        .where(Match.id == game_id)
+    )
+
+def championship_games_query(championship_id:int, round:Optional[int] = None):
+    stmt = select(*GAME_COLUMNS).where(Match.championship_id == championship_id)
+    if round is not None:
+        stmt = stmt.where(Match.round == round)
+    return stmt
+
+def user_games_query(user_id:int, statuses:list[str]):
+    return (
+        select(*GAME_COLUMNS)
+        .join(UserMatch, UserMatch.match_id == Match.id)
+        .where(UserMatch.user_id == user_id)
+        .where(Match.status.in_(statuses))
+    )
+
+def _ordered(stmt):
+    # NULLS LAST explícito: mesma ordem em SQLite e PostgreSQL, necessária para o cursor
+    return stmt.order_by(Match.scheduled_at.asc().nulls_last(), Match.id.asc())
+
+def page_query(stmt, page:int, page_size:int):
+    return _ordered(stmt).offset((page - 1) * page_size).limit(page_size)
+
+def keyset_query(stmt, after:Optional[str], page_size:int):
+    # Página seguinte ao cursor (scheduled_at, id) do último jogo recebido
+    if after:
+        scheduled_at, last_id = decode_cursor(after, 2)
+        if not isinstance(last_id, int):
+            raise InvalidCursor("Cursor inválido")
+        if scheduled_at is None:
+            stmt = stmt.where(Match.scheduled_at.is_(None), Match.id > last_id)
+        else:
+            try:
+                scheduled_at = datetime.fromisoformat(scheduled_at)
+            except (TypeError, ValueError):
+                raise InvalidCursor("Cursor inválido")
+            stmt = stmt.where(or_(
+                Match.scheduled_at > scheduled_at,
+                and_(Match.scheduled_at == scheduled_at, Match.id > last_id),
+                Match.scheduled_at.is_(None),
+            ))
+    return _ordered(stmt).limit(page_size)
+
+def game_cursor_key(m) -> list:
+    return [m.scheduled_at.isoformat() if m.scheduled_at else None, m.id]
+
+def count_query(stmt):
+    return select(func.count()).select_from(stmt.order_by(None).subquery())
+
+def list_games(db:Session, stmt, total_key, page:int=1, page_size:int=20, after:Optional[str]=None, include_total:bool=True):
+    # Retorna (linhas, total). Com after (modo cursor): keyset + total em cache de validade
+    # curta; senão OFFSET + COUNT exato. total é None com include_total=False.
+    if after is not None:
+        items = db.execute(keyset_query(stmt, after, page_size)).all()
+        total = None
+        if include_total:
+            total = cached_total(total_key, lambda: db.execute(count_query(stmt)).scalar_one())
+        return items, total
+
+    items = db.execute(page_query(stmt, page, page_size)).all()
+    total = db.execute(count_query(stmt)).scalar_one() if include_total else None
+    return items, total
+
+async def list_games_async(db, stmt, total_key, page:int=1, page_size:int=20, after:Optional[str]=None, include_total:bool=True):
+    if after is not None:
+        items = (await db.execute(keyset_query(stmt, after, page_size))).all()
+        total = None
+        if include_total:
+            async def count():
+                return (await db.execute(count_query(stmt))).scalar_one()
+            total = await cached_total_async(total_key, count)
+        return items, total
+
+    items = (await db.execute(page_query(stmt, page, page_size))).all()
+    total = (await db.execute(count_query(stmt))).scalar_one() if include_total else None
+    return items, total
@@ -0,0 +1,64 @@
+# Utilidades de paginação por cursor (keyset) compartilhadas pelas listagens.
+# O cursor é opaco para o cliente: JSON da chave de ordenação do último item, em base64url.
+import base64
+import binascii
+import json
+from typing import Optional
+
+from core.cache_backend import make_cache
+from core.config import settings
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str, size: int) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise InvalidCursor("Cursor inválido")
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor("Cursor inválido")
+    return values
+
+
+def next_cursor(items: list, page_size: int, key) -> Optional[str]:
+    # Só há próxima página se esta veio cheia
+    if len(items) < page_size:
+        return None
+    return encode_cursor(key(items[-1]))
+
+
+# Totais das listagens no modo cursor: contagem exata com validade curta, para não
+# refazer COUNT(*) a cada página
+total_cache = make_cache("totals", 1024, settings.PAGINATION_TOTAL_CACHE_SECONDS)
+
+
+def _total_key(parts) -> str:
+    return ":".join(map(str, parts))
+
+
+def _total_tags(key: tuple) -> list[str]:
+    # Cada prefixo da chave vira uma tag, ex.: ("championship_games", 1, None) ->
+    # "championship_games" e "championship_games:1"
+    return [_total_key(key[:i]) for i in range(1, len(key))]
+
+
+def cached_total(key: tuple, count) -> int:
+    return total_cache.get_or_set(_total_key(key), count, tags=_total_tags(key))
+
+
+def invalidate_totals(*prefix) -> None:
+    # Descarta os totais cujas chaves começam por prefix, ex.: ("championship_games", 1)
+    total_cache.invalidate_tags(_total_key(prefix))
+
+
+async def cached_total_async(key: tuple, count) -> int:
+    return await total_cache.get_or_set_async(_total_key(key), count, tags=_total_tags(key))
@@ -0,0 +1,188 @@
+# Classificação dos campeonatos (tabela standings).
+# apply_score soma a contribuição de um placar aos dois times, na mesma transação em que o
+# placar é gravado; na correção de um placar a contribuição antiga é descontada antes.
+# recompute_standings refaz tudo a partir dos jogos encerrados (cli.py / rota de admin).
+# A leitura passa por standings_cache; quem grava um placar chama invalidate_standings
+# depois do commit.
+from collections import Counter
+from typing import Optional
+
+from sqlalchemy import case, delete, func, insert, select, union_all, update
+from sqlalchemy.orm import Session
+
+from core.cache_backend import make_cache
+from core.config import settings
+from models.match import Match, MatchStatus
+from models.standing import Standing
+from models.user_championship import UserChampionship
+
+POINTS_WIN = 3
+POINTS_DRAW = 1
+
+STAT_COLUMNS = ("played", "won", "drawn", "lost", "goals_for", "goals_against", "points")
+
+# Linhas ordenadas da classificação por campeonato, com a tag championship:<id>
+standings_cache = make_cache("standings", 1024, settings.STANDINGS_CACHE_TTL_SECONDS)
+
+
+def result_stats(goals_for: int, goals_against: int) -> dict:
+    won = int(goals_for > goals_against)
+    drawn = int(goals_for == goals_against)
+    return {
+        "played": 1,
+        "won": won,
+        "drawn": drawn,
+        "lost": int(goals_for < goals_against),
+        "goals_for": goals_for,
+        "goals_against": goals_against,
+        "points": won * POINTS_WIN + drawn * POINTS_DRAW,
+    }
+
+
+def standings_query(championship_id: int):
+    # Critérios: pontos, saldo, gols pró, número do time
+    return (
+        select(Standing)
+        .where(Standing.championship_id == championship_id)
+        .order_by(
+            Standing.points.desc(),
+            (Standing.goals_for - Standing.goals_against).desc(),
+            Standing.goals_for.desc(),
+            Standing.team.asc(),
+        )
+    )
+
+
+def cached_standings(db: Session, championship_id: int) -> list[dict]:
+    # Classificação ordenada (team + STAT_COLUMNS); faltas simultâneas fazem uma consulta só
+    def load() -> list[dict]:
+        return [
+            {"team": s.team, **{name: getattr(s, name) for name in STAT_COLUMNS}}
+            for s in db.execute(standings_query(championship_id)).scalars()
+        ]
+
+    return standings_cache.get_or_set(str(championship_id), load, tags=(f"championship:{championship_id}",))
+
+
+def invalidate_standings(championship_id: Optional[int] = None) -> None:
+    if championship_id is None:
+        standings_cache.clear()
+    else:
+        standings_cache.invalidate_tags(f"championship:{championship_id}")
+
+
+def create_standings(db: Session, championship_id: int, n_teams: int) -> None:
+    # Linhas zeradas para todos os times, criadas junto com a tabela de jogos
+    db.execute(
+        insert(Standing),
+        [{"championship_id": championship_id, "team": team} for team in range(1, n_teams + 1)],
+    )
+
+
+def _bump(db: Session, championship_id: int, team: int, delta: dict) -> None:
+    values = {name: getattr(Standing, name) + value for name, value in delta.items() if value}
+    if not values:
+        return
+    updated = db.execute(
+        update(Standing)
+        .where(Standing.championship_id == championship_id, Standing.team == team)
+        .values(**values)
+    ).rowcount
+    if not updated:
+        # Campeonato sem linhas de classificação (fechado antes desta tabela existir)
+        db.execute(insert(Standing).values(championship_id=championship_id, team=team, **delta))
+
+
+def apply_score(
+    db: Session,
+    championship_id: int,
+    home_team: int,
+    away_team: int,
+    score: tuple[int, int],
+    previous: Optional[tuple[int, int]] = None,
+) -> None:
+    # Atualiza os dois times pelo novo placar (home, away), sem commit. previous é o placar
+    # já contabilizado, quando o jogo está sendo corrigido.
+    apply_scores(db, [(championship_id, home_team, away_team, score, previous)])
+
+
+def apply_scores(db: Session, scores: list[tuple]) -> None:
+    # Lote de (championship_id, home_team, away_team, score, previous): as contribuições
+    # são somadas por time e cada time recebe um único UPDATE
+    deltas: dict[tuple[int, int], Counter] = {}
+    for championship_id, home_team, away_team, score, previous in scores:
+        for team, (goals_for, goals_against), before in (
+            (home_team, score, previous),
+            (away_team, score[::-1], previous[::-1] if previous else None),
+        ):
+            delta = deltas.setdefault((championship_id, team), Counter())
+            delta.update(result_stats(goals_for, goals_against))
+            if before:
+                delta.subtract(result_stats(*before))
+    for (championship_id, team), delta in deltas.items():
+        _bump(db, championship_id, team, {name: delta[name] for name in STAT_COLUMNS})
+
+
+def recompute_standings(db: Session, championship_id: Optional[int] = None) -> int:
+    # Reconstrói a classificação (de um campeonato ou de todos) a partir dos jogos
+    # encerrados com placar e times definidos. Retorna quantos campeonatos foram gravados.
+    played = [
+        Match.status == MatchStatus.finished,
+        Match.home_team.is_not(None),
+        Match.away_team.is_not(None),
+        Match.score_home.is_not(None),
+        Match.score_away.is_not(None),
+    ]
+    if championship_id is not None:
+        played.append(Match.championship_id == championship_id)
+
+    sides = union_all(
+        select(Match.championship_id, Match.home_team.label("team"),
+               Match.score_home.label("gf"), Match.score_away.label("ga")).where(*played),
+        select(Match.championship_id, Match.away_team.label("team"),
+               Match.score_away.label("gf"), Match.score_home.label("ga")).where(*played),
+    ).subquery()
+    totals = db.execute(
+        select(
+            sides.c.championship_id,
+            sides.c.team,
+            func.count().label("played"),
+            func.sum(case((sides.c.gf > sides.c.ga, 1), else_=0)).label("won"),
+            func.sum(case((sides.c.gf == sides.c.ga, 1), else_=0)).label("drawn"),
+            func.sum(case((sides.c.gf < sides.c.ga, 1), else_=0)).label("lost"),
+            func.sum(sides.c.gf).label("goals_for"),
+            func.sum(sides.c.ga).label("goals_against"),
+        ).group_by(sides.c.championship_id, sides.c.team)
+    ).all()
+
+    teams = select(UserChampionship.championship_id, UserChampionship.team).where(UserChampionship.team.is_not(None))
+    if championship_id is not None:
+        teams = teams.where(UserChampionship.championship_id == championship_id)
+
+    rows = {
+        key: dict(zip(STAT_COLUMNS, (0,) * len(STAT_COLUMNS)))
+        for key in db.execute(teams.distinct()).tuples()
+    }
+    for t in totals:
+        rows[(t.championship_id, t.team)] = {
+            "played": t.played,
+            "won": t.won,
+            "drawn": t.drawn,
+            "lost": t.lost,
+            "goals_for": t.goals_for,
+            "goals_against": t.goals_against,
+            "points": t.won * POINTS_WIN + t.drawn * POINTS_DRAW,
+        }
+
+    clear = delete(Standing)
+    if championship_id is not None:
+        clear = clear.where(Standing.championship_id == championship_id)
+    db.execute(clear)
+    if rows:
+        db.execute(
+            insert(Standing),
+            [{"championship_id": cid, "team": team, **stats} for (cid, team), stats in rows.items()],
+        )
+    db.commit()
+    invalidate_standings(championship_id)
+    return len({cid for cid, _team in rows})
@@ -0,0 +1,259 @@
+# Agregados diários de jogos (daily_stats) e por jogadora (user_daily_stats).
+# Cada jogo contribui no dia da sua data (UTC): jogos no calendário, jogos encerrados,
+# gols e participações; as jogadoras recebem jogos, resultado e gols do seu lado.
+# As rotas que mudam um jogo aplicam a diferença entre o estado anterior e o novo na mesma
+# transação (apply_match_change); recompute_stats reconstrói tudo (cli.py).
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Optional
+
+from sqlalchemy import Date, case, cast, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from db.database import dialect_insert, utcnow
+from models.daily_stats import DailyStats
+from models.match import Match, MatchStatus
+from models.user_daily_stats import UserDailyStats
+from models.user_match import UserMatch
+
+DAILY_COLUMNS = ("games_total", "games_played", "total_goals", "participations")
+USER_COLUMNS = ("games_played", "won", "drawn", "lost", "goals_for", "goals_against")
+
+
+@dataclass(frozen=True)
+class MatchState:
+    day: Optional[date]
+    status: Optional[MatchStatus]
+    score_home: Optional[int]
+    score_away: Optional[int]
+
+    @property
+    def finished(self) -> bool:
+        return self.day is not None and self.status == MatchStatus.finished
+
+
+def match_state(m) -> MatchState:
+    scheduled_at = m.scheduled_at
+    return MatchState(
+        day=scheduled_at.date() if scheduled_at else None,
+        status=m.status,
+        score_home=m.score_home,
+        score_away=m.score_away,
+    )
+
+
+def _daily(state: MatchState, players: int) -> dict:
+    if state.day is None or state.status == MatchStatus.canceled:
+        return {}
+    if not state.finished:
+        return {"games_total": 1}
+    return {
+        "games_total": 1,
+        "games_played": 1,
+        "total_goals": (state.score_home or 0) + (state.score_away or 0),
+        "participations": players,
+    }
+
+
+def _side(state: MatchState, side: str) -> dict:
+    if not state.finished:
+        return {}
+    goals_for, goals_against = state.score_home, state.score_away
+    if side == "away":
+        goals_for, goals_against = goals_against, goals_for
+    if goals_for is None or goals_against is None:
+        return {"games_played": 1}
+    return {
+        "games_played": 1,
+        "won": int(goals_for > goals_against),
+        "drawn": int(goals_for == goals_against),
+        "lost": int(goals_for < goals_against),
+        "goals_for": goals_for,
+        "goals_against": goals_against,
+    }
+
+
+def _upsert_add(db: Session, model, keys: tuple, columns: tuple, rows: list[dict]) -> None:
+    # INSERT ... ON CONFLICT DO UPDATE somando os valores às colunas existentes
+    if not rows:
+        return
+    stmt = dialect_insert(db.get_bind(), model)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={name: getattr(model, name) + getattr(stmt.excluded, name) for name in columns},
+    )
+    db.execute(stmt, [{name: row.get(name, 0) for name in keys + columns} for row in rows])
+
+
+def _changes(by_key: dict) -> list[dict]:
+    return [
+        {**dict(key), **delta}
+        for key, delta in by_key.items()
+        if any(delta.values())
+    ]
+
+
+def _accumulate(by_key: dict, key, contribution: dict, sign: int) -> None:
+    delta = by_key.setdefault(key, Counter())
+    for name, value in contribution.items():
+        delta[name] += sign * value
+
+
+def record_new_matches(db: Session, matches: list) -> None:
+    # Jogos recém-criados (ainda sem resultado): só contam no calendário do dia
+    per_day = Counter(m.scheduled_at.date() for m in matches if m.scheduled_at is not None)
+    _upsert_add(
+        db, DailyStats, ("day",), DAILY_COLUMNS,
+        [{"day": day, "games_total": n} for day, n in per_day.items()],
+    )
+
+
+def apply_match_change(db: Session, match_id: int, before: Optional[MatchState], after: MatchState) -> None:
+    apply_match_changes(db, [(match_id, before, after)])
+
+
+def apply_match_changes(db: Session, changes: list[tuple[int, Optional[MatchState], MatchState]]) -> None:
+    # Aplica (after - before) de cada jogo nos agregados, sem commit: um SELECT de elencos
+    # (só dos jogos com algum estado encerrado) e um upsert por tabela para o lote todo.
+    changes = [(match_id, before, after) for match_id, before, after in changes if before != after]
+    if not changes:
+        return
+    with_roster = [
+        match_id for match_id, before, after in changes
+        if after.finished or (before is not None and before.finished)
+    ]
+    rosters = defaultdict(list)
+    if with_roster:
+        for match_id, user_id, side in db.execute(
+            select(UserMatch.match_id, UserMatch.user_id, UserMatch.team_side).where(UserMatch.match_id.in_(with_roster))
+        ):
+            rosters[match_id].append((user_id, side))
+
+    daily: dict = {}
+    users: dict = {}
+    for match_id, before, after in changes:
+        roster = rosters.get(match_id, ())
+        for state, sign in ((before, -1), (after, 1)):
+            if state is None:
+                continue
+            if state.day is not None:
+                _accumulate(daily, (("day", state.day),), _daily(state, len(roster)), sign)
+            for user_id, side in roster:
+                _accumulate(users, (("user_id", user_id), ("day", state.day)), _side(state, side), sign)
+
+    _upsert_add(db, DailyStats, ("day",), DAILY_COLUMNS, _changes(daily))
+    _upsert_add(db, UserDailyStats, ("user_id", "day"), USER_COLUMNS, _changes(users))
+
+
+def _day(db: Session, column):
+    # Data (sem hora) de uma coluna DateTime; o SQLite guarda texto ISO
+    if db.get_bind().dialect.name == "sqlite":
+        return func.date(column)
+    return cast(column, Date)
+
+
+def recompute_stats(db: Session) -> int:
+    # Reconstrói os dois agregados a partir de matches/user_match. Retorna quantos dias
+    # foram gravados em daily_stats.
+    finished = Match.status == MatchStatus.finished
+    day = _day(db, Match.scheduled_at).label("day")
+
+    roster_size = (
+        select(func.count())
+        .select_from(UserMatch)
+        .where(UserMatch.match_id == Match.id)
+        .scalar_subquery()
+    )
+    daily = (
+        select(
+            day,
+            func.count(),
+            func.sum(case((finished, 1), else_=0)),
+            func.sum(case((finished, func.coalesce(Match.score_home, 0) + func.coalesce(Match.score_away, 0)), else_=0)),
+            func.sum(case((finished, roster_size), else_=0)),
+        )
+        .where(Match.scheduled_at.is_not(None), Match.status != MatchStatus.canceled)
+        .group_by(day)
+    )
+
+    home = UserMatch.team_side == "home"
+    goals_for = case((home, Match.score_home), else_=Match.score_away)
+    goals_against = case((home, Match.score_away), else_=Match.score_home)
+    scored = Match.score_home.is_not(None) & Match.score_away.is_not(None)
+    per_user = (
+        select(
+            UserMatch.user_id,
+            day,
+            func.count(),
+            func.sum(case((scored & (goals_for > goals_against), 1), else_=0)),
+            func.sum(case((scored & (goals_for == goals_against), 1), else_=0)),
+            func.sum(case((scored & (goals_for < goals_against), 1), else_=0)),
+            func.sum(case((scored, goals_for), else_=0)),
+            func.sum(case((scored, goals_against), else_=0)),
+        )
+        .join(Match, Match.id == UserMatch.match_id)
+        .where(finished, Match.scheduled_at.is_not(None))
+        .group_by(UserMatch.user_id, day)
+    )
+
+    db.execute(delete(UserDailyStats))
+    db.execute(delete(DailyStats))
+    result = db.execute(insert(DailyStats).from_select(["day", *DAILY_COLUMNS], daily))
+    db.execute(insert(UserDailyStats).from_select(["user_id", "day", *USER_COLUMNS], per_user))
+    db.commit()
+    return result.rowcount
+
+
+def _window(days: int, period: str) -> tuple[date, list[date]]:
+    # Dias (ou inícios de semana, segunda-feira) da janela que termina hoje (UTC)
+    today = utcnow().date()
+    if period == "week":
+        end = today - timedelta(days=today.weekday())
+        buckets = [end - timedelta(weeks=i) for i in range(days - 1, -1, -1)]
+    else:
+        buckets = [today - timedelta(days=i) for i in range(days - 1, -1, -1)]
+    return buckets[0], buckets
+
+
+def _bucket(day: date, period: str) -> date:
+    return day - timedelta(days=day.weekday()) if period == "week" else day
+
+
+def recent_stats(db: Session, size: int, period: str = "day") -> list[dict]:
+    # Série dos últimos `size` dias/semanas, com zeros nos períodos sem jogos
+    start, buckets = _window(size, period)
+    series = {b: dict.fromkeys(DAILY_COLUMNS, 0) for b in buckets}
+    rows = db.execute(
+        select(DailyStats).where(DailyStats.day >= start, DailyStats.day <= utcnow().date())
+    ).scalars()
+    for row in rows:
+        totals = series[_bucket(row.day, period)]
+        for name in DAILY_COLUMNS:
+            totals[name] += getattr(row, name)
+    return [{"date": b, **series[b]} for b in buckets]
+
+
+def user_stats(db: Session, user_id: int, size: int, period: str = "day") -> dict:
+    totals = db.execute(
+        select(*(func.coalesce(func.sum(getattr(UserDailyStats, name)), 0).label(name) for name in USER_COLUMNS))
+        .where(UserDailyStats.user_id == user_id)
+    ).one()._asdict()
+
+    start, buckets = _window(size, period)
+    series = {b: dict.fromkeys(USER_COLUMNS, 0) for b in buckets}
+    rows = db.execute(
+        select(UserDailyStats).where(
+            UserDailyStats.user_id == user_id,
+            UserDailyStats.day >= start,
+            UserDailyStats.day <= utcnow().date(),
+        )
+    ).scalars()
+    for row in rows:
+        bucket = series[_bucket(row.day, period)]
+        for name in USER_COLUMNS:
+            bucket[name] += getattr(row, name)
+    return {
+        "totals": totals,
+        "recent": [{"date": b, **series[b]} for b in buckets],
+    }
@@ -1,16 +1,230 @@
-﻿from sqlalchemy import create_engine
+﻿import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from core.config import settings
 
-# Banco de dados SQLite para teste rodando localmente. Cria um arquivo app.db na raiz do projeto.
-DATABASE_URL = "sqlite:///./app.db"
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class PoolMetrics:
+    # Contadores do pool de conexões (checkout/checkin, espera e timeouts)
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def incr(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "checked_out": self.checkouts - self.checkins,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    # QueuePool que mede quanto tempo cada checkout espera por uma conexão livre
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception:
+            pool_metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_metrics.record_wait(time.perf_counter() - start)
+        return conn
+
+
+def _set_sqlite_pragmas(dbapi_connection, _connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.close()
+
+
+def _register_pool_metrics(engine: Engine) -> None:
+    event.listen(engine, "connect", lambda *_: pool_metrics.incr("connects"))
+    event.listen(engine, "checkout", lambda *_: pool_metrics.incr("checkouts"))
+    event.listen(engine, "checkin", lambda *_: pool_metrics.incr("checkins"))
+    event.listen(engine, "invalidate", lambda *_: pool_metrics.incr("invalidations"))
+
+
+def create_db_engine(database_url: str = settings.DATABASE_URL) -> Engine:
+    url = make_url(database_url)
+    # psycopg2 é o driver declarado nas dependências do projeto
+    if url.drivername in ("postgres", "postgresql"):
+        url = url.set(drivername="postgresql+psycopg2")
+    kwargs = {}
+    connect_args = {}
+
+    if url.get_backend_name() == "sqlite":
+        connect_args["check_same_thread"] = False
+        connect_args["timeout"] = settings.SQLITE_BUSY_TIMEOUT_MS / 1000
+        in_memory = url.database in (None, "", ":memory:")
+    else:
+        in_memory = False
+        if url.get_backend_name() == "postgresql" and settings.DB_STATEMENT_TIMEOUT_MS:
+            connect_args["options"] = f"-c statement_timeout={int(settings.DB_STATEMENT_TIMEOUT_MS)}"
+
+    # Banco em memória usa o pool padrão do SQLite (uma conexão por thread)
+    if not in_memory:
+        kwargs.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
+
+    engine = create_engine(url, connect_args=connect_args, **kwargs)
+
+    if url.get_backend_name() == "sqlite":
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+    _register_pool_metrics(engine)
+    return engine
+
+
+# Drivers assíncronos equivalentes aos síncronos (extra "async" do pyproject)
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def create_async_db_engine(database_url: str = settings.DATABASE_URL) -> "AsyncEngine":
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in _ASYNC_DRIVERS:
+        raise ValueError(f"Sem driver assíncrono configurado para '{backend}'")
+    url = url.set(drivername=_ASYNC_DRIVERS[backend])
+
+    kwargs = {}
+    connect_args = {}
+    if backend == "sqlite":
+        connect_args["timeout"] = settings.SQLITE_BUSY_TIMEOUT_MS / 1000
+    elif settings.DB_STATEMENT_TIMEOUT_MS:
+        connect_args["server_settings"] = {"statement_timeout": str(int(settings.DB_STATEMENT_TIMEOUT_MS))}
+
+    if url.database not in (None, "", ":memory:"):
+        kwargs.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
+
+    async_engine = create_async_engine(url, connect_args=connect_args, **kwargs)
+
+    if backend == "sqlite":
+        event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    _register_pool_metrics(async_engine.sync_engine)
+    return async_engine
+
+
+engine = create_db_engine()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+
+def utcnow() -> datetime:
+    # Datas gravadas sem fuso, em UTC (padrão das colunas DateTime do projeto)
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def dialect_insert(bind, table):
+    # insert() do dialeto em uso, com on_conflict_do_update/do_nothing (PostgreSQL e SQLite)
+    if bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
+
+# Esperas por lock que estouraram o limite: SQLite "database is locked" (busy_timeout) e, no
+# PostgreSQL, lock_not_available, serialization_failure e deadlock_detected
+_PG_LOCK_CODES = {"55P03", "40001", "40P01"}
+
+
+def is_lock_timeout(exc: DBAPIError) -> bool:
+    orig = exc.orig
+    if getattr(orig, "pgcode", None) in _PG_LOCK_CODES:
+        return True
+    return "database is locked" in str(orig) or "database table is locked" in str(orig)
+
+
+# No SQLite há um escritor por vez e a espera pelo lock (busy_timeout) é por sondagem, sem
+# ordem de chegada: numa rajada de escritas algumas estouram o limite e viram 503. As escritas
+# concorrentes do processo fazem fila aqui; o busy_timeout fica só para outros processos.
+_sqlite_writes = threading.Lock()
+
+
+@contextmanager
+def serialized_writes(db):
+    # Envolve a transação de escrita inteira, até o commit (sem efeito fora do SQLite)
+    if db.get_bind().dialect.name != "sqlite":
+        yield
+        return
+    # Fila parada além do busy_timeout: segue e deixa o SQLite decidir
+    acquired = _sqlite_writes.acquire(timeout=settings.SQLITE_BUSY_TIMEOUT_MS / 1000)
+    try:
+        yield
+    finally:
+        if acquired:
+            _sqlite_writes.release()
+
+
+# Só criado com DB_ASYNC=True, para não exigir os drivers assíncronos no modo padrão
+async_engine = None
+AsyncSessionLocal = None
+if settings.DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    async_engine = create_async_db_engine()
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 def get_db():
     db = SessionLocal()
     try:
@@ -19,5 +233,38 @@ def get_db():
         db.close()
 
 
-def create_tables():
-    Base.metadata.create_all(engine)
\ No newline at end of file
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Chave do pg_advisory_xact_lock que serializa as migrações entre processos
+MIGRATION_LOCK_KEY = 0x5B01A
+
+
+def _stamp_pre_alembic(config, connection) -> None:
+    # Banco criado por create_tables() antes do Alembic: tabelas sem alembic_version. Marca a
+    # revisão 0001 (o mesmo esquema) para o upgrade não tentar criá-las de novo.
+    from alembic import command
+    from sqlalchemy import inspect
+
+    tables = set(inspect(connection).get_table_names())
+    if "championships" in tables and "alembic_version" not in tables:
+        command.stamp(config, "0001")
+
+
+def run_migrations(revision: str = "head"):
+    # Aplica as migrações do Alembic (alembic.ini / migrations/) no banco configurado
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(str(Path(__file__).resolve().parent.parent / "alembic.ini"))
+    config.attributes["configure_logger"] = False
+    with engine.begin() as connection:
+        # Vários processos migrando ao mesmo tempo: no PostgreSQL um espera o outro e encontra
+        # o banco já atualizado (o lock é liberado no commit)
+        if connection.dialect.name == "postgresql":
+            connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        config.attributes["connection"] = connection
+        _stamp_pre_alembic(config, connection)
+        command.upgrade(config, revision)
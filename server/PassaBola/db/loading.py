@@ -0,0 +1,77 @@
+# Perfis de carregamento de relacionamentos.
+# Os modelos declaram lazy='raise': nada é carregado implicitamente e acessar um
+# relacionamento não carregado gera erro. Cada rota escolhe aqui o que precisa:
+#   db.query(Match).options(*MATCH_CARD)
+# As leituras de jogos que só montam o payload selecionam GAME_COLUMNS, sem entidades.
+from sqlalchemy.orm import joinedload, load_only, selectinload
+
+from models.championship import Championship
+from models.match import Match
+from models.user import User
+from models.user_championship import UserChampionship
+from models.user_match import UserMatch
+
+# Colunas dos payloads de jogo (GameOut/MeGame, crud.match.game_fields)
+GAME_COLUMNS = (
+    Match.id,
+    Match.championship_id,
+    Match.round,
+    Match.home_team,
+    Match.away_team,
+    Match.scheduled_at,
+    Match.location,
+    Match.status,
+    Match.score_home,
+    Match.score_away,
+)
+
+# Jogo que a rota vai alterar: as colunas do payload e as usadas nas regras da tabela
+MATCH_CARD = (
+    load_only(
+        Match.id,
+        Match.championship_id,
+        Match.round,
+        Match.slot,
+        Match.home_team,
+        Match.away_team,
+        Match.scheduled_at,
+        Match.location,
+        Match.status,
+        Match.score_home,
+        Match.score_away,
+    ),
+)
+
+# Jogo + nome do campeonato em um único SELECT
+MATCH_WITH_CHAMPIONSHIP = MATCH_CARD + (
+    joinedload(Match.championship).load_only(Championship.id, Championship.name),
+)
+
+# Jogo + jogadoras inscritas (uma consulta extra para os vínculos e usuários)
+MATCH_WITH_PLAYERS = MATCH_CARD + (
+    selectinload(Match.participants).joinedload(UserMatch.user),
+)
+
+# Apenas o necessário para validar inscrição/fechamento
+CHAMPIONSHIP_STATE = (
+    load_only(Championship.id, Championship.name, Championship.number_players, Championship.is_closed),
+)
+
+# Campeonato + ids das inscritas
+CHAMPIONSHIP_WITH_PARTICIPANTS = CHAMPIONSHIP_STATE + (
+    selectinload(Championship.user_championship_links).load_only(UserChampionship.user_id),
+)
+
+# Usuário sem vínculos: o suficiente para autenticação e /auth/me
+USER_ACCOUNT = (
+    load_only(
+        User.id,
+        User.name,
+        User.email,
+        User.phone_number,
+        User.document,
+        User.birth_date,
+        User.admin,
+        User.position,
+    ),
+)
@@ -1,10 +1,13 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from core.config import settings
-from db.database import create_tables
+from crud.pagination import InvalidCursor
+from db.database import async_engine, engine, is_lock_timeout, run_migrations
 from middleware.auth_middleware import AuthMiddleware
 from routers.auth_router import router as auth_router
 from contextlib import asynccontextmanager
+from sqlalchemy.exc import DBAPIError
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -14,11 +17,41 @@ async def lifespan(app: FastAPI):
     from models import user_championship as _user_championship  # noqa: F401
     from models import match as _match # noqa: F401
     from models import user_match as _user_match # noqa: F401
+    from models import standing as _standing # noqa: F401
+    from models import daily_stats as _daily_stats # noqa: F401
+    from models import user_daily_stats as _user_daily_stats # noqa: F401
+    from models import championship_waitlist as _championship_waitlist # noqa: F401
+    from models import championship_list_version as _championship_list_version # noqa: F401
+    from models import job as _job # noqa: F401
 
-    create_tables()
+    # Desenvolvimento (.env); em produção as migrações rodam no deploy, com python cli.py migrate
+    if settings.DB_AUTO_MIGRATE:
+        run_migrations()
+
+    # Com Redis, os eventos de push chegam às conexões de todos os workers
+    if settings.CACHE_URL:
+        from core.cache_backend import redis_client
+        from core.events import broker
+        broker.start_bridge(redis_client())
+
+    if settings.INGEST_ENABLED:
+        from core.ingest import ingest_worker
+        from crud.ingest import PROCESSORS
+        ingest_worker.start(PROCESSORS)
+
+    # Os handlers dos jobs são registrados na importação dos routers
+    from core.jobs import job_runner
+    job_runner.start(settings.JOBS_WORKERS)
     yield
 
-from routers import championship, match
+    job_runner.stop()
+    if settings.INGEST_ENABLED:
+        ingest_worker.stop()
+
+    if async_engine is not None:
+        await async_engine.dispose()
+
+from routers import championship, match, export, stats, events, jobs
 app = FastAPI(
     title="Passa Bola",
     version="0.1.0",
@@ -27,16 +60,45 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursor):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+# Contenção de escrita (ex.: rajada de inscrições no SQLite) vira 503 com Retry-After, não 500
+@app.exception_handler(DBAPIError)
+async def lock_timeout_handler(request: Request, exc: DBAPIError):
+    if not is_lock_timeout(exc):
+        raise exc
+    return JSONResponse(status_code=503, content={"detail": "Database busy, try again"}, headers={"Retry-After": "1"})
+
 @app.get("/health")
 def health():
     from datetime import datetime, timezone
     return {"status": "ok", "time": datetime.now(timezone.utc).isoformat()}
 
 
+# Com DB_ASYNC, as rotas de leitura assíncronas são registradas antes e têm precedência
+if settings.DB_ASYNC:
+    from routers import async_reads
+    app.include_router(async_reads.router)
+
 app.include_router(championship.router)
 app.include_router(match.router)
+app.include_router(export.router)
+app.include_router(stats.router)
+app.include_router(events.router)
+app.include_router(jobs.router)
+
+if settings.INGEST_ENABLED:
+    from routers import ingest
+    app.include_router(ingest.router)
 
-app.add_middleware(AuthMiddleware, protected_prefixes=["/"], exclude_prefixes=["/auth"])
+# Com METRICS_TOKEN, /metrics é autenticada pelo próprio token (routers/metrics.py)
+auth_excluded = ["/auth", "/metrics"] if settings.METRICS_ENABLED and settings.METRICS_TOKEN else ["/auth"]
+# Status dos pedidos da fila de ingestão: o cadastro ainda não tem token
+if settings.INGEST_ENABLED:
+    auth_excluded.append("/requests")
+app.add_middleware(AuthMiddleware, protected_prefixes=["/"], exclude_prefixes=auth_excluded, query_token_prefixes=["/events"])
 
 app.include_router(auth_router)
 
@@ -48,6 +110,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Por último: a mais externa, mede também autenticação e CORS
+if settings.METRICS_ENABLED:
+    from core.metrics import MetricsMiddleware, instrument_engine
+    from routers import metrics
+
+    instrument_engine(engine)
+    if async_engine is not None:
+        instrument_engine(async_engine.sync_engine)
+    app.include_router(metrics.router)
+    app.add_middleware(MetricsMiddleware)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
@@ -1,58 +1,76 @@
 ﻿from typing import Optional, Callable, Iterable
+from urllib.parse import parse_qs
 
 from jose import JWTError
-from starlette.requests import Request
 from starlette.responses import Response
 
-from core.security import decode_access_token
+from core.security import decode_access_token_cached
 
 
 class AuthMiddleware:
-    def __init__(self, app, protected_prefixes: Optional[Iterable[str]] = None, exclude_prefixes: Optional[Iterable[str]] = None):
+    def __init__(
+        self,
+        app,
+        protected_prefixes: Optional[Iterable[str]] = None,
+        exclude_prefixes: Optional[Iterable[str]] = None,
+        query_token_prefixes: Optional[Iterable[str]] = None,
+    ):
         self.app = app
         self.protected_prefixes = tuple(protected_prefixes or ())
         self.exclude_prefixes = tuple(exclude_prefixes or ("/auth",))
+        # Rotas que aceitam o token em ?access_token= (EventSource não envia headers)
+        self.query_token_prefixes = tuple(query_token_prefixes or ())
 
     async def __call__(self, scope, receive, send):
         if scope["type"] != "http":
             await self.app(scope, receive, send)
             return
 
-        request = Request(scope, receive=receive)
+        path = scope["path"]
 
         # If path matches any exclude prefix, let it pass (endpoints themselves can still require auth)
-        if self._is_excluded(request.url.path):
+        if self._is_excluded(path):
             await self.app(scope, receive, send)
             return
 
-        token = self._extract_bearer(request)
+        token = self._extract_bearer(scope)
+        if not token and path.startswith(self.query_token_prefixes):
+            token = self._extract_query_token(scope)
         user_email = None
 
         if token:
             try:
-                payload = decode_access_token(token)
+                payload = decode_access_token_cached(token)
                 user_email = payload.get("sub")
-                request.state.access_token = token
-                request.state.user_email = user_email
+                # Compartilha o token já verificado com as dependências via request.state
+                state = scope.setdefault("state", {})
+                state["access_token"] = token
+                state["token_claims"] = payload
+                state["user_email"] = user_email
             except JWTError:
-                if self._is_protected(request.url.path):
+                if self._is_protected(path):
                     await self._unauthorized(scope, receive, send, "Token inválido")
                     return
 
-        if self._is_protected(request.url.path) and not user_email:
+        if self._is_protected(path) and not user_email:
             await self._unauthorized(scope, receive, send, "Não autenticado")
             return
 
         await self.app(scope, receive, send)
 
-    def _extract_bearer(self, request: Request) -> Optional[str]:
-        auth = request.headers.get("Authorization")
-        if not auth:
-            return None
-        if auth.lower().startswith("bearer "):
-            return auth.split(" ", 1)[1].strip()
+    def _extract_bearer(self, scope) -> Optional[str]:
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                auth = value.decode("latin-1")
+                if auth.lower().startswith("bearer "):
+                    return auth.split(" ", 1)[1].strip()
+                return None
         return None
 
+    def _extract_query_token(self, scope) -> Optional[str]:
+        values = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("access_token")
+        return values[0] if values else None
+
     async def _unauthorized(self, scope, receive, send, message: str):
         response = Response(
             content='{"detail": "' + message + '"}',
@@ -62,7 +80,7 @@ class AuthMiddleware:
         await response(scope, receive, send)
 
     def _is_protected(self, path: str) -> bool:
-        return any(path.startswith(prefix) for prefix in self.protected_prefixes)
+        return path.startswith(self.protected_prefixes)
 
     def _is_excluded(self, path: str) -> bool:
-        return any(path.startswith(prefix) for prefix in self.exclude_prefixes)
\ No newline at end of file
+        return path.startswith(self.exclude_prefixes)
@@ -0,0 +1,61 @@
+from logging.config import fileConfig
+
+from alembic import context
+
+from db.database import Base, engine
+from models import user as _user  # noqa: F401
+from models import championship as _championship  # noqa: F401
+from models import user_championship as _user_championship  # noqa: F401
+from models import match as _match  # noqa: F401
+from models import user_match as _user_match  # noqa: F401
+from models import standing as _standing  # noqa: F401
+from models import daily_stats as _daily_stats  # noqa: F401
+from models import user_daily_stats as _user_daily_stats  # noqa: F401
+from models import championship_waitlist as _championship_waitlist  # noqa: F401
+from models import championship_list_version as _championship_list_version  # noqa: F401
+from models import job as _job  # noqa: F401
+
+config = context.config
+
+# Quando executado pela aplicação (db.database.run_migrations), mantém o logging do uvicorn
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def _configure(**kwargs) -> None:
+    context.configure(
+        target_metadata=target_metadata,
+        # SQLite não suporta a maioria dos ALTER TABLE; o modo batch recria a tabela
+        render_as_batch=engine.dialect.name == "sqlite",
+        compare_type=True,
+        **kwargs,
+    )
+
+
+def run_migrations_offline() -> None:
+    _configure(url=engine.url, literal_binds=True, dialect_opts={"paramstyle": "named"})
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
+    with engine.connect() as connection:
+        _configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
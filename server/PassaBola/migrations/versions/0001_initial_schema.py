@@ -0,0 +1,106 @@
+"""initial schema
+
+Esquema criado por create_tables() antes da adoção do Alembic. Bancos já existentes
+são marcados com esta revisão por db.database.run_migrations (python cli.py migrate);
+com o alembic direto, use `alembic stamp 0001` antes do primeiro `alembic upgrade head`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'championships',
+        sa.Column('number_players', sa.Integer(), nullable=True),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.Column('is_closed', sa.Boolean(), nullable=True),
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_championships_id', 'championships', ['id'], unique=False)
+
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.Column('email', sa.String(), nullable=True),
+        sa.Column('phone_number', sa.String(), nullable=True),
+        sa.Column('document', sa.String(), nullable=True),
+        sa.Column('password_hash', sa.String(), nullable=True),
+        sa.Column('birth_date', sa.Date(), nullable=True),
+        sa.Column('admin', sa.Boolean(), nullable=True),
+        sa.Column(
+            'position',
+            sa.Enum('goleira', 'zagueira', 'lateral', 'meio_campo', 'atacante', name='position_enum'),
+            nullable=True,
+        ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('phone_number'),
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+    op.create_index('ix_users_id', 'users', ['id'], unique=False)
+
+    op.create_table(
+        'matches',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('championship_id', sa.Integer(), nullable=False),
+        sa.Column('scheduled_at', sa.DateTime(), nullable=True),
+        sa.Column('location', sa.String(), nullable=True),
+        sa.Column(
+            'status',
+            sa.Enum('scheduled', 'in_progress', 'finished', 'canceled', name='matchstatus'),
+            nullable=False,
+        ),
+        sa.Column('score_home', sa.Integer(), nullable=True),
+        sa.Column('score_away', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['championship_id'], ['championships.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_matches_id', 'matches', ['id'], unique=False)
+
+    op.create_table(
+        'user_championship',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('championship_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['championship_id'], ['championships.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('user_id', 'championship_id'),
+    )
+
+    op.create_table(
+        'user_match',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('match_id', sa.Integer(), nullable=False),
+        sa.Column('team_side', sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(['match_id'], ['matches.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('user_id', 'match_id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_match')
+    op.drop_table('user_championship')
+    op.drop_index('ix_matches_id', table_name='matches')
+    op.drop_table('matches')
+    op.drop_index('ix_users_id', table_name='users')
+    op.drop_index('ix_users_email', table_name='users')
+    op.drop_table('users')
+    op.drop_index('ix_championships_id', table_name='championships')
+    op.drop_table('championships')
+    sa.Enum(name='matchstatus').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='position_enum').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,35 @@
+"""championships.participants_count
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:05:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('championships') as batch_op:
+        batch_op.add_column(sa.Column('participants_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Preenche a contagem a partir das inscrições existentes
+    op.execute(
+        "UPDATE championships SET participants_count = ("
+        "SELECT COUNT(*) FROM user_championship "
+        "WHERE user_championship.championship_id = championships.id)"
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('championships') as batch_op:
+        batch_op.drop_column('participants_count')
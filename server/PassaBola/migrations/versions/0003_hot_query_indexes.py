@@ -0,0 +1,33 @@
+"""indexes for match and link table lookups
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 09:10:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_matches_championship_id_scheduled_at', 'matches', ['championship_id', 'scheduled_at'])
+    op.create_index('ix_matches_championship_id_status', 'matches', ['championship_id', 'status'])
+    op.create_index('ix_matches_status_scheduled_at', 'matches', ['status', 'scheduled_at'])
+    op.create_index('ix_user_match_match_id', 'user_match', ['match_id'])
+    op.create_index('ix_user_championship_championship_id', 'user_championship', ['championship_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_championship_championship_id', table_name='user_championship')
+    op.drop_index('ix_user_match_match_id', table_name='user_match')
+    op.drop_index('ix_matches_status_scheduled_at', table_name='matches')
+    op.drop_index('ix_matches_championship_id_status', table_name='matches')
+    op.drop_index('ix_matches_championship_id_scheduled_at', table_name='matches')
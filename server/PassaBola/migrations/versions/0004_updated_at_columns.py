@@ -0,0 +1,35 @@
+"""updated_at on championships, matches and link tables
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 10:20:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('championships', 'matches', 'user_match', 'user_championship')
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        # O SQLite não aceita ADD COLUMN com default não constante: recria a tabela
+        with op.batch_alter_table(table, recreate='always') as batch_op:
+            batch_op.add_column(sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=False))
+            batch_op.create_index(f'ix_{table}_updated_at', ['updated_at'])
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_index(f'ix_{table}_updated_at')
+            batch_op.drop_column('updated_at')
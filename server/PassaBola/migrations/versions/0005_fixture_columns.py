@@ -0,0 +1,51 @@
+"""fixture columns: championship format, match round/slot/teams, participant team
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 10:50:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('championships') as batch_op:
+        batch_op.add_column(sa.Column('format', sa.String(), nullable=True))
+
+    with op.batch_alter_table('matches') as batch_op:
+        batch_op.add_column(sa.Column('round', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('slot', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('home_team', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('away_team', sa.Integer(), nullable=True))
+
+    with op.batch_alter_table('user_championship') as batch_op:
+        batch_op.add_column(sa.Column('team', sa.Integer(), nullable=True))
+        # Passa a cobrir também a busca do elenco de cada time
+        batch_op.drop_index('ix_user_championship_championship_id')
+        batch_op.create_index('ix_user_championship_championship_id_team', ['championship_id', 'team'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('user_championship') as batch_op:
+        batch_op.drop_index('ix_user_championship_championship_id_team')
+        batch_op.create_index('ix_user_championship_championship_id', ['championship_id'])
+        batch_op.drop_column('team')
+
+    with op.batch_alter_table('matches') as batch_op:
+        batch_op.drop_column('away_team')
+        batch_op.drop_column('home_team')
+        batch_op.drop_column('slot')
+        batch_op.drop_column('round')
+
+    with op.batch_alter_table('championships') as batch_op:
+        batch_op.drop_column('format')
@@ -0,0 +1,39 @@
+"""standings table
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 11:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'standings',
+        sa.Column('championship_id', sa.Integer(), nullable=False),
+        sa.Column('team', sa.Integer(), nullable=False),
+        sa.Column('played', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('won', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('drawn', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('lost', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('goals_for', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('goals_against', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('points', sa.Integer(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['championship_id'], ['championships.id']),
+        sa.PrimaryKeyConstraint('championship_id', 'team'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('standings')
@@ -0,0 +1,49 @@
+"""daily stats rollup tables
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 12:10:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, Sequence[str], None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'daily_stats',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('games_total', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('games_played', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('total_goals', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('participations', sa.Integer(), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('day'),
+    )
+    op.create_table(
+        'user_daily_stats',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('games_played', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('won', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('drawn', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('lost', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('goals_for', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('goals_against', sa.Integer(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('user_id', 'day'),
+    )
+    # Jogos já existentes entram nos agregados com: python cli.py recompute-stats
+
+
+def downgrade() -> None:
+    op.drop_table('user_daily_stats')
+    op.drop_table('daily_stats')
@@ -0,0 +1,45 @@
+"""championships.max_participants and championship_waitlist table
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 16:10:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, Sequence[str], None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('championships') as batch_op:
+        batch_op.add_column(sa.Column('max_participants', sa.Integer(), nullable=True))
+
+    op.create_table(
+        'championship_waitlist',
+        sa.Column('championship_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['championship_id'], ['championships.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('championship_id', 'user_id'),
+    )
+    op.create_index(
+        'ix_championship_waitlist_championship_id_created_at',
+        'championship_waitlist',
+        ['championship_id', 'created_at'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_championship_waitlist_championship_id_created_at', table_name='championship_waitlist')
+    op.drop_table('championship_waitlist')
+    with op.batch_alter_table('championships') as batch_op:
+        batch_op.drop_column('max_participants')
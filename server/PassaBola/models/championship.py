@@ -1,13 +1,23 @@
-﻿from sqlalchemy import Column, Integer, String, Boolean
+﻿from sqlalchemy import Column, Integer, String, Boolean, DateTime, func
 from sqlalchemy.ext.associationproxy import association_proxy
 from sqlalchemy.orm import relationship
-from db.database import Base
+from db.database import Base, utcnow
 
 class Championship(Base):
     __tablename__ = 'championships'
     number_players = Column(Integer)
     name = Column(String)
     is_closed = Column(Boolean, default=False)
+    # Mantido pelas rotas de inscrição na mesma transação; reconciliável via cli.py
+    participants_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Limite de inscritas (nulo = sem limite), aplicado no UPDATE condicional da inscrição
+    # (crud/championship.py:add_participant); number_players é o tamanho dos times
+    max_participants = Column(Integer, nullable=True)
+    # round_robin | knockout, definido ao fechar as inscrições (crud/fixtures.py)
+    format = Column(String, nullable=True)
+    # Incrementada a cada escrita no campeonato ou nos seus jogos; base dos ETags (core/http_cache.py)
+    version = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime, nullable=False, default=utcnow, onupdate=utcnow, server_default=func.now(), index=True)
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -15,7 +25,7 @@ class Championship(Base):
         'UserChampionship',
         back_populates='championship',
         cascade='all, delete-orphan',
-        lazy='selectin'
+        lazy='raise'
     )
 
     users = association_proxy(
@@ -23,4 +33,4 @@ class Championship(Base):
         'user'
     )
 
-    matches = relationship('Match', back_populates='championship', cascade='all, delete-orphan', lazy='selectin')
+    matches = relationship('Match', back_populates='championship', cascade='all, delete-orphan', lazy='raise')
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer
+from db.database import Base
+
+# Linha única da tabela (id=1)
+LIST_VERSION_ID = 1
+
+class ChampionshipListVersion(Base):
+    __tablename__ = 'championships_list_version'
+    # Contador incrementado na mesma transação de cada escrita nos campeonatos
+    # (crud/championship.py:bump_list_version); base do ETag de GET /championships
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0, server_default="0")
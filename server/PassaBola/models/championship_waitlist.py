@@ -0,0 +1,12 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, func
+from db.database import Base, utcnow
+
+class ChampionshipWaitlist(Base):
+    __tablename__ = 'championship_waitlist'
+    # Fila de espera de campeonatos lotados (max_participants), em ordem de chegada
+    # (created_at, user_id); a primeira da fila assume a vaga de quem sai
+    __table_args__ = (Index('ix_championship_waitlist_championship_id_created_at', 'championship_id', 'created_at'),)
+
+    championship_id = Column(ForeignKey('championships.id'), primary_key=True)
+    user_id = Column(ForeignKey('users.id'), primary_key=True)
+    created_at = Column(DateTime, nullable=False, default=utcnow, server_default=func.now())
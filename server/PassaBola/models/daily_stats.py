@@ -0,0 +1,14 @@
+﻿from sqlalchemy import Column, Date, Integer
+from db.database import Base
+
+class DailyStats(Base):
+    __tablename__ = 'daily_stats'
+    # Agregado por dia (data do jogo, UTC) mantido incrementalmente por crud/stats.py;
+    # reconstruível via cli.py
+
+    day = Column(Date, primary_key=True)
+
+    games_total = Column(Integer, nullable=False, default=0, server_default="0")
+    games_played = Column(Integer, nullable=False, default=0, server_default="0")
+    total_goals = Column(Integer, nullable=False, default=0, server_default="0")
+    participations = Column(Integer, nullable=False, default=0, server_default="0")
@@ -0,0 +1,29 @@
+from sqlalchemy import JSON, Boolean, Column, DateTime, ForeignKey, Index, Integer, String, Text, false, func
+from db.database import Base, utcnow
+
+class Job(Base):
+    __tablename__ = 'jobs'
+    # Tarefas administrativas em segundo plano (core/jobs.py). O worker de cada processo
+    # retira os jobs queued por ordem de id; run_after adia as novas tentativas.
+    __table_args__ = (Index('ix_jobs_status_id', 'status', 'id'),)
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(50), nullable=False)
+    # queued | running | succeeded | failed | cancelled
+    status = Column(String(20), nullable=False, default='queued')
+    params = Column(JSON, nullable=False, default=dict)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    progress = Column(Integer, nullable=False, default=0, server_default='0')
+    total = Column(Integer, nullable=True)
+    message = Column(String, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default='0')
+    max_attempts = Column(Integer, nullable=False, default=1, server_default='1')
+    cancel_requested = Column(Boolean, nullable=False, default=False, server_default=false())
+    created_by = Column(ForeignKey('users.id'), nullable=True)
+    run_after = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=utcnow, server_default=func.now())
+    started_at = Column(DateTime, nullable=True)
+    # Atualizado pelo worker enquanto o job roda; parado há JOBS_LEASE_SECONDS = worker caiu
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
@@ -1,9 +1,9 @@
 ﻿import enum
 
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, String, Enum
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, String, Enum, Index, func
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.associationproxy import association_proxy
-from db.database import Base
+from db.database import Base, utcnow
 
 class MatchStatus(enum.Enum):
     scheduled = 'scheduled'
@@ -13,6 +13,13 @@ class MatchStatus(enum.Enum):
 
 class Match(Base):
     __tablename__ = 'matches'
+    __table_args__ = (
+        # Jogos do campeonato ordenados por data / filtrados por status
+        Index('ix_matches_championship_id_scheduled_at', 'championship_id', 'scheduled_at'),
+        Index('ix_matches_championship_id_status', 'championship_id', 'status'),
+        # /me/games: filtro por status ordenado por data
+        Index('ix_matches_status_scheduled_at', 'status', 'scheduled_at'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     championship_id = Column(Integer, ForeignKey('championships.id'), nullable=False)
@@ -21,16 +28,26 @@ class Match(Base):
     location = Column(String)
     status = Column(Enum(MatchStatus), default=MatchStatus.scheduled, nullable=False)
 
+    # Tabela gerada em crud/fixtures.py: rodada, posição na chave (mata-mata) e número dos
+    # times (UserChampionship.team); nulos enquanto o confronto não está definido
+    round = Column(Integer, nullable=True)
+    slot = Column(Integer, nullable=True)
+    home_team = Column(Integer, nullable=True)
+    away_team = Column(Integer, nullable=True)
+
     score_home = Column(Integer)
     score_away = Column(Integer)
 
-    championship = relationship('Championship', back_populates='matches', lazy='joined')
+    # Atualizado a cada escrita; base das exportações incrementais (routers/export.py)
+    updated_at = Column(DateTime, nullable=False, default=utcnow, onupdate=utcnow, server_default=func.now(), index=True)
+
+    championship = relationship('Championship', back_populates='matches', lazy='raise')
 
     participants = relationship(
         'UserMatch',
         back_populates='match',
         cascade='all, delete-orphan',
-        lazy='selectin'
+        lazy='raise'
     )
 
     users = association_proxy('participants', 'user')
@@ -0,0 +1,18 @@
+﻿from sqlalchemy import Column, ForeignKey, Integer
+from db.database import Base
+
+class Standing(Base):
+    __tablename__ = 'standings'
+    # Classificação por time (UserChampionship.team), atualizada incrementalmente a cada
+    # placar registrado (crud/standings.py); reconciliável via cli.py
+
+    championship_id = Column(ForeignKey('championships.id'), primary_key=True)
+    team = Column(Integer, primary_key=True)
+
+    played = Column(Integer, nullable=False, default=0, server_default="0")
+    won = Column(Integer, nullable=False, default=0, server_default="0")
+    drawn = Column(Integer, nullable=False, default=0, server_default="0")
+    lost = Column(Integer, nullable=False, default=0, server_default="0")
+    goals_for = Column(Integer, nullable=False, default=0, server_default="0")
+    goals_against = Column(Integer, nullable=False, default=0, server_default="0")
+    points = Column(Integer, nullable=False, default=0, server_default="0")
@@ -32,7 +32,7 @@ class User(Base):
         'UserChampionship',
         back_populates='user',
         cascade='all, delete-orphan',
-        lazy='selectin'
+        lazy='raise'
     )
 
     championships = association_proxy(
@@ -40,5 +40,5 @@ class User(Base):
         'championship'
     )
 
-    match_links = relationship('UserMatch', back_populates='user', cascade='all, delete-orphan', lazy='selectin')
+    match_links = relationship('UserMatch', back_populates='user', cascade='all, delete-orphan', lazy='raise')
     matches = association_proxy('match_links', 'match')
@@ -1,12 +1,18 @@
-﻿from sqlalchemy import Column, ForeignKey
+﻿from sqlalchemy import Column, ForeignKey, Index, Integer, DateTime, func
 from sqlalchemy.orm import relationship
-from db.database import Base
+from db.database import Base, utcnow
 
 class UserChampionship(Base):
     __tablename__ = 'user_championship'
+    # A PK começa por user_id; buscas por campeonato (contagens, fechamento) e por time
+    # (elencos na geração da tabela) usam este índice
+    __table_args__ = (Index('ix_user_championship_championship_id_team', 'championship_id', 'team'),)
 
     user_id = Column(ForeignKey('users.id'), primary_key=True)
     championship_id = Column(ForeignKey('championships.id'), primary_key=True)
+    # Time sorteado ao fechar as inscrições
+    team = Column(Integer, nullable=True)
+    updated_at = Column(DateTime, nullable=False, default=utcnow, onupdate=utcnow, server_default=func.now(), index=True)
 
-    user = relationship('User', back_populates='user_championship_links')
-    championship = relationship('Championship', back_populates='user_championship_links')
+    user = relationship('User', back_populates='user_championship_links', lazy='raise')
+    championship = relationship('Championship', back_populates='user_championship_links', lazy='raise')
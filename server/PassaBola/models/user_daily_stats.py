@@ -0,0 +1,15 @@
+﻿from sqlalchemy import Column, Date, ForeignKey, Integer
+from db.database import Base
+
+class UserDailyStats(Base):
+    __tablename__ = 'user_daily_stats'
+
+    user_id = Column(ForeignKey('users.id'), primary_key=True)
+    day = Column(Date, primary_key=True)
+
+    games_played = Column(Integer, nullable=False, default=0, server_default="0")
+    won = Column(Integer, nullable=False, default=0, server_default="0")
+    drawn = Column(Integer, nullable=False, default=0, server_default="0")
+    lost = Column(Integer, nullable=False, default=0, server_default="0")
+    goals_for = Column(Integer, nullable=False, default=0, server_default="0")
+    goals_against = Column(Integer, nullable=False, default=0, server_default="0")
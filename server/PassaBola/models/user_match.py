@@ -1,14 +1,17 @@
-﻿from sqlalchemy import Column, Integer, ForeignKey, String
+﻿from sqlalchemy import Column, Integer, ForeignKey, String, Index, DateTime, func
 from sqlalchemy.orm import relationship
-from db.database import Base
+from db.database import Base, utcnow
 
 class UserMatch(Base):
     __tablename__ = 'user_match'
+    # A PK começa por user_id; buscas por partida (export, contagens) usam este índice
+    __table_args__ = (Index('ix_user_match_match_id', 'match_id'),)
 
     user_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
     match_id = Column(Integer, ForeignKey('matches.id'), primary_key=True)
 
     team_side = Column(String)
+    updated_at = Column(DateTime, nullable=False, default=utcnow, onupdate=utcnow, server_default=func.now(), index=True)
 
-    user = relationship('User', back_populates='match_links')
-    match = relationship('Match', back_populates='participants')
+    user = relationship('User', back_populates='match_links', lazy='raise')
+    match = relationship('Match', back_populates='participants', lazy='raise')
@@ -0,0 +1,131 @@
+# Variantes assíncronas (AsyncSession) das rotas de leitura mais acessadas.
+# Incluído em main.py antes dos routers síncronos quando DB_ASYNC=True; as rotas têm os
+# mesmos caminhos e payloads, então têm precedência sobre as versões síncronas.
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core import http_cache
+from core.dependencies import Principal, get_current_principal
+from crud import championship as championship_crud
+from crud import match as match_crud
+from crud.pagination import next_cursor
+from db.database import get_async_db
+from schemas.championship import ChampionshipListResponse, ChampionshipWithCount
+from schemas.match import GameListResponse, GameOut, MyGamesResponse
+
+router = APIRouter()
+
+
+@router.get("/championships", response_model=ChampionshipListResponse, tags=["championships"], dependencies=[Depends(get_current_principal)])
+async def list_championships(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    status: Optional[str] = Query(None, pattern="^(open|closed|ongoing|completed)$"),
+    q: Optional[str] = Query(None),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    after: Optional[str] = Query(None, description="Cursor (next_cursor da página anterior); ativa a paginação por cursor"),
+    include_total: bool = Query(True),
+):
+    etag = http_cache.make_etag(request, (await db.execute(championship_crud.list_version_query())).scalar_one())
+    cached = http_cache.cached_response(request, etag, http_cache.LIST_CACHE_CONTROL)
+    if cached is not None:
+        return cached
+
+    rows, total = await championship_crud.list_championships_with_count_async(
+        db, status=status, q=q, page=page, page_size=page_size, after=after, include_total=include_total,
+    )
+    out = [
+        ChampionshipWithCount(
+            id=r.id,
+            name=r.name or "",
+            number_players=r.number_players or 0,
+            is_closed=bool(r.is_closed),
+            participants_count=r.participants_count,
+            max_participants=r.max_participants,
+        )
+        for r in rows
+    ]
+    return http_cache.json_response(etag, http_cache.LIST_CACHE_CONTROL, ChampionshipListResponse(
+        items=out,
+        page=page,
+        page_size=page_size,
+        total=total,
+        next_cursor=next_cursor(rows, page_size, championship_crud.championship_cursor_key),
+    ))
+
+
+@router.get("/championships/{championship_id}/games", response_model=GameListResponse, tags=["championships"], dependencies=[Depends(get_current_principal)])
+async def list_championship_games(
+    championship_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    round: Optional[int] = Query(None, ge=1),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    after: Optional[str] = Query(None, description="Cursor (next_cursor da página anterior); ativa a paginação por cursor"),
+    include_total: bool = Query(True),
+):
+    version = (await db.execute(championship_crud.version_query(championship_id))).scalar_one_or_none()
+    etag = http_cache.make_etag(request, version)
+    cached = http_cache.cached_response(request, etag, http_cache.REVALIDATE)
+    if cached is not None:
+        return cached
+
+    q = match_crud.championship_games_query(championship_id, round)
+    items, total = await match_crud.list_games_async(
+        db, q, ("championship_games", championship_id, round),
+        page=page, page_size=page_size, after=after, include_total=include_total,
+    )
+    return http_cache.json_response(etag, http_cache.REVALIDATE, GameListResponse(
+        items=[match_crud.to_game_out(m) for m in items],
+        page=page,
+        page_size=page_size,
+        total=total,
+        next_cursor=next_cursor(items, page_size, match_crud.game_cursor_key),
+    ))
+
+
+@router.get("/games/{game_id}", response_model=GameOut, tags=["games"], dependencies=[Depends(get_current_principal)])
+async def get_game(game_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    version = (await db.execute(match_crud.game_version_query(game_id))).scalar_one_or_none()
+    if version is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Game not found")
+    etag = http_cache.make_etag(request, version)
+    cached = http_cache.cached_response(request, etag, http_cache.REVALIDATE)
+    if cached is not None:
+        return cached
+
+    m = (await db.execute(match_crud.game_query(game_id))).one_or_none()
+    if not m:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Game not found")
+    return http_cache.json_response(etag, http_cache.REVALIDATE, match_crud.to_game_out(m))
+
+
+@router.get("/me/games", response_model=MyGamesResponse, tags=["games"])
+async def my_games(
+    status: str = Query(..., pattern="^(upcoming|completed)$"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    after: Optional[str] = Query(None, description="Cursor (next_cursor da página anterior); ativa a paginação por cursor"),
+    include_total: bool = Query(True),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    statuses = ["scheduled"] if status == "upcoming" else ["finished"]
+
+    base = match_crud.user_games_query(current_user.id, statuses)
+    items, total = await match_crud.list_games_async(
+        db, base, ("user_games", current_user.id, status),
+        page=page, page_size=page_size, after=after, include_total=include_total,
+    )
+
+    return MyGamesResponse(
+        items=[match_crud.to_me_game(m) for m in items],
+        page=page,
+        page_size=page_size,
+        total=total,
+        next_cursor=next_cursor(items, page_size, match_crud.game_cursor_key),
+    )
@@ -1,35 +1,66 @@
 ﻿# Rotas de autenticação dos usuários
 from datetime import timedelta
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
+from core import ingest
+from core.config import settings
 from core.dependencies import get_current_user
 from db.database import get_db
 from models.user import User
 from schemas.auth import SignupIn, LoginIn, TokenOut, UserOut
+from schemas.ingest import IngestRequestOut
 from core.security import (
-    get_password_hash,
-    verify_password,
+    password_hasher,
+    PasswordHasherBusy,
     create_access_token,
     ACCESS_TOKEN_EXPIRE_MINUTES,
 )
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
-@router.post("/signup", response_model=UserOut, status_code=status.HTTP_201_CREATED)
-def signup(payload: SignupIn, db: Session = Depends(get_db)):
-    # E-mail deve ser único
-    existing = db.query(User).filter(User.email == payload.email).first()
-    if existing:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email já cadastrado")
+# As rotas são async: o hash roda no pool dedicado (core.security.password_hasher) e o
+# acesso ao banco no threadpool, sem ocupar um worker durante o hash. As leituras encerram a
+# transação antes do hash: até PASSWORD_HASH_MAX_PENDING requisições esperam o pool de hash, mais
+# do que as conexões do banco, e nenhuma delas deve segurar uma conexão enquanto espera.
+
+async def _hash_or_429(coro):
+    try:
+        return await coro
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Muitas requisições de autenticação, tente novamente",
+            headers={"Retry-After": "1"},
+        )
+
+def _email_taken(db: Session, email: str) -> bool:
+    taken = db.execute(select(User.id).where(User.email == email)).first() is not None
+    db.rollback()
+    return taken
 
+def _find_credentials(db: Session, email: str):
+    row = db.execute(
+        select(User.id, User.email, User.password_hash, User.admin).where(User.email == email)
+    ).first()
+    db.rollback()
+    return row
+
+def _update_password_hash(db: Session, user_id: int, password_hash: str) -> None:
+    db.execute(update(User).where(User.id == user_id).values(password_hash=password_hash))
+    db.commit()
+
+def _create_user(db: Session, payload: SignupIn, password_hash: str) -> User:
     user = User(
         name=payload.name,
         email=str(payload.email),
         phone_number=payload.phone_number,
         document=payload.document,
-        password_hash=get_password_hash(payload.password),
+        password_hash=password_hash,
         birth_date=payload.birth_date,
         admin=False,
         position=payload.position,
@@ -39,14 +70,44 @@ def signup(payload: SignupIn, db: Session = Depends(get_db)):
     db.refresh(user)
     return user
 
+@router.post(
+    "/signup",
+    response_model=UserOut,
+    status_code=status.HTTP_201_CREATED,
+    responses={202: {"model": IngestRequestOut, "description": "Na fila de ingestão (INGEST_ENABLED e Idempotency-Key)"}},
+)
+async def signup(
+    payload: SignupIn,
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", min_length=1, max_length=255),
+):
+    # Modo de ingestão: só grava o pedido na fila; e-mail e hash ficam para o worker
+    if idempotency_key and settings.INGEST_ENABLED:
+        return await run_in_threadpool(ingest.accept, "signup", "signup", idempotency_key, payload.model_dump(mode="json"))
+
+    # E-mail deve ser único
+    if await run_in_threadpool(_email_taken, db, str(payload.email)):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email já cadastrado")
+
+    password_hash = await _hash_or_429(password_hasher.hash(payload.password))
+    return await run_in_threadpool(_create_user, db, payload, password_hash)
+
 @router.post("/login", response_model=TokenOut)
-def login(payload: LoginIn, db: Session = Depends(get_db)):
+async def login(payload: LoginIn, db: Session = Depends(get_db)):
+
+    user = await run_in_threadpool(_find_credentials, db, str(payload.email))
 
-    user = db.query(User).filter(User.email == payload.email).first()
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = await _hash_or_429(password_hasher.verify_and_update(payload.password, user.password_hash or ""))
 
-    if not user or not verify_password(payload.password, user.password_hash or ""):
+    if not valid:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Email ou senha inválidos")
 
+    # Rounds/esquema mudaram desde o cadastro: regrava o hash com a configuração atual
+    if new_hash:
+        await run_in_threadpool(_update_password_hash, db, user.id, new_hash)
+
     token = create_access_token(
         subject=user.email,
         expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
@@ -1,17 +1,26 @@
 from typing import List, Optional
-from datetime import datetime, timedelta
+from datetime import timedelta
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from sqlalchemy import func, or_, select, update
 from sqlalchemy.orm import Session
 
-from db.database import get_db
-from schemas.championship import createChampionship, ChampionshipOut, ChampionshipWithCount, ChampionshipListResponse
+from db.database import SessionLocal, get_db, serialized_writes, utcnow
+from db.loading import CHAMPIONSHIP_STATE
+from schemas.championship import createChampionship, ChampionshipOut, ChampionshipWithCount, ChampionshipListResponse, CloseSignupsIn, CloseSignupsOut, JoinOut, LeaveOut, StandingOut, StandingsResponse
+from schemas.ingest import IngestRequestOut
+from schemas.job import JobOut
+from schemas.match import GameListResponse
 from crud import championship as championship_crud
+from crud import fixtures, standings
+from crud import stats as stats_crud
+from crud import match as match_crud
+from crud.pagination import invalidate_totals, next_cursor
 from models.championship import Championship
-from models.user_championship import UserChampionship
-from models.user import User
 from models.match import Match
-from core.dependencies import get_current_user, admin_required
+from core import http_cache, ingest, jobs
+from core.config import settings
+from core.dependencies import Principal, get_current_principal, admin_required
 
 router = APIRouter(tags=["championships"])
 
@@ -19,189 +28,290 @@ router = APIRouter(tags=["championships"])
 def create_championship_endpoint(data: createChampionship, db: Session = Depends(get_db)):
     return championship_crud.create_championship(db, data)
 
-@router.get("/championships", response_model=ChampionshipListResponse, dependencies=[Depends(get_current_user)])
+@router.get("/championships", response_model=ChampionshipListResponse, dependencies=[Depends(get_current_principal)])
 def list_championships(
+    request: Request,
     db: Session = Depends(get_db),
     status: Optional[str] = Query(None, pattern="^(open|closed|ongoing|completed)$"),
     q: Optional[str] = Query(None),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    after: Optional[str] = Query(None, description="Cursor (next_cursor da página anterior); ativa a paginação por cursor"),
+    include_total: bool = Query(True),
 ):
-    query = db.query(Championship)
+    etag = http_cache.make_etag(request, db.execute(championship_crud.list_version_query()).scalar_one())
+    cached = http_cache.cached_response(request, etag, http_cache.LIST_CACHE_CONTROL)
+    if cached is not None:
+        return cached
 
-    if q:
-        query = query.filter(Championship.name.ilike(f"%{q}%"))
-
-    if status:
-        if status == "open":
-            if hasattr(Championship, "is_closed"):
-                query = query.filter(Championship.is_closed == False)  # noqa: E712
-        else:
-            if hasattr(Championship, "is_closed"):
-                query = query.filter(Championship.is_closed == True)  # noqa: E712
-
-    total = query.count()
-    items = query.offset((page - 1) * page_size).limit(page_size).all()
-
-    out: list[ChampionshipWithCount] = []
-    for c in items:
-        participants_count = db.query(UserChampionship).filter(UserChampionship.championship_id == c.id).count()
-        out.append(ChampionshipWithCount(
-            id=c.id,
-            name=getattr(c, "name", ""),
-            number_players=getattr(c, "number_players", 0),
-            is_closed=bool(getattr(c, "is_closed", False)),
-            participants_count=participants_count,
-        ))
+    rows, total = championship_crud.list_championships_with_count(
+        db, status=status, q=q, page=page, page_size=page_size, after=after, include_total=include_total,
+    )
+    out = [_to_championship_with_count(r) for r in rows]
+    return http_cache.json_response(etag, http_cache.LIST_CACHE_CONTROL, ChampionshipListResponse(
+        items=out,
+        page=page,
+        page_size=page_size,
+        total=total,
+        next_cursor=next_cursor(rows, page_size, championship_crud.championship_cursor_key),
+    ))
 
-    return ChampionshipListResponse(items=out, page=page, page_size=page_size, total=total)
+@router.get("/championships/{championship_id}", response_model=ChampionshipWithCount, dependencies=[Depends(get_current_principal)])
+def get_championship(championship_id: int, request: Request, db: Session = Depends(get_db)):
+    version = db.execute(championship_crud.version_query(championship_id)).scalar_one_or_none()
+    if version is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Championship not found")
+    etag = http_cache.make_etag(request, version)
+    cached = http_cache.cached_response(request, etag, http_cache.REVALIDATE)
+    if cached is not None:
+        return cached
 
-@router.get("/championships/{championship_id}", response_model=ChampionshipWithCount, dependencies=[Depends(get_current_user)])
-def get_championship(championship_id: int, db: Session = Depends(get_db)):
-    c = db.query(Championship).filter(Championship.id == championship_id).first()
-    if not c:
+    row = championship_crud.get_championship_with_count(db, championship_id)
+    if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Championship not found")
-    participants_count = db.query(UserChampionship).filter(UserChampionship.championship_id == c.id).count()
+    return http_cache.json_response(etag, http_cache.REVALIDATE, _to_championship_with_count(row))
+
+def _to_championship_with_count(row) -> ChampionshipWithCount:
     return ChampionshipWithCount(
-        id=c.id,
-        name=getattr(c, "name", ""),
-        number_players=getattr(c, "number_players", 0),
-        is_closed=bool(getattr(c, "is_closed", False)),
-        participants_count=participants_count,
+        id=row.id,
+        name=row.name or "",
+        number_players=row.number_players or 0,
+        is_closed=bool(row.is_closed),
+        participants_count=row.participants_count,
+        max_participants=row.max_participants,
     )
 
-@router.post("/championships/{championship_id}/join", dependencies=[Depends(get_current_user)])
+@router.post(
+    "/championships/{championship_id}/join",
+    response_model=JoinOut,
+    responses={202: {"model": IngestRequestOut, "description": "Na fila de espera do campeonato ou, com Idempotency-Key, na fila de ingestão"}},
+)
 def join_championship(
     championship_id: int,
+    response: Response,
+    waitlist: bool = Query(False, description="Com o campeonato lotado, entra na fila de espera (202) em vez de 409"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", min_length=1, max_length=255),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
-    c = db.query(Championship).filter(Championship.id == championship_id).first()
-    if not c:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Championship not found")
+    if idempotency_key and settings.INGEST_ENABLED:
+        return ingest.accept(
+            "join", f"user:{current_user.id}", idempotency_key,
+            {"championship_id": championship_id, "user_id": current_user.id, "waitlist": waitlist},
+        )
+    with serialized_writes(db):
+        try:
+            count, position = championship_crud.join(db, championship_id, current_user.id, waitlist)
+        except championship_crud.JoinRefused as e:
+            db.rollback()
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+        db.commit()
+    if count is not None:
+        return JoinOut(championship_id=championship_id, joined=True, participants_count=count)
+    response.status_code = status.HTTP_202_ACCEPTED
+    return JoinOut(championship_id=championship_id, joined=False, waitlist_position=position)
 
-    if bool(getattr(c, "is_closed", False)):
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Championship is not open for signup")
+@router.delete("/championships/{championship_id}/join", response_model=LeaveOut)
+def leave_championship(
+    championship_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    # Sai do campeonato (ou da fila de espera) enquanto as inscrições estão abertas
+    with serialized_writes(db):
+        result = championship_crud.remove_participant(db, championship_id, current_user.id)
+        if result is None:
+            db.rollback()
+        else:
+            db.commit()
+    if result is None:
+        c = db.query(Championship).options(*CHAMPIONSHIP_STATE).filter(Championship.id == championship_id).first()
+        if not c:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Championship not found")
+        if bool(getattr(c, "is_closed", False)):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Championship is not open for signup")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not joined")
+    count, promoted = result
+    return LeaveOut(championship_id=championship_id, participants_count=count, promoted_user_id=promoted)
 
-    exists = db.query(UserChampionship).filter(
-        UserChampionship.user_id == current_user.id,
-        UserChampionship.championship_id == championship_id
-    ).first()
-    if exists:
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Already joined")
+@router.post(
+    "/championships/recount_participants",
+    dependencies=[Depends(admin_required)],
+    responses={202: {"model": JobOut, "description": "Em segundo plano (background=true)"}},
+)
+def recount_participants(
+    championship_id: Optional[int] = Query(None, ge=1),
+    background: bool = Query(False, description="Roda como job (202 + /jobs/{id})"),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(admin_required),
+):
+    if background:
+        return jobs.accepted(jobs.submit(db, "recount_participants", {"championship_id": championship_id}, current_user.id))
+    updated = championship_crud.recount_participants(db, championship_id)
+    return {"updated": updated}
 
-    db.add(UserChampionship(user_id=current_user.id, championship_id=championship_id))
-    db.commit()
-    count = db.query(UserChampionship).filter(UserChampionship.championship_id == championship_id).count()
-    return {"joined": True, "championship_id": championship_id, "participants_count": count}
+@router.post(
+    "/championships/recompute_standings",
+    dependencies=[Depends(admin_required)],
+    responses={202: {"model": JobOut, "description": "Em segundo plano (background=true)"}},
+)
+def recompute_standings(
+    championship_id: Optional[int] = Query(None, ge=1),
+    background: bool = Query(False, description="Roda como job (202 + /jobs/{id})"),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(admin_required),
+):
+    if background:
+        return jobs.accepted(jobs.submit(db, "recompute_standings", {"championship_id": championship_id}, current_user.id))
+    updated = standings.recompute_standings(db, championship_id)
+    return {"updated": updated}
 
-@router.post("/championships/{championship_id}/close_signups", dependencies=[Depends(admin_required)])
+@router.get("/championships/{championship_id}/standings", response_model=StandingsResponse, dependencies=[Depends(get_current_principal)])
+def get_standings(championship_id: int, db: Session = Depends(get_db)):
+    rows = standings.cached_standings(db, championship_id)
+    if not rows and not db.get(Championship, championship_id, options=CHAMPIONSHIP_STATE):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Championship not found")
+    # Leitura encerrada antes da validação do response_model (ver /me/games)
+    db.rollback()
+    return StandingsResponse(
+        championship_id=championship_id,
+        items=[
+            StandingOut(
+                position=i,
+                team_name=fixtures.team_name(s["team"]),
+                goal_difference=s["goals_for"] - s["goals_against"],
+                **s,
+            )
+            for i, s in enumerate(rows, start=1)
+        ],
+    )
+
+@router.post(
+    "/championships/{championship_id}/close_signups",
+    response_model=CloseSignupsOut,
+    dependencies=[Depends(admin_required)],
+    responses={202: {"model": JobOut, "description": "Em segundo plano (background=true)"}},
+)
 def close_signups(
     championship_id: int,
+    data: Optional[CloseSignupsIn] = None,
+    background: bool = Query(False, description="Gera a tabela num job (202 + /jobs/{id})"),
     db: Session = Depends(get_db),
+    current_user: Principal = Depends(admin_required),
 ):
-    c = db.query(Championship).filter(Championship.id == championship_id).first()
-    if not c:
+    data = data or CloseSignupsIn()
+    if background:
+        if db.get(Championship, championship_id, options=CHAMPIONSHIP_STATE) is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Championship not found")
+        db.rollback()
+        params = {"championship_id": championship_id, "data": data.model_dump(mode="json")}
+        return jobs.accepted(jobs.submit(db, "close_signups", params, current_user.id))
+    out = _close_signups(db, championship_id, data)
+    if out is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Championship not found")
+    return out
 
-    if getattr(c, "is_closed", False):
-        created_games: list[dict] = []
-        games = db.query(Match).filter(Match.championship_id == championship_id).all()
-        for g in games:
-            created_games.append({
-                "id": g.id,
-                "championship_id": g.championship_id,
-                "round": 1,
-                "home_team_name": None,
-                "away_team_name": None,
-                "date": getattr(g, "scheduled_at", None),
-                "location": getattr(g, "location", None),
-                "home_score": None,
-                "away_score": None,
-                "status": getattr(g, "status", None),
-            })
-        return {
-            "championship": {
-                "id": c.id,
-                "name": getattr(c, "name", ""),
-                "number_players": getattr(c, "number_players", 0),
-                "is_closed": True,
-            },
-            "created_games": created_games,
-        }
-
-    if hasattr(c, "is_closed"):
-        c.is_closed = True
-
-    participants = db.query(UserChampionship).filter(UserChampionship.championship_id == championship_id).all()
-    base_date = datetime.utcnow() + timedelta(days=3)
-    created = []
-    for i in range(0, max(0, len(participants) // 2)):
-        m = Match(championship_id=championship_id)
-        if hasattr(m, "scheduled_at"):
-            m.scheduled_at = base_date + timedelta(days=i)
-        if hasattr(m, "location"):
-            m.location = f"Stadium {chr(65 + (i % 5))}"
-        if hasattr(m, "status"):
-            m.status = "scheduled"
-        db.add(m)
-        created.append(m)
-
-    db.commit()
-    for m in created:
-        db.refresh(m)
-
-    return {
-        "championship": {
-            "id": c.id,
-            "name": getattr(c, "name", ""),
-            "number_players": getattr(c, "number_players", 0),
-            "is_closed": True,
-        },
-        "created_games": [
-            {
-                "id": m.id,
-                "championship_id": m.championship_id,
-                "round": 1,
-                "home_team_name": None,
-                "away_team_name": None,
-                "date": getattr(m, "scheduled_at", None),
-                "location": getattr(m, "location", None),
-                "home_score": None,
-                "away_score": None,
-                "status": getattr(m, "status", None),
-            }
-            for m in created
-        ],
-    }
+def _close_signups(db: Session, championship_id: int, data: CloseSignupsIn, ctx: Optional[jobs.JobContext] = None) -> Optional[CloseSignupsOut]:
+    c = db.query(Championship).options(*CHAMPIONSHIP_STATE).filter(Championship.id == championship_id).first()
+    if not c:
+        return None
+
+    # Fecha com UPDATE condicional: só uma requisição concorrente gera a tabela
+    closed = db.execute(
+        update(Championship)
+        .where(Championship.id == championship_id)
+        .where(or_(Championship.is_closed.is_(False), Championship.is_closed.is_(None)))
+        .values(is_closed=True, format=data.format, version=Championship.version + 1)
+    ).rowcount
+
+    if not closed:
+        db.rollback()
+        created_games = db.execute(
+            select(func.count()).select_from(Match).where(Match.championship_id == championship_id)
+        ).scalar_one()
+    else:
+        championship_crud.bump_list_version(db)
+        if ctx is not None:
+            ctx.progress(1, 3, "Gerando a tabela")
+        created = fixtures.create_fixtures(
+            db,
+            championship_id,
+            players_per_team=c.number_players or 1,
+            fmt=data.format,
+            start=data.start_date or (utcnow() + timedelta(days=3)),
+            venues=data.venues,
+            matches_per_day=data.matches_per_day,
+            interval=timedelta(minutes=data.match_interval_minutes),
+        )
+        stats_crud.record_new_matches(db, created)
+        # Último ponto de cancelamento: depois do commit a tabela já existe
+        if ctx is not None:
+            ctx.progress(2, 3, f"{len(created)} jogos gerados")
+        db.commit()
+        standings.invalidate_standings(championship_id)
+        invalidate_totals("championship_games", championship_id)
+        invalidate_totals("user_games")
+        created_games = len(created)
 
-@router.get("/championships/{championship_id}/games", dependencies=[Depends(get_current_user)])
+    return CloseSignupsOut(
+        championship=ChampionshipOut(
+            id=c.id,
+            name=c.name or "",
+            number_players=c.number_players or 0,
+            is_closed=True,
+        ),
+        created_games=created_games,
+        games_url=f"/championships/{championship_id}/games",
+    )
+
+@router.get("/championships/{championship_id}/games", response_model=GameListResponse, dependencies=[Depends(get_current_principal)])
 def list_championship_games(
     championship_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     round: Optional[int] = Query(None, ge=1),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    after: Optional[str] = Query(None, description="Cursor (next_cursor da página anterior); ativa a paginação por cursor"),
+    include_total: bool = Query(True),
 ):
-    q = db.query(Match).filter(Match.championship_id == championship_id)
-    total = q.count()
-    items = q.order_by(Match.scheduled_at.asc()).offset((page - 1) * page_size).limit(page_size).all()
-    return {
-        "items": [
-            {
-                "id": m.id,
-                "championship_id": m.championship_id,
-                "round": 1,
-                "home_team_name": None,
-                "away_team_name": None,
-                "date": getattr(m, "scheduled_at", None),
-                "location": getattr(m, "location", None),
-                "home_score": None,
-                "away_score": None,
-                "status": getattr(m, "status", None),
-            } for m in items
-        ],
-        "page": page,
-        "page_size": page_size,
-        "total": total,
-    }
\ No newline at end of file
+    # Campeonato inexistente responde a lista vazia, com versão None no ETag
+    version = db.execute(championship_crud.version_query(championship_id)).scalar_one_or_none()
+    etag = http_cache.make_etag(request, version)
+    cached = http_cache.cached_response(request, etag, http_cache.REVALIDATE)
+    if cached is not None:
+        return cached
+
+    q = match_crud.championship_games_query(championship_id, round)
+    items, total = match_crud.list_games(
+        db, q, ("championship_games", championship_id, round),
+        page=page, page_size=page_size, after=after, include_total=include_total,
+    )
+    return http_cache.json_response(etag, http_cache.REVALIDATE, GameListResponse(
+        items=[match_crud.to_game_out(m) for m in items],
+        page=page,
+        page_size=page_size,
+        total=total,
+        next_cursor=next_cursor(items, page_size, match_crud.game_cursor_key),
+    ))
+
+# Handlers dos jobs (core/jobs.py) das rotas acima com background=true
+
+def _close_signups_job(ctx: jobs.JobContext) -> dict:
+    with SessionLocal() as db:
+        out = _close_signups(db, ctx.params["championship_id"], CloseSignupsIn.model_validate(ctx.params["data"]), ctx)
+    if out is None:
+        raise jobs.JobError("Championship not found")
+    return {"championship_id": out.championship.id, "created_games": out.created_games, "games_url": out.games_url}
+
+def _recount_participants_job(ctx: jobs.JobContext) -> dict:
+    with SessionLocal() as db:
+        return {"updated": championship_crud.recount_participants(db, ctx.params.get("championship_id"))}
+
+def _recompute_standings_job(ctx: jobs.JobContext) -> dict:
+    with SessionLocal() as db:
+        return {"updated": standings.recompute_standings(db, ctx.params.get("championship_id"))}
+
+jobs.register("close_signups", _close_signups_job)
+jobs.register("recount_participants", _recount_participants_job)
+jobs.register("recompute_standings", _recompute_standings_job)
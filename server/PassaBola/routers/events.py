@@ -0,0 +1,181 @@
+# Push de eventos de jogos (core/events.py), como alternativa ao polling de /me/games e
+# /games/{id}: Server-Sent Events em GET /events e WebSocket em /events/ws.
+# Tópicos: championship_id e game_id (repetíveis) e mine=true (campeonatos da usuária).
+import asyncio
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from jose import JWTError
+from sqlalchemy import func, select
+
+from core.config import settings
+from core.dependencies import Principal, get_current_principal, load_principal
+from core.events import BrokerFull, broker
+from core.security import decode_access_token_cached
+from db.database import SessionLocal
+from models.championship import Championship
+from models.match import Match
+from models.user_championship import UserChampionship
+
+router = APIRouter(tags=["events"])
+
+MAX_TOPICS = 100
+
+
+def _resolve_topics(user_id: int, championship_ids: list[int], game_ids: list[int], mine: bool) -> list[str]:
+    # Sessão própria e curta: a conexão de push não pode segurar uma conexão do pool
+    with SessionLocal() as db:
+        championship_ids = set(championship_ids)
+        game_ids = set(game_ids)
+        if championship_ids:
+            found = db.execute(
+                select(func.count()).select_from(Championship).where(Championship.id.in_(championship_ids))
+            ).scalar_one()
+            if found != len(championship_ids):
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Championship not found")
+        if game_ids:
+            found = db.execute(select(func.count()).select_from(Match).where(Match.id.in_(game_ids))).scalar_one()
+            if found != len(game_ids):
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Game not found")
+        if mine:
+            championship_ids.update(db.execute(
+                select(UserChampionship.championship_id).where(UserChampionship.user_id == user_id)
+            ).scalars())
+
+    topics = [f"championship:{cid}" for cid in championship_ids] + [f"game:{gid}" for gid in game_ids]
+    if not topics:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No championship or game to follow")
+    if len(topics) > MAX_TOPICS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"At most {MAX_TOPICS} topics per connection")
+    return topics
+
+
+def _check_capacity() -> None:
+    if broker.subscribers >= broker.max_subscribers:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Too many event subscribers, try again later")
+
+
+async def _sse_stream(topics: list[str], last_event_id: Optional[str]):
+    # A inscrição acontece dentro do gerador: o finally sempre a desfaz
+    try:
+        sub = broker.subscribe(topics, last_event_id)
+    except BrokerFull:
+        yield "event: dropped\ndata: {}\n\n"
+        return
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            events = await sub.next_events(settings.EVENTS_HEARTBEAT_SECONDS)
+            if sub.dropped:
+                # Cliente lento: encerra; ele reconecta com Last-Event-ID e recebe o que perdeu
+                yield "event: dropped\ndata: {}\n\n"
+                return
+            if not events:
+                yield ": ping\n\n"
+                continue
+            yield "".join(e.sse for e in events)
+    finally:
+        broker.unsubscribe(sub)
+
+
+@router.get("/events")
+async def stream_events(
+    championship_id: List[int] = Query([]),
+    game_id: List[int] = Query([]),
+    mine: bool = Query(False, description="Segue os campeonatos em que a usuária está inscrita"),
+    last_event_id: Optional[str] = Query(None, description="Alternativa ao header Last-Event-ID"),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+    current_user: Principal = Depends(get_current_principal),
+):
+    _check_capacity()
+    topics = await run_in_threadpool(_resolve_topics, current_user.id, championship_id, game_id, mine)
+    return StreamingResponse(
+        _sse_stream(topics, last_event_id_header or last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _ws_send(websocket: WebSocket, sub) -> None:
+    while True:
+        events = await sub.next_events(settings.EVENTS_HEARTBEAT_SECONDS)
+        if sub.dropped:
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason="Consumer too slow")
+            return
+        if not events:
+            await websocket.send_text('{"type":"ping"}')
+        for event in events:
+            await websocket.send_text(event.text)
+
+
+async def _ws_receive(websocket: WebSocket) -> None:
+    # Mensagens do cliente são ignoradas; termina quando ele desconecta
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+
+
+def _websocket_principal(websocket: WebSocket, token: Optional[str]) -> Optional[Principal]:
+    # Navegadores não enviam Authorization no WebSocket: aceita também ?token=
+    auth = websocket.headers.get("authorization")
+    if auth and auth.lower().startswith("bearer "):
+        token = auth.split(" ", 1)[1].strip()
+    if not token:
+        return None
+    try:
+        sub = decode_access_token_cached(token).get("sub")
+    except JWTError:
+        return None
+    if not sub:
+        return None
+    with SessionLocal() as db:
+        try:
+            return load_principal(db, sub)
+        except HTTPException:
+            return None
+
+
+@router.websocket("/events/ws")
+async def websocket_events(
+    websocket: WebSocket,
+    championship_id: List[int] = Query([]),
+    game_id: List[int] = Query([]),
+    mine: bool = Query(False),
+    last_event_id: Optional[str] = Query(None),
+    token: Optional[str] = Query(None),
+):
+    principal = await run_in_threadpool(_websocket_principal, websocket, token)
+    if principal is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Não autenticado")
+        return
+    try:
+        _check_capacity()
+        topics = await run_in_threadpool(_resolve_topics, principal.id, championship_id, game_id, mine)
+    except HTTPException as e:
+        code = status.WS_1013_TRY_AGAIN_LATER if e.status_code == 503 else status.WS_1008_POLICY_VIOLATION
+        await websocket.close(code=code, reason=str(e.detail))
+        return
+
+    await websocket.accept()
+    try:
+        sub = broker.subscribe(topics, last_event_id)
+    except BrokerFull:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason="Too many event subscribers")
+        return
+    # O envio só percebe a desconexão no próximo heartbeat; a leitura percebe na hora. O que
+    # terminar primeiro encerra o outro e desfaz a inscrição.
+    tasks = {asyncio.create_task(_ws_send(websocket, sub)), asyncio.create_task(_ws_receive(websocket))}
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            error = task.exception()
+            if error is not None and not isinstance(error, WebSocketDisconnect):
+                raise error
+    finally:
+        # Sem await aqui: o handler pode estar sendo cancelado pelo servidor
+        for task in tasks:
+            task.cancel()
+        broker.unsubscribe(sub)
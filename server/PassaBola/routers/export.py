@@ -1,79 +1,418 @@
 import csv
+import enum
 import io
+import json
+from datetime import date, datetime, timezone
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import StreamingResponse
+from sqlalchemy import Boolean, Date, DateTime, Integer, func, null, select
 from sqlalchemy.orm import Session
 
-from core.dependencies import get_current_user
-from db.database import get_db
+from core import jobs
+from core.config import settings
+from core.dependencies import Principal, admin_required
+from db.database import get_db, SessionLocal
+from models.championship import Championship
 from models.user import User
 from models.match import Match
+from models.user_championship import UserChampionship
 from models.user_match import UserMatch
+from schemas.job import JobOut
 
 router = APIRouter(prefix="/export", tags=["export"])
 
+PLAYER_HEADER = [
+    "Name",
+    "Email",
+    "Phone Number",
+    "Document",
+    "Position",
+    "Birth Date",
+    "Team",
+]
 
-@router.get("/match/{match_id}/players/csv")
+# Colunas lidas diretamente (sem hidratar entidades) para as exportações de jogadoras
+_PLAYER_COLUMNS = (
+    User.name,
+    User.email,
+    User.phone_number,
+    User.document,
+    User.position,
+    User.birth_date,
+    UserMatch.team_side,
+)
+
+
+def _player_row(row) -> list:
+    return [
+        row.name,
+        row.email,
+        row.phone_number or "",
+        row.document or "",
+        row.position.value if isinstance(row.position, enum.Enum) else (row.position or ""),
+        row.birth_date.strftime("%Y-%m-%d") if row.birth_date else "",
+        row.team_side or "",
+    ]
+
+
+def _match_player_row(row) -> list:
+    return [
+        row.match_id,
+        row.championship_id,
+        row.scheduled_at.isoformat() if row.scheduled_at else "",
+    ] + _player_row(row)
+
+
+def _stream_csv(header: list, stmt, to_row):
+    # Gera o CSV em blocos de ~EXPORT_CHUNK_SIZE bytes, lendo o resultado em lotes de
+    # EXPORT_YIELD_PER linhas (cursor do lado do servidor no PostgreSQL). Usa uma sessão
+    # própria, que vive enquanto a resposta é transmitida.
+    db = SessionLocal()
+    try:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(header)
+
+        result = db.execute(stmt.execution_options(yield_per=settings.EXPORT_YIELD_PER))
+        for partition in result.partitions():
+            writer.writerows(to_row(row) for row in partition)
+            if buffer.tell() >= settings.EXPORT_CHUNK_SIZE:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        db.close()
+
+
+def _csv_response(filename: str, chunks) -> StreamingResponse:
+    return StreamingResponse(
+        chunks,
+        media_type="text/csv",
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}"
+        }
+    )
+
+
+def _match_players_query():
+    return (
+        select(Match.id.label("match_id"), Match.championship_id, Match.scheduled_at, *_PLAYER_COLUMNS)
+        .select_from(UserMatch)
+        .join(User, UserMatch.user_id == User.id)
+        .join(Match, UserMatch.match_id == Match.id)
+    )
+
+
+# Dados pessoais (e-mail, telefone, documento): só admin, como as demais exportações
+@router.get("/match/{match_id}/players/csv", dependencies=[Depends(admin_required)])
 def export_match_players_csv(
         match_id: int,
         db: Session = Depends(get_db),
-        current_user: User = Depends(get_current_user),
 ):
-    try:
-        match = db.query(Match).filter(Match.id == match_id).first()
-        if not match:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Match not found"
-            )
-
-        user_matches = (
-            db.query(UserMatch, User)
-            .join(User, UserMatch.user_id == User.id)
-            .filter(UserMatch.match_id == match_id)
-            .all()
+    exists = db.execute(select(Match.id).where(Match.id == match_id)).first()
+    if not exists:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Match not found"
+        )
+
+    stmt = (
+        select(*_PLAYER_COLUMNS)
+        .select_from(UserMatch)
+        .join(User, UserMatch.user_id == User.id)
+        .where(UserMatch.match_id == match_id)
+        .order_by(User.id)
+    )
+    return _csv_response(f"match_{match_id}_players.csv", _stream_csv(PLAYER_HEADER, stmt, _player_row))
+
+
+@router.get("/championship/{championship_id}/players/csv", dependencies=[Depends(admin_required)])
+def export_championship_players_csv(
+        championship_id: int,
+        db: Session = Depends(get_db),
+):
+    exists = db.execute(select(Championship.id).where(Championship.id == championship_id)).first()
+    if not exists:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Championship not found"
         )
 
-        output = io.StringIO()
-        writer = csv.writer(output)
-
-        writer.writerow([
-            "Name",
-            "Email",
-            "Phone Number",
-            "Document",
-            "Position",
-            "Birth Date",
-            "Team",
-            "Status"
-        ])
-
-        for user_match, user in user_matches:
-            writer.writerow([
-                user.name,
-                user.email,
-                user.phone_number or "",
-                user.document or "",
-                user.position or "",
-                user.birth_date.strftime("%Y-%m-%d") if user.birth_date else "",
-                user_match.team or "",
-                "Confirmed" if user_match.confirmed else "Pending"
-            ])
-
-        output.seek(0)
-        return StreamingResponse(
-            iter([output.getvalue()]),
-            media_type="text/csv",
-            headers={
-                "Content-Disposition": f"attachment; filename=match_{match_id}_players.csv"
-            }
+    stmt = (
+        _match_players_query()
+        .where(Match.championship_id == championship_id)
+        .order_by(Match.id, User.id)
+    )
+    header = ["Match ID", "Championship ID", "Scheduled At"] + PLAYER_HEADER
+    return _csv_response(
+        f"championship_{championship_id}_players.csv",
+        _stream_csv(header, stmt, _match_player_row),
+    )
+
+
+@router.get("/matches/players/csv", dependencies=[Depends(admin_required)])
+def export_all_match_players_csv():
+    stmt = _match_players_query().order_by(Match.id, User.id)
+    header = ["Match ID", "Championship ID", "Scheduled At"] + PLAYER_HEADER
+    return _csv_response("matches_players.csv", _stream_csv(header, stmt, _match_player_row))
+
+
+# Exportação em massa para analytics: tabelas inteiras em NDJSON ou em formato colunar
+# (Arrow IPC / Parquet, com o extra opcional pyarrow). Cada lote lido do banco
+# (EXPORT_YIELD_PER linhas) vira um record batch. Exportações incrementais filtram por
+# since_id (chave inteira da tabela) e/ou updated_since (coluna updated_at).
+BULK_TABLES = {
+    # tabela: (modelo, chave usada por since_id, ordenação). As tabelas de vínculo não têm
+    # chave crescente: um vínculo novo pode entrar numa partida ou campeonato antigo (elenco
+    # do jogo seguinte no mata-mata, inscrição), abaixo de qualquer since_id já exportado.
+    # Nelas a exportação incremental é só por updated_since.
+    "championships": (Championship, Championship.id, (Championship.id,)),
+    "matches": (Match, Match.id, (Match.id,)),
+    "user_match": (UserMatch, None, (UserMatch.match_id, UserMatch.user_id)),
+    "user_championship": (UserChampionship, None, (UserChampionship.championship_id, UserChampionship.user_id)),
+}
+
+BULK_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def _plain(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} não serializável")
+
+
+def _stream_ndjson(columns: list, stmt, on_batch=None):
+    db = SessionLocal()
+    try:
+        buffer = io.StringIO()
+        names = [c.name for c in columns]
+        result = db.execute(stmt.execution_options(yield_per=settings.EXPORT_YIELD_PER))
+        for partition in result.partitions():
+            for row in partition:
+                buffer.write(json.dumps(
+                    {name: _plain(value) for name, value in zip(names, row)},
+                    default=_json_default,
+                    separators=(",", ":"),
+                    ensure_ascii=False,
+                ))
+                buffer.write("\n")
+            if on_batch is not None:
+                on_batch(len(partition))
+            if buffer.tell() >= settings.EXPORT_CHUNK_SIZE:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        db.close()
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def _arrow_schema(pa, columns: list):
+    fields = []
+    for c in columns:
+        # Enum herda de String e cai em string
+        if isinstance(c.type, Boolean):
+            arrow_type = pa.bool_()
+        elif isinstance(c.type, Integer):
+            arrow_type = pa.int64()
+        elif isinstance(c.type, DateTime):
+            arrow_type = pa.timestamp("us")
+        elif isinstance(c.type, Date):
+            arrow_type = pa.date32()
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(c.name, arrow_type, nullable=c.nullable))
+    return pa.schema(fields)
+
+
+def _stream_columnar(pa, fmt: str, columns: list, stmt, on_batch=None):
+    # Arrow IPC (stream) ou Parquet (um row group por lote), escritos num buffer que é
+    # esvaziado a cada lote
+    schema = _arrow_schema(pa, columns)
+    db = SessionLocal()
+    sink = io.BytesIO()
+    try:
+        if fmt == "arrow":
+            writer = pa.ipc.new_stream(sink, schema)
+        else:
+            writer = pa.parquet.ParquetWriter(sink, schema)
+
+        result = db.execute(stmt.execution_options(yield_per=settings.EXPORT_YIELD_PER))
+        for partition in result.partitions():
+            arrays = [
+                pa.array([_plain(row[i]) for row in partition], type=field.type)
+                for i, field in enumerate(schema)
+            ]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            if on_batch is not None:
+                on_batch(len(partition))
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+
+        writer.close()
+        yield sink.getvalue()
+    finally:
+        db.close()
+
+
+def _bulk_query(db: Session, table: str, since_id: Optional[int], updated_since: Optional[datetime]):
+    model, key, order_by = BULK_TABLES[table]
+    columns = list(model.__table__.columns)
+
+    filters = []
+    if since_id is not None:
+        filters.append(key > since_id)
+    if updated_since is not None:
+        if updated_since.tzinfo is not None:
+            updated_since = updated_since.astimezone(timezone.utc).replace(tzinfo=None)
+        filters.append(model.updated_at > updated_since)
+
+    # Marcas d'água lidas antes de transmitir: a exportação não passa delas, e o próximo
+    # job incremental parte delas (X-Export-Max-Id / X-Export-Watermark). Linhas podem
+    # se repetir entre exportações; o consumidor deve fazer upsert pela chave primária.
+    max_key, watermark = db.execute(
+        select(func.max(key) if key is not None else null(), func.max(model.updated_at)).where(*filters)
+    ).one()
+    if max_key is not None:
+        filters.append(key <= max_key)
+    if watermark is not None and (updated_since is not None or key is None):
+        filters.append(model.updated_at <= watermark)
+
+    stmt = select(*columns).where(*filters).order_by(*order_by)
+    return columns, stmt, max_key, watermark
+
+
+def _pyarrow_or_501(format: str):
+    if format == "ndjson":
+        return None
+    pa = _import_pyarrow()
+    if pa is None:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Columnar export requires pyarrow (uv sync --extra export)"
         )
+    return pa
+
 
-    except HTTPException:
-        raise
-    except Exception as e:
+@router.get(
+    "/bulk/{table}",
+    dependencies=[Depends(admin_required)],
+    responses={202: {"model": JobOut, "description": "Gravada em arquivo por um job (background=true); baixe em /jobs/{id}/download"}},
+)
+def export_bulk(
+        table: str,
+        format: str = Query("ndjson", pattern="^(ndjson|arrow|parquet)$"),
+        since_id: Optional[int] = Query(None, description="Só linhas com id maior que este valor (championships e matches)"),
+        updated_since: Optional[datetime] = Query(None, description="Só linhas alteradas depois deste instante (UTC)"),
+        background: bool = Query(False, description="Grava a exportação em arquivo num job (202 + /jobs/{id})"),
+        db: Session = Depends(get_db),
+        current_user: Principal = Depends(admin_required),
+):
+    if table not in BULK_TABLES:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to export match players: {str(e)}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Table not found"
+        )
+    if since_id is not None and BULK_TABLES[table][1] is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"since_id is not supported for {table}, use updated_since"
+        )
+    pa = _pyarrow_or_501(format)
+    if background:
+        params = {"table": table, "format": format, "since_id": since_id, "updated_since": updated_since}
+        return jobs.accepted(jobs.submit(db, "export_bulk", params, current_user.id))
+
+    columns, stmt, max_key, watermark = _bulk_query(db, table, since_id, updated_since)
+    if pa is None:
+        chunks = _stream_ndjson(columns, stmt)
+    else:
+        chunks = _stream_columnar(pa, format, columns, stmt)
+
+    headers = {"Content-Disposition": f"attachment; filename={table}.{format}"}
+    if max_key is not None:
+        headers["X-Export-Max-Id"] = str(max_key)
+    if watermark is not None:
+        headers["X-Export-Watermark"] = watermark.isoformat()
+    return StreamingResponse(chunks, media_type=BULK_MEDIA_TYPES[format], headers=headers)
+
+
+def _export_bulk_job(ctx: jobs.JobContext) -> dict:
+    # Mesma exportação da rota, gravada em JOBS_OUTPUT_DIR; o arquivo só aparece completo
+    table, format = ctx.params["table"], ctx.params["format"]
+    pa = None
+    if format != "ndjson":
+        pa = _import_pyarrow()
+        if pa is None:
+            raise jobs.JobError("Columnar export requires pyarrow (uv sync --extra export)")
+    updated_since = ctx.params.get("updated_since")
+    with SessionLocal() as db:
+        columns, stmt, max_key, watermark = _bulk_query(
+            db, table, ctx.params.get("since_id"), datetime.fromisoformat(updated_since) if updated_since else None,
         )
+        total = db.execute(select(func.count()).select_from(stmt.order_by(None).subquery())).scalar_one()
+
+    rows = 0
+
+    def on_batch(n: int) -> None:
+        nonlocal rows
+        rows += n
+        ctx.progress(rows, total)
+
+    ctx.progress(0, total, f"Exportando {table}")
+    if pa is None:
+        chunks = _stream_ndjson(columns, stmt, on_batch)
+    else:
+        chunks = _stream_columnar(pa, format, columns, stmt, on_batch)
+    path = ctx.output_path(format)
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+        tmp.replace(path)
+    finally:
+        chunks.close()
+        tmp.unlink(missing_ok=True)
+
+    return {
+        "table": table,
+        "format": format,
+        "rows": rows,
+        "bytes": path.stat().st_size,
+        "file": path.name,
+        "filename": f"{table}.{format}",
+        "media_type": BULK_MEDIA_TYPES[format],
+        "max_id": max_key,
+        "watermark": watermark,
+    }
+
+
+jobs.register("export_bulk", _export_bulk_job)
@@ -0,0 +1,22 @@
+# Status dos pedidos da fila de ingestão (core/ingest.py). Pública, como /auth: o cadastro
+# ainda não tem token, e o id aleatório do pedido só é conhecido por quem o enviou.
+from fastapi import APIRouter, HTTPException, Query, status
+from starlette.concurrency import run_in_threadpool
+
+from core import ingest
+from schemas.ingest import IngestRequestOut
+
+router = APIRouter(tags=["ingest"])
+
+
+@router.get("/requests/{request_id}", response_model=IngestRequestOut)
+async def get_ingest_request(
+    request_id: str,
+    wait: float = Query(0, ge=0, le=30, description="Segundos para esperar o pedido ser processado (long polling)"),
+):
+    row = await run_in_threadpool(ingest.ingest_queue.get, request_id)
+    if row is not None and wait and row["status"] in (ingest.PENDING, ingest.PROCESSING):
+        row = await ingest.wait_finished(request_id, wait)
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Request not found")
+    return ingest.to_out(row)
@@ -0,0 +1,92 @@
+# Acompanhamento dos jobs em segundo plano (core/jobs.py): status, progresso, resultado,
+# cancelamento, nova tentativa e download do arquivo gerado. Só administradores.
+from pathlib import Path
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from core import jobs
+from core.config import settings
+from core.dependencies import admin_required
+from db.database import get_db, utcnow
+from models.job import Job
+from schemas.job import JobListResponse, JobOut
+
+router = APIRouter(prefix="/jobs", tags=["jobs"], dependencies=[Depends(admin_required)])
+
+
+def _get_job(db: Session, job_id: int) -> Job:
+    job = db.get(Job, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
+
+
+@router.get("", response_model=JobListResponse)
+def list_jobs(
+    db: Session = Depends(get_db),
+    status: Optional[str] = Query(None, pattern="^(queued|running|succeeded|failed|cancelled)$"),
+    kind: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+):
+    stmt = select(Job).order_by(Job.id.desc()).limit(limit)
+    if status is not None:
+        stmt = stmt.where(Job.status == status)
+    if kind is not None:
+        stmt = stmt.where(Job.kind == kind)
+    return JobListResponse(items=[jobs.to_out(job) for job in db.execute(stmt).scalars()])
+
+
+@router.get("/{job_id}", response_model=JobOut)
+def get_job(job_id: int, db: Session = Depends(get_db)):
+    return jobs.to_out(_get_job(db, job_id))
+
+
+@router.post("/{job_id}/cancel", response_model=JobOut)
+def cancel_job(job_id: int, db: Session = Depends(get_db)):
+    # Na fila: cancela na hora. Rodando: o worker para no próximo checkpoint do handler
+    # (a transação do job é desfeita) e o status passa a cancelled.
+    _get_job(db, job_id)
+    cancelled = db.execute(
+        update(Job).where(Job.id == job_id, Job.status == jobs.QUEUED)
+        .values(status=jobs.CANCELLED, cancel_requested=True, finished_at=utcnow())
+    ).rowcount
+    if not cancelled:
+        cancelled = db.execute(
+            update(Job).where(Job.id == job_id, Job.status == jobs.RUNNING).values(cancel_requested=True)
+        ).rowcount
+    db.commit()
+    if not cancelled:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Job already finished")
+    jobs.job_runner.request_cancel(job_id)
+    return jobs.to_out(_get_job(db, job_id))
+
+
+@router.post("/{job_id}/retry", response_model=JobOut, status_code=status.HTTP_202_ACCEPTED)
+def retry_job(job_id: int, db: Session = Depends(get_db)):
+    _get_job(db, job_id)
+    requeued = db.execute(
+        update(Job).where(Job.id == job_id, Job.status.in_((jobs.FAILED, jobs.CANCELLED)))
+        .values(
+            status=jobs.QUEUED, attempts=0, cancel_requested=False, error=None, result=None,
+            progress=0, total=None, message=None, run_after=None, started_at=None, finished_at=None,
+        )
+    ).rowcount
+    db.commit()
+    if not requeued:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Only failed or cancelled jobs can be retried")
+    jobs.job_runner.notify()
+    return jobs.to_out(_get_job(db, job_id))
+
+
+@router.get("/{job_id}/download")
+def download_job_output(job_id: int, db: Session = Depends(get_db)):
+    job = _get_job(db, job_id)
+    result = job.result if isinstance(job.result, dict) else {}
+    path = Path(settings.JOBS_OUTPUT_DIR) / result["file"] if result.get("file") else None
+    if job.status != jobs.SUCCEEDED or path is None or not path.is_file():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job output not found")
+    return FileResponse(path, media_type=result.get("media_type"), filename=result.get("filename", path.name))
@@ -1,50 +1,66 @@
 from typing import Optional
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 from db.database import get_db
-from models.match import Match
-from models.user_match import UserMatch
-from models.user import User
-from core.dependencies import get_current_user, admin_required
+from db.loading import MATCH_CARD
+from crud import fixtures, standings
+from crud import stats as stats_crud
+from crud import match as match_crud
+from crud import game_batch
+from crud.championship import bump_version
+from crud.pagination import next_cursor
+from models.championship import Championship
+from models.match import Match, MatchStatus
+from core import http_cache
+from core.events import broker
+from core.dependencies import Principal, get_current_principal, admin_required
+from schemas.match import BulkResult, BulkScheduleIn, BulkScoreIn, GameOut, MyGamesResponse, ScoreGameOut
 
 router = APIRouter(tags=["games"])
 
-@router.get("/games/{game_id}", dependencies=[Depends(get_current_user)])
-def get_game(game_id: int, db: Session = Depends(get_db)):
-    m = db.query(Match).filter(Match.id == game_id).first()
+def _publish_game(event_type: str, game: GameOut, **extra) -> None:
+    # Push para quem segue o campeonato ou o jogo (routers/events.py), depois do commit
+    broker.publish(
+        event_type,
+        {"game": game, **extra},
+        (f"championship:{game.championship_id}", f"game:{game.id}"),
+    )
+
+@router.get("/games/{game_id}", response_model=GameOut, dependencies=[Depends(get_current_principal)])
+def get_game(game_id: int, request: Request, db: Session = Depends(get_db)):
+    version = db.execute(match_crud.game_version_query(game_id)).scalar_one_or_none()
+    if version is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Game not found")
+    etag = http_cache.make_etag(request, version)
+    cached = http_cache.cached_response(request, etag, http_cache.REVALIDATE)
+    if cached is not None:
+        return cached
+
+    m = db.execute(match_crud.game_query(game_id)).one_or_none()
     if not m:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Game not found")
-    return {
-        "id": m.id,
-        "championship_id": m.championship_id,
-        "round": 1,
-        "home_team_name": None,
-        "away_team_name": None,
-        "date": getattr(m, "scheduled_at", None),
-        "location": getattr(m, "location", None),
-        "home_score": None,
-        "away_score": None,
-        "status": getattr(m, "status", None),
-    }
-
-@router.patch("/games/{game_id}/schedule", dependencies=[Depends(admin_required)])
+    return http_cache.json_response(etag, http_cache.REVALIDATE, match_crud.to_game_out(m))
+
+@router.patch("/games/{game_id}/schedule", response_model=GameOut, dependencies=[Depends(admin_required)])
 def schedule_game(
     game_id: int,
     payload: dict,
     db: Session = Depends(get_db),
 ):
-    m = db.query(Match).filter(Match.id == game_id).first()
+    m = db.query(Match).options(*MATCH_CARD).filter(Match.id == game_id).first()
     if not m:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Game not found")
 
+    before = stats_crud.match_state(m)
     date = payload.get("date")
     location = payload.get("location")
 
     if date:
         try:
-            parsed = datetime.fromisoformat(str(date).replace("Z", "+00:00"))
+            parsed = match_crud.utc_naive(datetime.fromisoformat(str(date).replace("Z", "+00:00")))
             if hasattr(m, "scheduled_at"):
                 m.scheduled_at = parsed
         except Exception:
@@ -52,103 +68,164 @@ def schedule_game(
     if location and hasattr(m, "location"):
         m.location = location
 
-    if hasattr(m, "status"):
-        m.status = "scheduled"
+    # Jogo encerrado mantém o status (e o placar contabilizado na classificação)
+    if m.status != MatchStatus.finished:
+        m.status = MatchStatus.scheduled
 
+    stats_crud.apply_match_change(db, m.id, before, stats_crud.match_state(m))
+    bump_version(db, m.championship_id)
     db.commit()
     db.refresh(m)
-    return {
-        "id": m.id,
-        "championship_id": m.championship_id,
-        "round": 1,
-        "home_team_name": None,
-        "away_team_name": None,
-        "date": getattr(m, "scheduled_at", None),
-        "location": getattr(m, "location", None),
-        "home_score": None,
-        "away_score": None,
-        "status": getattr(m, "status", None),
-    }
-
-@router.patch("/games/{game_id}/score", dependencies=[Depends(admin_required)])
+    game = match_crud.to_game_out(m)
+    _publish_game("game.schedule", game)
+    return game
+
+@router.patch("/games/{game_id}/score", response_model=ScoreGameOut, dependencies=[Depends(admin_required)])
 def set_score(
     game_id: int,
     payload: dict,
     db: Session = Depends(get_db),
 ):
 
-    m = db.query(Match).filter(Match.id == game_id).first()
-    if not m:
+    row = db.execute(
+        select(Match, Championship.format)
+        .options(*MATCH_CARD)
+        .join(Championship, Championship.id == Match.championship_id)
+        .where(Match.id == game_id)
+    ).first()
+    if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Game not found")
+    m, championship_format = row
+
+    home_score = payload.get("home_score")
+    away_score = payload.get("away_score")
+    for value in (home_score, away_score):
+        if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid score values")
+
+    error = match_crud.score_error(m, championship_format, home_score, away_score)
+    if error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    knockout = championship_format == fixtures.KNOCKOUT
+
+    before = stats_crud.match_state(m)
+
+    # Placar já contabilizado na classificação: numa correção ele é descontado
+    previous = None
+    if m.status == MatchStatus.finished and m.score_home is not None and m.score_away is not None:
+        previous = (m.score_home, m.score_away)
+
+    # UPDATE condicional ao placar lido: duas correções simultâneas não podem aplicar a
+    # mesma contribuição antiga duas vezes na classificação
+    updated = db.execute(
+        update(Match)
+        .where(
+            Match.id == game_id,
+            Match.status == m.status,
+            Match.score_home.is_not_distinct_from(m.score_home),
+            Match.score_away.is_not_distinct_from(m.score_away),
+        )
+        .values(score_home=home_score, score_away=away_score, status=MatchStatus.finished)
+        .execution_options(synchronize_session="fetch")
+    ).rowcount
+    if not updated:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Game was updated concurrently, try again")
+
+    stats_crud.apply_match_change(db, m.id, before, stats_crud.match_state(m))
+    bump_version(db, m.championship_id)
+    if m.home_team is not None and m.away_team is not None:
+        standings.apply_score(db, m.championship_id, m.home_team, m.away_team, (home_score, away_score), previous)
+
+    advanced = False
+    if knockout:
+        winner = m.home_team if home_score > away_score else m.away_team
+        try:
+            advanced = fixtures.advance_winner(db, m, winner)
+        except fixtures.FixtureConflict as e:
+            db.rollback()
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
-    if getattr(m, "status", None) == "finished":
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Game already completed")
-
-    # TODO Criar colunas de pontuação
-
-    _home_score = payload.get("home_score")
-    _away_score = payload.get("away_score")
-    if not isinstance(_home_score, (int, float)) or not isinstance(_away_score, (int, float)):
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid score values")
-
-    if hasattr(m, "status"):
-        m.status = "finished"
+    pending = db.execute(
+        select(Match.id)
+        .where(Match.championship_id == m.championship_id, Match.status != MatchStatus.finished)
+        .limit(1)
+    ).first()
 
     db.commit()
-    db.refresh(m)
-    return {
-        "game": {
-            "id": m.id,
-            "championship_id": m.championship_id,
-            "round": 1,
-            "home_team_name": None,
-            "away_team_name": None,
-            "date": getattr(m, "scheduled_at", None),
-            "location": getattr(m, "location", None),
-            "home_score": _home_score,
-            "away_score": _away_score,
-            "status": getattr(m, "status", None),
-        },
-        "advanced": False,
-        "championship_completed": False,
-    }
-
-@router.get("/me/games", dependencies=[Depends(get_current_user)])
+    standings.invalidate_standings(m.championship_id)
+    game = match_crud.to_game_out(m)
+    _publish_game("game.score", game, advanced=advanced, championship_completed=pending is None)
+    return ScoreGameOut(
+        game=game,
+        advanced=advanced,
+        championship_completed=pending is None,
+    )
+
+def _commit_bulk(db: Session, results: list[dict], atomic: bool) -> list[dict]:
+    # Lote atômico com erro: nada foi gravado e a resposta traz o resultado de cada item
+    applied = [r for r in results if r["ok"]]
+    if atomic and len(applied) < len(results):
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"message": "No game was updated", "results": results},
+        )
+    if applied:
+        db.commit()
+    return applied
+
+def _bulk_result(results: list[dict], applied: list[dict]) -> BulkResult:
+    return BulkResult(applied=len(applied), failed=len(results) - len(applied), results=results)
+
+@router.post("/games/bulk/score", response_model=BulkResult, dependencies=[Depends(admin_required)])
+def bulk_score(data: BulkScoreIn, db: Session = Depends(get_db)):
+    try:
+        results = game_batch.apply_scores(db, data.items, data.atomic)
+    except (game_batch.GameConflict, fixtures.FixtureConflict) as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    applied = _commit_bulk(db, results, data.atomic)
+
+    for championship_id in {r["game"].championship_id for r in applied}:
+        standings.invalidate_standings(championship_id)
+    for r in applied:
+        _publish_game("game.score", r["game"], advanced=r["advanced"], championship_completed=r["championship_completed"])
+    return _bulk_result(results, applied)
+
+@router.post("/games/bulk/schedule", response_model=BulkResult, dependencies=[Depends(admin_required)])
+def bulk_schedule(data: BulkScheduleIn, db: Session = Depends(get_db)):
+    results = game_batch.apply_schedules(db, data.items, data.atomic)
+    applied = _commit_bulk(db, results, data.atomic)
+    for r in applied:
+        _publish_game("game.schedule", r["game"])
+    return _bulk_result(results, applied)
+
+@router.get("/me/games", response_model=MyGamesResponse)
 def my_games(
     status: str = Query(..., pattern="^(upcoming|completed)$"),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    after: Optional[str] = Query(None, description="Cursor (next_cursor da página anterior); ativa a paginação por cursor"),
+    include_total: bool = Query(True),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     statuses = ["scheduled"] if status == "upcoming" else ["finished"]
 
-    base = (
-        db.query(Match)
-        .join(UserMatch, UserMatch.match_id == Match.id)
-        .filter(UserMatch.user_id == current_user.id)
-        .filter(Match.status.in_(statuses))
+    base = match_crud.user_games_query(current_user.id, statuses)
+    items, total = match_crud.list_games(
+        db, base, ("user_games", current_user.id, status),
+        page=page, page_size=page_size, after=after, include_total=include_total,
+    )
+    # Devolve a conexão antes de retornar: o response_model é validado numa thread do
+    # threadpool e, com todas ocupadas esperando o pool do banco, a sessão a seguraria
+    db.rollback()
+
+    return MyGamesResponse(
+        items=[match_crud.to_me_game(m) for m in items],
+        page=page,
+        page_size=page_size,
+        total=total,
+        next_cursor=next_cursor(items, page_size, match_crud.game_cursor_key),
     )
-
-    total = base.count()
-    items = base.order_by(Match.scheduled_at.asc()).offset((page - 1) * page_size).limit(page_size).all()
-
-    def to_me_game(m: Match) -> dict:
-        return {
-            "id": m.id,
-            "championship_id": m.championship_id,
-            "date": getattr(m, "scheduled_at", None),
-            "location": getattr(m, "location", None),
-            "home_team_name": None,
-            "away_team_name": None,
-            "home_score": None,
-            "away_score": None,
-            "status": getattr(m, "status", None),
-        }
-
-    return {
-        "items": [to_me_game(m) for m in items],
-        "page": page,
-        "page_size": page_size,
-        "total": total,
-    }
\ No newline at end of file
@@ -0,0 +1,133 @@
+# GET /metrics: métricas do processo no formato de texto do Prometheus (core/metrics.py),
+# mais os contadores já mantidos pelos caches, pelo pool de conexões, pelo broker de eventos
+# e pela fila de ingestão.
+# Com METRICS_TOKEN a rota fica fora do JWT e exige "Authorization: Bearer <METRICS_TOKEN>"
+# (para o scraper); sem ele, exige um admin.
+import secrets
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import PlainTextResponse
+
+from core import metrics
+from core.config import settings
+from core.dependencies import admin_required, principal_cache
+from core.events import broker
+from core.http_cache import body_cache
+from core.ingest import ingest_queue, ingest_worker
+from core.jobs import job_runner
+from core.security import verified_token_cache
+from crud.pagination import total_cache
+from crud.standings import standings_cache
+from db.database import async_engine, engine, pool_metrics
+
+router = APIRouter(tags=["metrics"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+CACHES = {
+    "principal": principal_cache,
+    "totals": total_cache,
+    "http": body_cache,
+    "standings": standings_cache,
+    "token": verified_token_cache,
+}
+
+# Chaves de stats() que só crescem; as demais são expostas como gauge
+COUNTER_KEYS = {"hits", "misses", "evictions", "expirations", "errors", "published", "dropped"}
+
+
+def _flatten(stats: dict, prefix: str = "") -> dict:
+    # {"local": {"hits": 1}} -> {"local_hits": 1}; ignora valores não numéricos ("backend")
+    out = {}
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            out.update(_flatten(value, f"{prefix}{key}_"))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            out[prefix + key] = value
+    return out
+
+
+def _stats_lines(name: str, label: str, sources: dict, help: str) -> list[str]:
+    by_key: dict[str, list] = {}
+    for source, stats in sources.items():
+        for key, value in _flatten(stats).items():
+            by_key.setdefault(key, []).append(({label: source}, value))
+    lines = []
+    for key, values in sorted(by_key.items()):
+        counter = key.rsplit("_", 1)[-1] in COUNTER_KEYS
+        lines.extend(metrics.samples(
+            f"{name}_{key}_total" if counter else f"{name}_{key}", "counter" if counter else "gauge", f"{help} ({key})", values,
+        ))
+    return lines
+
+
+def _cache_lines() -> list[str]:
+    stats = {name: cache.stats() for name, cache in CACHES.items() if cache is not None}
+    return _stats_lines("cache", "cache", stats, "Caches do processo")
+
+
+def _flat_lines(name: str, stats: dict, counters: set, help: str) -> list[str]:
+    lines = []
+    for key, value in stats.items():
+        counter = key in counters
+        lines.extend(metrics.samples(
+            f"{name}_{key.removesuffix('_total')}_total" if counter else f"{name}_{key}",
+            "counter" if counter else "gauge",
+            f"{help} ({key})",
+            [({}, value)],
+        ))
+    return lines
+
+
+def _pool_lines() -> list[str]:
+    stats = pool_metrics.snapshot()
+    engines = {"sync": engine}
+    if async_engine is not None:
+        engines["async"] = async_engine.sync_engine
+    for name, eng in engines.items():
+        pool = eng.pool
+        # QueuePool expõe o estado atual; os outros pools (SQLite em memória) não
+        if hasattr(pool, "checkedout"):
+            stats[f"{name}_size"] = pool.size()
+            stats[f"{name}_checked_out_now"] = pool.checkedout()
+            stats[f"{name}_overflow"] = pool.overflow()
+    counters = {"connects", "checkouts", "checkins", "invalidations", "timeouts", "wait_seconds_total"}
+    return _flat_lines("db_pool", stats, counters, "Pool de conexões")
+
+
+def _broker_lines() -> list[str]:
+    return _flat_lines("events", broker.stats(), COUNTER_KEYS, "Broker de eventos")
+
+
+def _ingest_lines() -> list[str]:
+    if not settings.INGEST_ENABLED:
+        return []
+    stats = {**ingest_worker.stats(), **ingest_queue.stats()}
+    return _flat_lines("ingest", stats, {"batches", "processed", "errors"}, "Fila de ingestão")
+
+
+def _jobs_lines() -> list[str]:
+    return _flat_lines("jobs", job_runner.stats(), {"started", "succeeded", "failed", "cancelled", "retried"}, "Jobs em segundo plano")
+
+
+metrics.register_collector(_cache_lines)
+metrics.register_collector(_pool_lines)
+metrics.register_collector(_broker_lines)
+metrics.register_collector(_ingest_lines)
+metrics.register_collector(_jobs_lines)
+
+
+def _check_metrics_token(request: Request) -> None:
+    auth = request.headers.get("authorization", "")
+    token = auth.split(" ", 1)[1].strip() if auth.lower().startswith("bearer ") else ""
+    if not secrets.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token de métricas inválido")
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    dependencies=[Depends(_check_metrics_token if settings.METRICS_TOKEN else admin_required)],
+)
+def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
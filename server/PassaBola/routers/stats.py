@@ -0,0 +1,30 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from core.dependencies import Principal, get_current_principal
+from crud import stats as stats_crud
+from db.database import get_db
+from schemas.stats import DailyStatsOut, MyStatsResponse
+
+router = APIRouter(tags=["stats"])
+
+# Leituras dos agregados mantidos por crud/stats.py: no máximo `days` linhas por consulta
+
+@router.get("/stats/recent", response_model=List[DailyStatsOut], dependencies=[Depends(get_current_principal)])
+def recent_stats(
+    db: Session = Depends(get_db),
+    period: str = Query("day", pattern="^(day|week)$"),
+    days: int = Query(14, ge=1, le=366, description="Quantidade de dias (ou semanas, com period=week)"),
+):
+    return stats_crud.recent_stats(db, days, period)
+
+@router.get("/me/stats", response_model=MyStatsResponse)
+def my_stats(
+    db: Session = Depends(get_db),
+    period: str = Query("day", pattern="^(day|week)$"),
+    days: int = Query(14, ge=1, le=366, description="Quantidade de dias (ou semanas, com period=week)"),
+    current_user: Principal = Depends(get_current_principal),
+):
+    return stats_crud.user_stats(db, current_user.id, days, period)
@@ -1,10 +1,12 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Literal, Optional
+
 
 class createChampionship(BaseModel):
     name: str
     number_players: int
+    max_participants: Optional[int] = Field(default=None, ge=1, description="Limite de inscritas; sem limite se nulo")
 
 class ChampionshipOut(BaseModel):
     id: int
@@ -21,6 +23,7 @@ class ChampionshipWithCount(BaseModel):
     number_players: int
     is_closed: bool
     participants_count: int
+    max_participants: Optional[int] = None
 
     class Config:
         from_attributes = True
@@ -29,4 +32,48 @@ class ChampionshipListResponse(BaseModel):
     items: list[ChampionshipWithCount]
     page: int
     page_size: int
-    total: int
\ No newline at end of file
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+class JoinOut(BaseModel):
+    championship_id: int
+    joined: bool
+    participants_count: Optional[int] = None
+    # Posição na fila de espera (1 = próxima), quando o campeonato está lotado
+    waitlist_position: Optional[int] = None
+
+class LeaveOut(BaseModel):
+    championship_id: int
+    participants_count: int
+    # Quem saiu da fila de espera e assumiu a vaga
+    promoted_user_id: Optional[int] = None
+
+class CloseSignupsIn(BaseModel):
+    format: Literal["round_robin", "knockout"] = "round_robin"
+    start_date: Optional[datetime] = Field(default=None, description="Primeiro horário de jogo; padrão: daqui a 3 dias")
+    venues: List[str] = Field(default_factory=lambda: [f"Stadium {c}" for c in "ABCDE"], min_length=1)
+    matches_per_day: int = Field(default=1, ge=1, description="Horários por local e dia")
+    match_interval_minutes: int = Field(default=120, ge=1)
+
+class CloseSignupsOut(BaseModel):
+    # Só o resumo: a tabela (milhares de jogos num pontos corridos) fica em games_url
+    championship: ChampionshipOut
+    created_games: int
+    games_url: str
+
+class StandingOut(BaseModel):
+    position: int
+    team: int
+    team_name: str
+    played: int
+    won: int
+    drawn: int
+    lost: int
+    goals_for: int
+    goals_against: int
+    goal_difference: int
+    points: int
+
+class StandingsResponse(BaseModel):
+    championship_id: int
+    items: List[StandingOut]
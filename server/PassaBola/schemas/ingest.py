@@ -0,0 +1,16 @@
+from datetime import datetime
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+class IngestRequestOut(BaseModel):
+    id: str
+    kind: str
+    # pending | processing | done | failed
+    status: str
+    # Status que a rota síncrona teria respondido e o corpo (preenchidos ao concluir). No
+    # cadastro o corpo é só {"id": ...}: o status é público para quem tem o id do pedido
+    status_code: Optional[int] = None
+    result: Optional[Any] = None
+    created_at: datetime
+    updated_at: datetime
@@ -0,0 +1,30 @@
+from datetime import datetime
+from typing import Any, List, Optional
+
+from pydantic import BaseModel
+
+class JobOut(BaseModel):
+    id: int
+    kind: str
+    # queued | running | succeeded | failed | cancelled
+    status: str
+    params: dict
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    progress: int
+    total: Optional[int] = None
+    message: Optional[str] = None
+    attempts: int
+    max_attempts: int
+    cancel_requested: bool
+    created_by: Optional[int] = None
+    run_after: Optional[datetime] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class JobListResponse(BaseModel):
+    items: List[JobOut]
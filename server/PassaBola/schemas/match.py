@@ -2,6 +2,11 @@ from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 
+class CreateMatch(BaseModel):
+    championship_id: int
+    scheduled_at: Optional[datetime] = None
+    location: Optional[str] = None
+
 class GameOut(BaseModel):
     id: int
     championship_id: int
@@ -14,11 +19,17 @@ class GameOut(BaseModel):
     away_score: Optional[int] = None
     status: Optional[str] = None
 
+class ScoreGameOut(BaseModel):
+    game: GameOut
+    advanced: bool
+    championship_completed: bool
+
 class GameListResponse(BaseModel):
     items: List[GameOut]
     page: int
     page_size: int
-    total: int
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 class MeGame(BaseModel):
     id: int
@@ -35,7 +46,8 @@ class MyGamesResponse(BaseModel):
     items: List[MeGame]
     page: int
     page_size: int
-    total: int
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 class ScheduleGameIn(BaseModel):
     date: Optional[datetime] = Field(default=None, description="ISO 8601 datetime")
@@ -43,4 +55,33 @@ class ScheduleGameIn(BaseModel):
 
 class ScoreGameIn(BaseModel):
     home_score: int = Field(ge=0)
-    away_score: int = Field(ge=0)
\ No newline at end of file
+    away_score: int = Field(ge=0)
+
+BULK_MAX_ITEMS = 500
+
+class BulkScoreItem(ScoreGameIn):
+    game_id: int
+
+class BulkScheduleItem(ScheduleGameIn):
+    game_id: int
+
+class BulkScoreIn(BaseModel):
+    items: List[BulkScoreItem] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
+    atomic: bool = Field(default=True, description="true: um item inválido recusa o lote todo; false: aplica os itens válidos")
+
+class BulkScheduleIn(BaseModel):
+    items: List[BulkScheduleItem] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
+    atomic: bool = Field(default=True, description="true: um item inválido recusa o lote todo; false: aplica os itens válidos")
+
+class BulkItemResult(BaseModel):
+    game_id: int
+    ok: bool
+    error: Optional[str] = None
+    game: Optional[GameOut] = None
+    advanced: Optional[bool] = None
+    championship_completed: Optional[bool] = None
+
+class BulkResult(BaseModel):
+    applied: int
+    failed: int
+    results: List[BulkItemResult]
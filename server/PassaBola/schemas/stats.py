@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from datetime import date
+from typing import List
+
+class DailyStatsOut(BaseModel):
+    date: date
+    games_total: int
+    games_played: int
+    total_goals: int
+    participations: int
+
+class UserStatsTotals(BaseModel):
+    games_played: int
+    won: int
+    drawn: int
+    lost: int
+    goals_for: int
+    goals_against: int
+
+class UserDailyStatsOut(UserStatsTotals):
+    date: date
+
+class MyStatsResponse(BaseModel):
+    totals: UserStatsTotals
+    recent: List[UserDailyStatsOut]
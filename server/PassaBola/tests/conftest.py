@@ -0,0 +1,125 @@
+# Banco SQLite temporário, migrado uma vez por sessão. As variáveis precisam estar definidas
+# antes de importar a aplicação: core.config lê o ambiente na importação.
+# TEST_DATABASE_URL roda a mesma suíte em outro banco (ex.: PostgreSQL local). O esquema
+# public desse banco é apagado no início: use um banco só para os testes.
+import itertools
+import os
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix="passabola-tests-")
+os.environ["DATABASE_URL"] = os.environ.get("TEST_DATABASE_URL") or f"sqlite:///{_tmp}/test.db"
+os.environ["DB_AUTO_MIGRATE"] = "False"
+os.environ["JOBS_WORKERS"] = "0"
+os.environ["JOBS_OUTPUT_DIR"] = os.path.join(_tmp, "job_output")
+os.environ["INGEST_QUEUE_PATH"] = os.path.join(_tmp, "ingest_queue.db")
+os.environ["CACHE_URL"] = ""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, select, text
+from sqlalchemy.exc import OperationalError
+
+from core.security import create_access_token
+from db.database import SessionLocal, engine, run_migrations
+from models.user import User
+
+_emails = itertools.count(1)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def migrated():
+    if engine.dialect.name == "postgresql":
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("DROP SCHEMA public CASCADE"))
+                conn.execute(text("CREATE SCHEMA public"))
+        except OperationalError as e:
+            pytest.skip(f"PostgreSQL indisponível em TEST_DATABASE_URL: {e.orig}")
+    run_migrations()
+
+
+@pytest.fixture(scope="session")
+def client(migrated):
+    import main
+
+    with TestClient(main.app) as c:
+        yield c
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # Caches por processo (principal, tokens, totais, corpos HTTP, classificação)
+    from core.dependencies import principal_cache
+    from core.http_cache import body_cache
+    from core.security import verified_token_cache
+    from crud.pagination import total_cache
+    from crud.standings import standings_cache
+
+    for cache in (principal_cache, verified_token_cache, total_cache, body_cache, standings_cache):
+        if cache is not None:
+            cache.clear()
+
+
+@pytest.fixture
+def make_user():
+    # Cria uma usuária e devolve (usuária, headers com o token dela)
+    def make(admin: bool = False, **fields):
+        with SessionLocal() as db:
+            user = User(
+                name="Teste", email=f"user{next(_emails)}@teste.com", password_hash="x", admin=admin, **fields,
+            )
+            db.add(user)
+            db.commit()
+            db.refresh(user)
+            db.expunge(user)
+        return user, {"Authorization": f"Bearer {create_access_token(user.email)}"}
+
+    return make
+
+
+@pytest.fixture
+def closed_championship(client, make_user):
+    # Fecha um campeonato com n_teams times de uma jogadora no formato pedido; devolve
+    # (id, headers de admin, ids dos jogos por (rodada, slot))
+    from models.match import Match
+
+    def close(fmt: str, n_teams: int):
+        _, admin = make_user(admin=True)
+        response = client.post("/championships", json={"name": "Tabela", "number_players": 1}, headers=admin)
+        championship_id = response.json()["id"]
+        for _ in range(n_teams):
+            assert client.post(f"/championships/{championship_id}/join", headers=make_user()[1]).status_code == 200
+        response = client.post(f"/championships/{championship_id}/close_signups", json={"format": fmt}, headers=admin)
+        assert response.status_code == 200
+        with SessionLocal() as db:
+            games = {
+                (m.round, m.slot): m.id
+                for m in db.execute(select(Match).where(Match.championship_id == championship_id)).scalars()
+            }
+        return championship_id, admin, games
+
+    return close
+
+
+class StatementCounter:
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __call__(self, conn, cursor, statement, *args):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(engine, "after_cursor_execute", self)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(engine, "after_cursor_execute", self)
+
+
+@pytest.fixture
+def count_statements():
+    return StatementCounter
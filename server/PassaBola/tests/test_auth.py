@@ -0,0 +1,50 @@
+from core.security import password_hasher
+from db.database import SessionLocal, engine
+from models.user import User
+
+
+def _record_pool(monkeypatch, verify_result=(True, None)):
+    # Substitui o hash por funções que anotam as conexões em uso enquanto o hash "roda"
+    checked_out = []
+
+    async def fake_hash(password):
+        checked_out.append(engine.pool.checkedout())
+        return "hash-de-teste"
+
+    async def fake_verify(password, password_hash):
+        checked_out.append(engine.pool.checkedout())
+        return verify_result
+
+    monkeypatch.setattr(password_hasher, "hash", fake_hash)
+    monkeypatch.setattr(password_hasher, "verify_and_update", fake_verify)
+    return checked_out
+
+
+def test_signup_releases_connection_during_hash(client, monkeypatch):
+    checked_out = _record_pool(monkeypatch)
+
+    response = client.post("/auth/signup", json={"name": "Nova", "email": "signup-pool@teste.com", "password": "senha123"})
+
+    assert response.status_code == 201
+    assert checked_out == [0]
+
+
+def test_login_releases_connection_during_hash(client, make_user, monkeypatch):
+    user, _ = make_user()
+    checked_out = _record_pool(monkeypatch)
+
+    response = client.post("/auth/login", json={"email": user.email, "password": "senha123"})
+
+    assert response.status_code == 200
+    assert response.json()["role"] == "user"
+    assert checked_out == [0]
+
+
+def test_login_rehash_is_written_after_hash(client, make_user, monkeypatch):
+    user, _ = make_user()
+    _record_pool(monkeypatch, verify_result=(True, "hash-atualizado"))
+
+    assert client.post("/auth/login", json={"email": user.email, "password": "senha123"}).status_code == 200
+
+    with SessionLocal() as db:
+        assert db.get(User, user.id).password_hash == "hash-atualizado"
@@ -0,0 +1,216 @@
+import asyncio
+import threading
+import time
+
+import fakeredis
+import pytest
+
+from core import cache_backend
+from core.cache_backend import MemoryCache, RedisCache
+
+
+@pytest.fixture
+def server(monkeypatch):
+    # Um "Redis" por teste; o assinante de invalidações é refeito para esse servidor
+    monkeypatch.setattr(cache_backend, "_listener_pid", None)
+    monkeypatch.setattr(cache_backend, "_local_caches", {})
+    return fakeredis.FakeServer()
+
+
+def _redis(server, namespace: str = "teste", local: bool = True) -> RedisCache:
+    return RedisCache(
+        fakeredis.FakeRedis(server=server), namespace, ttl=60,
+        local=MemoryCache(100, 60) if local else None, lock_timeout=2,
+    )
+
+
+@pytest.fixture(params=["memory", "redis"])
+def cache(request, server):
+    if request.param == "memory":
+        return MemoryCache(100, 60)
+    return _redis(server)
+
+
+def test_get_set_delete(cache):
+    assert cache.get("a") is None
+    assert cache.get("a", "padrão") == "padrão"
+
+    cache.set("a", {"x": 1})
+    assert cache.get("a") == {"x": 1}
+
+    cache.delete("a")
+    assert cache.get("a") is None
+
+
+def test_invalidate_tags_drops_only_tagged_keys(cache):
+    cache.set("u1", 1, tags=["user:1", "users"])
+    cache.set("u2", 2, tags=["user:2", "users"])
+    cache.set("solta", 3)
+
+    cache.invalidate_tags("user:1")
+    assert (cache.get("u1"), cache.get("u2"), cache.get("solta")) == (None, 2, 3)
+
+    cache.invalidate_tags("users")
+    assert (cache.get("u2"), cache.get("solta")) == (None, 3)
+
+
+def test_clear(cache):
+    cache.set("a", 1, tags=["t"])
+    cache.clear()
+    assert cache.get("a") is None
+
+
+def test_get_or_set_coalesces_threads(cache):
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.1)
+        return 42
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_set("k", loader))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == [42] * 8
+    assert len(calls) == 1
+
+
+def test_get_or_set_does_not_store_none(cache):
+    assert cache.get_or_set("vazio", lambda: None) is None
+    assert cache.get_or_set("vazio", lambda: 7) == 7
+
+
+def test_get_or_set_callable_tags(cache):
+    cache.get_or_set("u", lambda: {"id": 5}, tags=lambda v: [f"user:{v['id']}"])
+    cache.invalidate_tags("user:5")
+    assert cache.get("u") is None
+
+
+def test_get_or_set_async_coalesces_tasks(cache):
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 9
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_set_async("k", loader, tags=["t"]) for _ in range(10)))
+
+    assert asyncio.run(run()) == [9] * 10
+    assert len(calls) == 1
+    cache.invalidate_tags("t")
+    assert cache.get("k") is None
+
+
+def test_async_totals_coalesce_misses():
+    from crud.pagination import cached_total_async
+
+    calls = []
+
+    async def count():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 120
+
+    async def run():
+        return await asyncio.gather(*(cached_total_async(("championships", None, "x"), count) for _ in range(10)))
+
+    assert asyncio.run(run()) == [120] * 10
+    assert len(calls) == 1
+
+
+def test_redis_values_are_shared_between_workers(server):
+    # Dois workers = duas instâncias com clientes próprios sobre o mesmo servidor
+    first, second = _redis(server, local=False), _redis(server, local=False)
+    first.set("a", [1, 2], tags=["t"])
+    assert second.get("a") == [1, 2]
+
+    second.invalidate_tags("t")
+    assert first.get("a") is None
+
+
+def test_redis_publishes_invalidation_to_local_copies(server):
+    cache = _redis(server)
+    other_worker = _redis(server, namespace="teste", local=False)
+    cache.set("a", 1, tags=["t"])
+    cache.set("b", 2)
+    assert cache.local.get("a") == 1
+
+    other_worker.invalidate_tags("t")
+    other_worker.delete("b")
+
+    deadline = time.monotonic() + 3
+    while (cache.local.get("a") is not None or cache.local.get("b") is not None) and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert cache.local.get("a") is None
+    assert cache.local.get("b") is None
+
+
+def test_redis_single_flight_across_workers(server):
+    workers = [_redis(server, local=False) for _ in range(4)]
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.2)
+        return "valor"
+
+    results = []
+    threads = [threading.Thread(target=lambda w=w: results.append(w.get_or_set("k", loader))) for w in workers]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == ["valor"] * 4
+    assert len(calls) == 1
+    assert not fakeredis.FakeRedis(server=server).exists("passabola:teste:lock:k")
+
+
+def test_redis_async_single_flight_across_workers(server):
+    workers = [_redis(server, local=False) for _ in range(4)]
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        return 3
+
+    async def run():
+        return await asyncio.gather(*(w.get_or_set_async("k", loader) for w in workers))
+
+    assert asyncio.run(run()) == [3] * 4
+    assert len(calls) == 1
+
+
+def test_redis_errors_degrade_to_misses(server):
+    cache = _redis(server)
+    cache.set("a", 1)
+    server.connected = False
+
+    # A cópia local continua valendo; o resto vira falta, sem exceção
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get_or_set("c", lambda: 5) == 5
+    assert asyncio.run(cache.get_or_set_async("d", _async_value(6))) == 6
+    cache.set("e", 1)
+    cache.delete("a")
+    cache.invalidate_tags("t")
+    assert cache.stats()["errors"] >= 1
+
+    # Passado retry_after, o Redis volta a ser usado
+    server.connected = True
+    cache._retry_at = 0
+    cache.set("f", 2)
+    assert _redis(server, local=False).get("f") == 2
+
+
+def _async_value(value):
+    async def loader():
+        return value
+    return loader
@@ -0,0 +1,100 @@
+import asyncio
+import itertools
+
+import pytest
+from sqlalchemy import func, insert, select
+
+from bench.cases import _join_race
+from core.security import create_access_token
+from db.database import SessionLocal, utcnow
+from models.championship import Championship
+from models.championship_waitlist import ChampionshipWaitlist
+from models.user import User
+from models.user_championship import UserChampionship
+
+CAPACITY = 100
+JOINS = 1000
+
+_batches = itertools.count(1)
+
+
+def _race_setup(joins: int, capacity: int) -> tuple[int, list[str]]:
+    # Campeonato aberto com capacity vagas e joins usuárias novas (inseridas de uma vez)
+    batch = next(_batches)
+    with SessionLocal() as db:
+        emails = db.execute(
+            insert(User).returning(User.email),
+            [
+                {"name": "Corrida", "email": f"race{batch}-{n}@teste.com", "password_hash": "x",
+                 "phone_number": f"118{batch:02d}{n:06d}", "document": f"race-{batch}-{n}"}
+                for n in range(joins)
+            ],
+        ).scalars().all()
+        championship_id = db.execute(
+            insert(Championship).values(
+                name="Corrida", number_players=1, is_closed=False, max_participants=capacity, updated_at=utcnow(),
+            ).returning(Championship.id)
+        ).scalar_one()
+        db.commit()
+    return championship_id, [create_access_token(email) for email in emails]
+
+
+def _stored(championship_id: int) -> tuple[int, int, int]:
+    with SessionLocal() as db:
+        count = db.execute(
+            select(Championship.participants_count).where(Championship.id == championship_id)
+        ).scalar_one()
+        links = db.execute(
+            select(func.count()).select_from(UserChampionship).where(UserChampionship.championship_id == championship_id)
+        ).scalar_one()
+        waiting = db.execute(
+            select(func.count()).select_from(ChampionshipWaitlist).where(ChampionshipWaitlist.championship_id == championship_id)
+        ).scalar_one()
+    return count, links, waiting
+
+
+@pytest.mark.parametrize("waitlist", [False, True], ids=["full", "waitlist"])
+def test_parallel_joins_fill_exactly_the_capacity(client, waitlist):
+    import main
+
+    championship_id, tokens = _race_setup(JOINS, CAPACITY)
+
+    statuses = asyncio.run(_join_race(main.app, championship_id, tokens, waitlist))
+
+    assert [s for s in statuses if s >= 500] == []
+    assert statuses.count(200) == CAPACITY
+    if waitlist:
+        assert statuses.count(202) == JOINS - CAPACITY
+        assert _stored(championship_id) == (CAPACITY, CAPACITY, JOINS - CAPACITY)
+    else:
+        assert statuses.count(409) == JOINS - CAPACITY
+        assert _stored(championship_id) == (CAPACITY, CAPACITY, 0)
+
+
+def test_leave_promotes_the_first_waitlisted(client):
+    import main
+
+    championship_id, tokens = _race_setup(40, 10)
+    asyncio.run(_join_race(main.app, championship_id, tokens, waitlist=True))
+
+    with SessionLocal() as db:
+        first = db.execute(
+            select(ChampionshipWaitlist.user_id)
+            .where(ChampionshipWaitlist.championship_id == championship_id)
+            .order_by(ChampionshipWaitlist.created_at, ChampionshipWaitlist.user_id)
+            .limit(1)
+        ).scalar_one()
+        member = db.execute(
+            select(User.email).join(UserChampionship, UserChampionship.user_id == User.id)
+            .where(UserChampionship.championship_id == championship_id)
+            .limit(1)
+        ).scalar_one()
+
+    response = client.delete(
+        f"/championships/{championship_id}/join", headers={"Authorization": f"Bearer {create_access_token(member)}"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["promoted_user_id"] == first
+    assert response.json()["participants_count"] == 10
+    assert _stored(championship_id) == (10, 10, 29)
@@ -0,0 +1,58 @@
+from sqlalchemy import insert
+
+from db.database import SessionLocal, utcnow
+from models.championship import Championship
+from models.user_championship import UserChampionship
+
+
+def _seed_championships(users: list, prefix: str, n: int = 30) -> None:
+    # Nomes com prefixo próprio: a listagem filtra por q e não vê campeonatos de outros testes
+    with SessionLocal() as db:
+        for i in range(n):
+            championship = Championship(
+                name=f"{prefix} {i}", number_players=5, is_closed=False, participants_count=len(users),
+            )
+            db.add(championship)
+            db.flush()
+            db.execute(insert(UserChampionship), [
+                {"user_id": user.id, "championship_id": championship.id, "updated_at": utcnow()} for user in users
+            ])
+        db.commit()
+
+
+def test_listing_statements_do_not_grow_with_page_size(client, make_user, count_statements):
+    # A contagem de inscritas vem na mesma consulta da página: sem N+1
+    players = [make_user()[0] for _ in range(3)]
+    _, headers = make_user()
+    _seed_championships(players, "Listagem N+1")
+    # Aquece o principal e o token em cache
+    assert client.get("/championships", params={"page_size": 1, "q": "Listagem N+1"}, headers=headers).status_code == 200
+
+    counts = {}
+    for page_size in (5, 30):
+        with count_statements() as statements:
+            response = client.get("/championships", params={"page_size": page_size, "q": "Listagem N+1"}, headers=headers)
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == page_size
+        assert all(item["participants_count"] == 3 for item in response.json()["items"])
+        counts[page_size] = statements.count
+    assert counts[5] == counts[30], counts
+
+
+def test_cursor_listing_statements_do_not_grow_with_page_size(client, make_user, count_statements):
+    players = [make_user()[0] for _ in range(2)]
+    _, headers = make_user()
+    _seed_championships(players, "Listagem cursor", n=31)
+    first = client.get("/championships", params={"page_size": 1, "after": "", "q": "Listagem cursor"}, headers=headers)
+    assert first.status_code == 200
+
+    counts = {}
+    for page_size in (5, 30):
+        with count_statements() as statements:
+            response = client.get(
+                "/championships", params={"page_size": page_size, "after": first.json()["next_cursor"], "q": "Listagem cursor"}, headers=headers,
+            )
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == page_size
+        counts[page_size] = statements.count
+    assert counts[5] == counts[30], counts
@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+from core.events import broker
+
+
+def _wait_subscribers(expected: int, timeout: float = 2.0) -> int:
+    deadline = time.monotonic() + timeout
+    while broker.subscribers != expected and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return broker.subscribers
+
+
+def _championship(client, make_user) -> int:
+    _, admin = make_user(admin=True)
+    response = client.post("/championships", json={"name": "Eventos", "number_players": 1}, headers=admin)
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def test_websocket_delivers_events_and_ignores_client_messages(client, make_user):
+    championship_id = _championship(client, make_user)
+    _, headers = make_user()
+    before = broker.subscribers
+
+    with client.websocket_connect(f"/events/ws?championship_id={championship_id}", headers=headers) as ws:
+        ws.send_text("mensagens do cliente são ignoradas")
+        assert _wait_subscribers(before + 1) == before + 1
+        broker.publish("game.score", {"championship_id": championship_id}, [f"championship:{championship_id}"])
+        message = ws.receive_json()
+
+    assert message["type"] == "game.score"
+    assert message["data"] == {"championship_id": championship_id}
+
+
+async def _connect_and_disconnect(app, path: str, query: str, token: str) -> list:
+    # Cliente ASGI mínimo: o TestClient cancela o handler ao sair, o que esconderia a
+    # desconexão. Aqui o handler precisa terminar sozinho depois do websocket.disconnect.
+    incoming: asyncio.Queue = asyncio.Queue()
+    sent = []
+    scope = {
+        "type": "websocket",
+        "asgi": {"version": "3.0"},
+        "scheme": "ws",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+        "subprotocols": [],
+        "state": {},
+    }
+
+    async def send(message):
+        sent.append(message)
+        if message["type"] == "websocket.accept":
+            await incoming.put({"type": "websocket.receive", "text": "oi"})
+            await incoming.put({"type": "websocket.disconnect", "code": 1000})
+
+    await incoming.put({"type": "websocket.connect"})
+    await asyncio.wait_for(app(scope, incoming.get, send), timeout=2)
+    return sent
+
+
+def test_websocket_disconnect_ends_handler_before_heartbeat(client, make_user):
+    import main
+    from core.security import create_access_token
+
+    championship_id = _championship(client, make_user)
+    user, _ = make_user()
+    before = broker.subscribers
+
+    # Sem a leitura em paralelo, o handler só perceberia a desconexão no próximo heartbeat
+    # (EVENTS_HEARTBEAT_SECONDS) e o wait_for estouraria
+    sent = asyncio.run(_connect_and_disconnect(
+        main.app, "/events/ws", f"championship_id={championship_id}", create_access_token(user.email),
+    ))
+
+    assert sent[0]["type"] == "websocket.accept"
+    assert broker.subscribers == before
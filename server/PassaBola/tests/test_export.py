@@ -0,0 +1,122 @@
+import itertools
+import json
+import tracemalloc
+
+from sqlalchemy import insert
+
+from core.config import settings
+from db.database import SessionLocal
+from models.championship import Championship
+from models.match import Match
+from models.user import User
+from models.user_match import UserMatch
+from routers import export
+
+_numbers = itertools.count(1)
+
+
+def _match_with_players(players: int) -> int:
+    with SessionLocal() as db:
+        championship = Championship(name="Export", number_players=1, is_closed=True, participants_count=0)
+        db.add(championship)
+        db.flush()
+        match = Match(championship_id=championship.id, round=1, slot=0, home_team=1, away_team=2)
+        db.add(match)
+        db.flush()
+        user_ids = db.execute(
+            insert(User).returning(User.id),
+            [
+                {"name": f"Jogadora {n}", "email": f"export{n}@teste.com", "password_hash": "x",
+                 "phone_number": f"119{n:08d}", "document": f"doc-{n}"}
+                for n in itertools.islice(_numbers, players)
+            ],
+        ).scalars().all()
+        db.execute(insert(UserMatch), [
+            {"user_id": user_id, "match_id": match.id, "team_side": "home"} for user_id in user_ids
+        ])
+        db.commit()
+        return match.id
+
+
+def test_match_players_csv_requires_admin(client, make_user):
+    match_id = _match_with_players(2)
+    _, headers = make_user()
+    _, admin_headers = make_user(admin=True)
+
+    assert client.get(f"/export/match/{match_id}/players/csv", headers=headers).status_code == 403
+
+    response = client.get(f"/export/match/{match_id}/players/csv", headers=admin_headers)
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    assert lines[0] == ",".join(export.PLAYER_HEADER)
+    assert len(lines) == 3
+
+
+def _stream_peak(match_id: int) -> tuple[int, int]:
+    # Pico de memória alocada enquanto o CSV é gerado e descartado bloco a bloco
+    stmt = export._match_players_query().where(Match.id == match_id).order_by(User.id)
+    tracemalloc.start()
+    try:
+        size = sum(len(chunk) for chunk in export._stream_csv(export.PLAYER_HEADER, stmt, export._player_row))
+        return size, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_csv_stream_memory_does_not_grow_with_rows(monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_YIELD_PER", 100)
+    monkeypatch.setattr(settings, "EXPORT_CHUNK_SIZE", 8192)
+    small, large = _match_with_players(500), _match_with_players(5000)
+    _stream_peak(small)  # aquece o cache de compilação do statement
+
+    small_bytes, small_peak = _stream_peak(small)
+    large_bytes, large_peak = _stream_peak(large)
+
+    assert large_bytes > 9 * small_bytes
+    assert large_peak < 2 * small_peak
+
+
+def test_link_tables_reject_since_id(client, make_user):
+    _, admin = make_user(admin=True)
+    for table in ("user_match", "user_championship"):
+        for background in ("false", "true"):
+            response = client.get(f"/export/bulk/{table}?since_id=1&background={background}", headers=admin)
+            assert response.status_code == 400
+            assert response.json()["detail"] == f"since_id is not supported for {table}, use updated_since"
+
+
+def _ndjson(response) -> list[dict]:
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_link_rows_added_to_an_old_match_reach_the_next_incremental_export(client, make_user):
+    _, admin = make_user(admin=True)
+    old_match, new_match = _match_with_players(2), _match_with_players(2)
+
+    response = client.get("/export/bulk/user_match", headers=admin)
+    assert "X-Export-Max-Id" not in response.headers
+    watermark = response.headers["X-Export-Watermark"]
+    assert {row["match_id"] for row in _ndjson(response)} >= {old_match, new_match}
+
+    # Elenco novo numa partida com match_id abaixo do maior já exportado
+    user, _ = make_user()
+    with SessionLocal() as db:
+        db.execute(insert(UserMatch).values(user_id=user.id, match_id=old_match, team_side="away"))
+        db.commit()
+
+    response = client.get("/export/bulk/user_match", params={"updated_since": watermark}, headers=admin)
+    assert [(row["match_id"], row["user_id"]) for row in _ndjson(response)] == [(old_match, user.id)]
+    assert response.headers["X-Export-Watermark"] > watermark
+
+
+def test_since_id_on_tables_with_increasing_ids(client, make_user):
+    _, admin = make_user(admin=True)
+    first = _match_with_players(1)
+    response = client.get("/export/bulk/matches", params={"since_id": first - 1}, headers=admin)
+    assert int(response.headers["X-Export-Max-Id"]) >= first
+    assert [row["id"] for row in _ndjson(response)][0] == first
+
+    second = _match_with_players(1)
+    response = client.get("/export/bulk/matches", params={"since_id": first}, headers=admin)
+    assert [row["id"] for row in _ndjson(response)] == [second]
+    assert response.headers["X-Export-Max-Id"] == str(second)
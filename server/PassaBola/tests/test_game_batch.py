@@ -0,0 +1,128 @@
+from sqlalchemy import event, update
+
+from crud import fixtures
+from db.database import SessionLocal, engine
+from models.match import Match
+
+
+def _state(client, headers, championship_id) -> dict:
+    # Tudo o que um lote pode alterar: jogos, classificação e ETag do campeonato
+    games = client.get(f"/championships/{championship_id}/games?page_size=100", headers=headers)
+    standings = client.get(f"/championships/{championship_id}/standings", headers=headers)
+    return {
+        "games": games.json()["items"],
+        "standings": standings.json()["items"],
+        "etag": client.get(f"/championships/{championship_id}", headers=headers).headers["ETag"],
+    }
+
+
+def _bulk(client, headers, items, atomic):
+    return client.post("/games/bulk/score", json={"items": items, "atomic": atomic}, headers=headers)
+
+
+def _score(game_id, home, away) -> dict:
+    return {"game_id": game_id, "home_score": home, "away_score": away}
+
+
+def test_atomic_batch_with_one_bad_item_changes_nothing(client, closed_championship):
+    championship_id, admin, games = closed_championship(fixtures.ROUND_ROBIN, 4)
+    before = _state(client, admin, championship_id)
+
+    response = _bulk(client, admin, [_score(games[(1, 0)], 2, 1), _score(999_999, 1, 0), _score(games[(1, 1)], 0, 0)], True)
+
+    assert response.status_code == 400
+    detail = response.json()["detail"]
+    assert detail["message"] == "No game was updated"
+    assert [(r["ok"], r["error"]) for r in detail["results"]] == [(True, None), (False, "Game not found"), (True, None)]
+    assert _state(client, admin, championship_id) == before
+
+
+def test_partial_batch_applies_the_good_items(client, closed_championship):
+    championship_id, admin, games = closed_championship(fixtures.ROUND_ROBIN, 4)
+    good, other = games[(1, 0)], games[(1, 1)]
+
+    response = _bulk(client, admin, [_score(good, 2, 1), _score(999_999, 1, 0), _score(good, 0, 0)], False)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["applied"], body["failed"]) == (1, 2)
+    assert [(r["game_id"], r["error"]) for r in body["results"]] == [
+        (good, None), (999_999, "Game not found"), (good, "Duplicate game in batch"),
+    ]
+    assert (body["results"][0]["game"]["home_score"], body["results"][0]["game"]["away_score"]) == (2, 1)
+    assert body["results"][0]["championship_completed"] is False
+
+    after = {g["id"]: g for g in _state(client, admin, championship_id)["games"]}
+    assert (after[good]["home_score"], after[good]["status"]) == (2, "finished")
+    assert after[other]["home_score"] is None
+    table = _state(client, admin, championship_id)["standings"]
+    assert sum(s["played"] for s in table) == 2
+    assert sum(s["points"] for s in table) == 3
+
+
+def test_validation_failures_are_reported_per_item(client, closed_championship):
+    championship_id, admin, games = closed_championship(fixtures.KNOCKOUT, 4)
+    semifinal, other, final = games[(1, 0)], games[(1, 1)], games[(2, 0)]
+    before = _state(client, admin, championship_id)
+
+    response = _bulk(client, admin, [
+        _score(semifinal, 1, 1),
+        _score(final, 1, 0),
+        _score(other, 2, 0),
+    ], True)
+
+    assert response.status_code == 400
+    results = response.json()["detail"]["results"]
+    assert [r["error"] for r in results] == [
+        "Knockout games cannot end in a draw", "Game teams are not defined yet", None,
+    ]
+    assert _state(client, admin, championship_id) == before
+
+    # Mudar o vencedor de um jogo cuja partida seguinte é encerrada no mesmo lote
+    assert _bulk(client, admin, [_score(semifinal, 1, 0), _score(other, 1, 0)], True).status_code == 200
+    response = _bulk(client, admin, [_score(semifinal, 0, 1), _score(final, 2, 1)], False)
+    body = response.json()
+    assert [r["error"] for r in body["results"]] == ["Next round game already completed", None]
+    assert body["results"][1]["championship_completed"] is True
+
+
+def test_knockout_batch_advances_winners(client, closed_championship):
+    championship_id, admin, games = closed_championship(fixtures.KNOCKOUT, 4)
+    semifinal, other, final = games[(1, 0)], games[(1, 1)], games[(2, 0)]
+
+    body = _bulk(client, admin, [_score(semifinal, 3, 0), _score(other, 0, 2)], True).json()
+
+    assert [r["advanced"] for r in body["results"]] == [True, True]
+    with SessionLocal() as db:
+        semi, second = (db.get(Match, i) for i in (semifinal, other))
+        winners = (semi.home_team, second.away_team)
+    game = client.get(f"/games/{final}", headers=admin).json()
+    assert (game["home_team_name"], game["away_team_name"]) == tuple(fixtures.team_name(t) for t in winners)
+
+
+def test_concurrent_write_turns_the_batch_into_a_conflict(client, closed_championship):
+    championship_id, admin, games = closed_championship(fixtures.ROUND_ROBIN, 4)
+    first, second = games[(1, 0)], games[(1, 1)]
+    written = []
+
+    def concurrent_score(conn, cursor, statement, *args):
+        # Entre a leitura do lote e o UPDATE em executemany, outra requisição grava um placar
+        if statement.startswith("UPDATE matches SET status") and not written:
+            written.append(True)
+            with SessionLocal() as db:
+                db.execute(update(Match).where(Match.id == second).values(score_home=5, score_away=5, status="finished"))
+                db.commit()
+
+    event.listen(engine, "before_cursor_execute", concurrent_score)
+    try:
+        response = _bulk(client, admin, [_score(first, 1, 0), _score(second, 2, 2)], False)
+    finally:
+        event.remove(engine, "before_cursor_execute", concurrent_score)
+
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Games were updated concurrently, try again"
+    with SessionLocal() as db:
+        assert (db.get(Match, first).score_home, db.get(Match, second).score_home) == (None, 5)
+    # Nada do lote entrou na classificação
+    table = client.get(f"/championships/{championship_id}/standings", headers=admin).json()["items"]
+    assert sum(s["played"] for s in table) == 0
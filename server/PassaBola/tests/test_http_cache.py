@@ -0,0 +1,168 @@
+import pytest
+
+# Leituras condicionais afetadas pelas escritas num campeonato (mesma championships.version)
+READS = ["/championships/{id}", "/championships/{id}/games"]
+# A listagem muda com as escritas nas linhas de championships (championships_list_version),
+# não com as dos jogos
+LIST = "/championships"
+
+
+@pytest.fixture
+def championship(client, make_user):
+    # Campeonato aberto com quatro inscritas; devolve ids e headers de admin e jogadoras
+    _, admin = make_user(admin=True)
+    response = client.post("/championships", json={"name": "ETag", "number_players": 1}, headers=admin)
+    assert response.status_code == 201
+    championship_id = response.json()["id"]
+    players = [make_user()[1] for _ in range(4)]
+    for headers in players:
+        assert client.post(f"/championships/{championship_id}/join", headers=headers).status_code == 200
+    return {"id": championship_id, "admin": admin, "players": players}
+
+
+@pytest.fixture
+def games(client, championship):
+    # O mesmo campeonato, fechado: a tabela de jogos já existe
+    response = client.post(f"/championships/{championship['id']}/close_signups", headers=championship["admin"])
+    assert response.status_code == 200
+    response = client.get(response.json()["games_url"], headers=championship["admin"])
+    return [g["id"] for g in response.json()["items"]]
+
+
+def _cached_etags(client, headers, championship_id, with_list: bool = True) -> dict:
+    # ETag atual de cada leitura, já confirmado com um 304
+    etags = {}
+    for path in READS + [LIST] if with_list else READS:
+        url = path.format(id=championship_id)
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+        assert client.get(url, headers={**headers, "If-None-Match": etag}).status_code == 304
+        etags[url] = etag
+    return etags
+
+
+def _assert_revalidated(client, headers, etags: dict) -> None:
+    for url, etag in etags.items():
+        response = client.get(url, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200, url
+        assert response.headers["ETag"] != etag, url
+
+
+def test_unchanged_championship_keeps_answering_304(client, championship):
+    headers = championship["admin"]
+    etags = _cached_etags(client, headers, championship["id"])
+    for url, etag in etags.items():
+        assert client.get(url, headers={**headers, "If-None-Match": etag}).status_code == 304
+
+
+def test_join_changes_etag(client, make_user, championship):
+    etags = _cached_etags(client, championship["admin"], championship["id"])
+    _, headers = make_user()
+
+    assert client.post(f"/championships/{championship['id']}/join", headers=headers).status_code == 200
+
+    _assert_revalidated(client, championship["admin"], etags)
+
+
+def test_leave_changes_etag(client, championship):
+    etags = _cached_etags(client, championship["admin"], championship["id"])
+
+    response = client.delete(f"/championships/{championship['id']}/join", headers=championship["players"][0])
+    assert response.status_code == 200
+
+    _assert_revalidated(client, championship["admin"], etags)
+
+
+def test_close_signups_changes_etag(client, championship):
+    etags = _cached_etags(client, championship["admin"], championship["id"])
+
+    response = client.post(f"/championships/{championship['id']}/close_signups", headers=championship["admin"])
+    assert response.status_code == 200
+
+    _assert_revalidated(client, championship["admin"], etags)
+
+
+GAME_WRITES = {
+    "score": lambda client, headers, game_id: client.patch(
+        f"/games/{game_id}/score", json={"home_score": 2, "away_score": 1}, headers=headers,
+    ),
+    "schedule": lambda client, headers, game_id: client.patch(
+        f"/games/{game_id}/schedule", json={"date": "2030-05-01T15:00:00Z", "location": "Campo 2"}, headers=headers,
+    ),
+    "bulk_score": lambda client, headers, game_id: client.post(
+        "/games/bulk/score", json={"items": [{"game_id": game_id, "home_score": 0, "away_score": 3}]}, headers=headers,
+    ),
+    "bulk_schedule": lambda client, headers, game_id: client.post(
+        "/games/bulk/schedule", json={"items": [{"game_id": game_id, "location": "Campo 3"}]}, headers=headers,
+    ),
+}
+
+
+@pytest.mark.parametrize("write", GAME_WRITES.values(), ids=GAME_WRITES.keys())
+def test_game_writes_change_etag(client, championship, games, write):
+    etags = _cached_etags(client, championship["admin"], championship["id"], with_list=False)
+    etags[f"/games/{games[0]}"] = client.get(f"/games/{games[0]}", headers=championship["admin"]).headers["ETag"]
+
+    response = write(client, championship["admin"], games[0])
+    assert response.status_code == 200
+    if "applied" in response.json():
+        assert response.json()["applied"] == 1
+
+    _assert_revalidated(client, championship["admin"], etags)
+
+
+def test_game_writes_keep_list_etag(client, championship, games):
+    headers = championship["admin"]
+    etag = client.get(LIST, headers=headers).headers["ETag"]
+
+    response = GAME_WRITES["score"](client, headers, games[0])
+    assert response.status_code == 200
+
+    assert client.get(LIST, headers={**headers, "If-None-Match": etag}).status_code == 304
+
+
+def test_create_changes_list_etag(client, championship):
+    headers = championship["admin"]
+    etag = client.get(LIST, headers=headers).headers["ETag"]
+
+    response = client.post("/championships", json={"name": "Outro", "number_players": 1}, headers=headers)
+    assert response.status_code == 201
+
+    _assert_revalidated(client, headers, {LIST: etag})
+
+
+@pytest.fixture
+def full_championship(client, make_user):
+    # Campeonato de uma vaga, ocupada, com uma jogadora na fila de espera
+    _, admin = make_user(admin=True)
+    response = client.post(
+        "/championships", json={"name": "Lotado", "number_players": 1, "max_participants": 1}, headers=admin,
+    )
+    championship_id = response.json()["id"]
+    _, member = make_user()
+    _, waiting = make_user()
+    assert client.post(f"/championships/{championship_id}/join", headers=member).status_code == 200
+    response = client.post(f"/championships/{championship_id}/join", params={"waitlist": "true"}, headers=waiting)
+    assert response.status_code == 202
+    return {"id": championship_id, "admin": admin, "waiting": waiting}
+
+
+def test_waitlist_join_changes_etag(client, make_user, full_championship):
+    etags = _cached_etags(client, full_championship["admin"], full_championship["id"])
+    _, headers = make_user()
+
+    response = client.post(f"/championships/{full_championship['id']}/join", params={"waitlist": "true"}, headers=headers)
+    assert response.status_code == 202
+
+    _assert_revalidated(client, full_championship["admin"], etags)
+
+
+def test_waitlist_leave_changes_etag(client, full_championship):
+    etags = _cached_etags(client, full_championship["admin"], full_championship["id"])
+
+    response = client.delete(f"/championships/{full_championship['id']}/join", headers=full_championship["waiting"])
+    assert response.status_code == 200
+    assert response.json()["promoted_user_id"] is None
+
+    _assert_revalidated(client, full_championship["admin"], etags)
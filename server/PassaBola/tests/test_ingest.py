@@ -0,0 +1,159 @@
+import itertools
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from core import ingest
+from core.config import settings
+from core.security import password_hasher
+from crud import ingest as ingest_crud
+from db.database import SessionLocal
+from models.user import User
+from routers import ingest as ingest_router
+
+_signups = itertools.count(1)
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    # Fila própria do teste, com o worker parado: os lotes são processados com process_pending
+    queue = ingest.IngestQueue(str(tmp_path / "ingest.db"))
+    worker = ingest.IngestWorker(queue)
+    worker._processors = ingest_crud.PROCESSORS
+    monkeypatch.setattr(settings, "INGEST_ENABLED", True)
+    monkeypatch.setattr(ingest, "ingest_queue", queue)
+    monkeypatch.setattr(ingest, "ingest_worker", worker)
+    monkeypatch.setattr(password_hasher, "hash_many", lambda passwords: ["hash-de-teste"] * len(passwords))
+    return queue
+
+
+def process_pending(queue) -> None:
+    ingest.ingest_worker._process(queue.claim(settings.INGEST_BATCH_SIZE))
+
+
+@pytest.fixture
+def requests_client():
+    # /requests só é montada em main.py com INGEST_ENABLED na importação
+    app = FastAPI()
+    app.include_router(ingest_router.router)
+    with TestClient(app) as c:
+        yield c
+
+
+def _signup_body() -> dict:
+    n = next(_signups)
+    return {"name": "Fila", "email": f"fila{n}@teste.com", "password": "senha123",
+            "phone_number": f"117{n:08d}", "document": f"fila-{n}"}
+
+
+def _users(email: str) -> int:
+    with SessionLocal() as db:
+        return db.execute(select(func.count()).select_from(User).where(User.email == email)).scalar_one()
+
+
+def test_repeated_idempotency_key_returns_the_original_request(client, queue, requests_client):
+    body = _signup_body()
+    headers = {"Idempotency-Key": "cadastro-1"}
+
+    first = client.post("/auth/signup", json=body, headers=headers)
+    again = client.post("/auth/signup", json=body, headers=headers)
+    assert (first.status_code, again.status_code) == (202, 202)
+    assert again.json()["id"] == first.json()["id"]
+    assert again.headers["Location"] == f"/requests/{first.json()['id']}"
+    assert queue.pending() == 1
+
+    process_pending(queue)
+    retried = client.post("/auth/signup", json=body, headers=headers)
+    process_pending(queue)
+
+    assert retried.status_code == 200
+    assert retried.json()["id"] == first.json()["id"]
+    assert retried.json()["status"] == ingest.DONE
+    assert retried.json()["status_code"] == 201
+    assert queue.pending() == 0
+    assert _users(body["email"]) == 1
+
+    status = requests_client.get(f"/requests/{first.json()['id']}").json()
+    assert status == retried.json()
+    with SessionLocal() as db:
+        user_id = db.execute(select(User.id).where(User.email == body["email"])).scalar_one()
+    # Público para quem tem o id: só o id da usuária, sem e-mail, telefone ou documento
+    assert status["result"] == {"id": user_id}
+
+
+def test_same_key_with_another_body_is_rejected(client, queue):
+    body = _signup_body()
+    headers = {"Idempotency-Key": "cadastro-2"}
+    assert client.post("/auth/signup", json=body, headers=headers).status_code == 202
+
+    response = client.post("/auth/signup", json={**body, "name": "Outra"}, headers=headers)
+
+    assert response.status_code == 422
+    assert queue.pending() == 1
+
+
+def test_reprocessed_batch_does_not_create_a_second_user(client, queue):
+    # Queda entre o commit no banco e o complete(): o mesmo lote é processado de novo
+    body = _signup_body()
+    items = [("pedido-1", body)]
+
+    first = ingest_crud.process_signups(items)
+    second = ingest_crud.process_signups(items)
+
+    assert first["pedido-1"][0] == 201
+    assert second["pedido-1"] == ingest_crud.EMAIL_TAKEN
+    assert _users(body["email"]) == 1
+
+
+def test_signup_batch_falls_back_to_one_insert_per_item(client, queue, monkeypatch):
+    a, b, c = _signup_body(), _signup_body(), _signup_body()
+    duplicate = {**_signup_body(), "email": a["email"]}
+
+    def hash_many(passwords):
+        # Um cadastro síncrono grava o e-mail de b depois da verificação do lote
+        with SessionLocal() as db:
+            db.add(User(name="Síncrona", email=b["email"], password_hash="x"))
+            db.commit()
+        return ["hash-de-teste"] * len(passwords)
+
+    monkeypatch.setattr(password_hasher, "hash_many", hash_many)
+    results = ingest_crud.process_signups([("a", a), ("b", b), ("c", c), ("dup", duplicate)])
+
+    assert results["a"][0] == 201
+    assert results["b"] == ingest_crud.UNIQUE_TAKEN
+    assert results["c"][0] == 201
+    assert results["dup"] == ingest_crud.EMAIL_TAKEN
+    assert (_users(a["email"]), _users(b["email"]), _users(c["email"])) == (1, 1, 1)
+    with SessionLocal() as db:
+        ids = dict(db.execute(select(User.email, User.id).where(User.email.in_([a["email"], c["email"]]))).all())
+    assert results["a"][1] == {"id": ids[a["email"]]}
+    assert results["c"][1] == {"id": ids[c["email"]]}
+
+
+def test_join_batch_refusals_only_affect_their_item(client, make_user, queue):
+    _, admin = make_user(admin=True)
+    response = client.post(
+        "/championships", json={"name": "Fila", "number_players": 1, "max_participants": 1}, headers=admin,
+    )
+    championship_id = response.json()["id"]
+    first, second, third = (make_user()[0] for _ in range(3))
+
+    results = ingest_crud.process_joins([
+        ("1", {"championship_id": championship_id, "user_id": first.id, "waitlist": False}),
+        ("2", {"championship_id": championship_id, "user_id": second.id, "waitlist": False}),
+        ("3", {"championship_id": championship_id, "user_id": third.id, "waitlist": True}),
+        ("4", {"championship_id": championship_id, "user_id": first.id, "waitlist": False}),
+        ("5", {"championship_id": 999_999, "user_id": second.id, "waitlist": False}),
+    ])
+
+    assert results["1"][0] == 200
+    assert results["1"][1]["participants_count"] == 1
+    assert results["2"] == (409, {"detail": "Championship is full"})
+    assert results["3"][0] == 202
+    assert results["3"][1]["waitlist_position"] == 1
+    assert results["4"] == (409, {"detail": "Already joined"})
+    assert results["5"] == (404, {"detail": "Championship not found"})
+    detail = client.get(f"/championships/{championship_id}", headers=admin).json()
+    assert detail["participants_count"] == 1
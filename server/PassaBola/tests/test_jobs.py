@@ -0,0 +1,290 @@
+import json
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import event, func, select, update
+
+from core import jobs
+from core.config import settings
+from db.database import SessionLocal, engine, utcnow
+from models.championship import Championship
+from models.job import Job
+from models.match import Match
+
+
+@pytest.fixture
+def handlers(monkeypatch):
+    # Só os tipos registrados aqui são retirados da fila pelos runners do teste; cada teste usa
+    # um tipo próprio, para não retirar jobs deixados na fila por outro
+    registered = {}
+    monkeypatch.setattr(jobs, "_handlers", registered)
+    return registered
+
+
+def _submit(kind: str, params: dict = None) -> int:
+    with SessionLocal() as db:
+        return jobs.submit(db, kind, params or {}).id
+
+
+def _job(job_id: int) -> Job:
+    with SessionLocal() as db:
+        job = db.get(Job, job_id)
+        db.expunge(job)
+        return job
+
+
+def _claim_and_run(runner: jobs.JobRunner) -> jobs.JobContext:
+    # O que o despachante faz a cada job, sem a thread
+    ctx = runner._claim()
+    assert ctx is not None
+    runner._running[ctx.job_id] = ctx
+    runner._run(ctx)
+    return ctx
+
+
+def test_claim_skips_a_job_taken_by_another_worker(handlers):
+    handlers["teste.claim"] = lambda ctx: None
+    first, second = _submit("teste.claim"), _submit("teste.claim")
+    runner, other = jobs.JobRunner(), jobs.JobRunner()
+    stolen = []
+
+    def steal(conn, cursor, statement, *args):
+        # Entre o SELECT e o UPDATE condicional deste runner, outro processo leva o job
+        if statement.startswith("UPDATE jobs") and not stolen:
+            stolen.append(None)
+            stolen[0] = other._claim()
+
+    event.listen(engine, "before_cursor_execute", steal)
+    try:
+        ctx = runner._claim()
+    finally:
+        event.remove(engine, "before_cursor_execute", steal)
+
+    assert stolen[0].job_id == first
+    assert ctx.job_id == second
+    assert (ctx.attempt, stolen[0].attempt) == (1, 1)
+    assert (_job(first).status, _job(second).status) == (jobs.RUNNING, jobs.RUNNING)
+    assert runner._claim() is None
+
+
+def test_failures_retry_with_exponential_backoff(handlers):
+    calls = []
+
+    def flaky(ctx):
+        calls.append(ctx.attempt)
+        raise RuntimeError(f"falha {ctx.attempt}")
+
+    handlers["teste.retry"] = flaky
+    job_id = _submit("teste.retry")
+    runner = jobs.JobRunner()
+    assert _job(job_id).max_attempts == settings.JOBS_MAX_ATTEMPTS == 3
+
+    for attempt in (1, 2):
+        before = utcnow()
+        _claim_and_run(runner)
+        job = _job(job_id)
+        assert (job.status, job.attempts, job.error) == (jobs.QUEUED, attempt, f"RuntimeError: falha {attempt}")
+        wait = timedelta(seconds=2 ** attempt)
+        assert before + wait <= job.run_after <= utcnow() + wait
+        # Antes de run_after o job não é retirado
+        assert runner._claim() is None
+        with SessionLocal() as db:
+            db.execute(update(Job).where(Job.id == job_id).values(run_after=utcnow()))
+            db.commit()
+
+    _claim_and_run(runner)
+    job = _job(job_id)
+    assert (job.status, job.attempts, job.error) == (jobs.FAILED, 3, "RuntimeError: falha 3")
+    assert job.finished_at is not None
+    assert calls == [1, 2, 3]
+    assert runner.stats()["retried"] == 2
+    assert runner.stats()[jobs.FAILED] == 1
+    assert runner._running == {}
+
+
+def test_job_error_fails_without_retry(handlers):
+    def invalid(ctx):
+        raise jobs.JobError("Entrada inválida")
+
+    handlers["teste.error"] = invalid
+    job_id = _submit("teste.error")
+    _claim_and_run(jobs.JobRunner())
+    job = _job(job_id)
+    assert (job.status, job.attempts, job.error) == (jobs.FAILED, 1, "Entrada inválida")
+
+
+def test_success_records_result_and_progress(handlers):
+    def counted(ctx):
+        ctx.progress(1, 4, "meio")
+        return {"ok": True}
+
+    handlers["teste.ok"] = counted
+    job_id = _submit("teste.ok")
+    _claim_and_run(jobs.JobRunner())
+    job = _job(job_id)
+    assert (job.status, job.result, job.progress, job.total, job.message) == (jobs.SUCCEEDED, {"ok": True}, 4, 4, "meio")
+
+
+def _running_job(attempts: int, heartbeat_age: float) -> int:
+    with SessionLocal() as db:
+        job = Job(kind="teste.lease", status=jobs.RUNNING, params={}, attempts=attempts, max_attempts=2,
+                  started_at=utcnow(), heartbeat_at=utcnow() - timedelta(seconds=heartbeat_age))
+        db.add(job)
+        db.commit()
+        return job.id
+
+
+def test_maintain_requeues_or_fails_expired_leases(handlers):
+    lease = settings.JOBS_LEASE_SECONDS
+    requeued = _running_job(attempts=1, heartbeat_age=lease + 5)
+    exhausted = _running_job(attempts=2, heartbeat_age=lease + 5)
+    alive = _running_job(attempts=1, heartbeat_age=1)
+    local = _running_job(attempts=1, heartbeat_age=lease + 5)
+    runner = jobs.JobRunner()
+    # Job deste processo: o heartbeat só está atrasado, o worker não caiu
+    runner._running[local] = jobs.JobContext(local, "teste.lease", {}, 1, 2)
+
+    runner._maintain()
+
+    assert (_job(requeued).status, _job(requeued).error) == (jobs.QUEUED, "Worker stopped responding")
+    assert (_job(exhausted).status, _job(exhausted).error) == (jobs.FAILED, "Worker stopped responding")
+    assert _job(exhausted).finished_at is not None
+    assert _job(alive).status == jobs.RUNNING
+    assert _job(local).status == jobs.RUNNING
+
+
+def test_maintain_deletes_expired_jobs_and_files(handlers):
+    with SessionLocal() as db:
+        old = Job(kind="teste.retention", status=jobs.SUCCEEDED, params={},
+                  finished_at=utcnow() - timedelta(seconds=settings.JOBS_RETENTION_SECONDS + 60))
+        db.add(old)
+        db.commit()
+        job_id = old.id
+    path = jobs.JobContext(job_id, "teste.retention", {}, 1, 1).output_path("ndjson")
+    path.write_text("{}\n")
+
+    jobs.JobRunner()._maintain()
+
+    with SessionLocal() as db:
+        assert db.get(Job, job_id) is None
+    assert not path.exists()
+
+
+def test_stop_requeues_interrupted_job_without_spending_an_attempt(handlers):
+    def interrupted(ctx):
+        ctx.interrupted = True
+        ctx.check()
+
+    handlers["teste.stop"] = interrupted
+    job_id = _submit("teste.stop")
+    _claim_and_run(jobs.JobRunner())
+    job = _job(job_id)
+    assert (job.status, job.attempts) == (jobs.QUEUED, 0)
+
+
+@pytest.fixture
+def open_championship(client, make_user):
+    _, admin = make_user(admin=True)
+    championship_id = client.post("/championships", json={"name": "Job", "number_players": 1}, headers=admin).json()["id"]
+    for _ in range(4):
+        assert client.post(f"/championships/{championship_id}/join", headers=make_user()[1]).status_code == 200
+    return championship_id, admin
+
+
+def _games(championship_id: int) -> int:
+    with SessionLocal() as db:
+        return db.execute(
+            select(func.count()).select_from(Match).where(Match.championship_id == championship_id)
+        ).scalar_one()
+
+
+def _is_closed(championship_id: int) -> bool:
+    with SessionLocal() as db:
+        return bool(db.execute(select(Championship.is_closed).where(Championship.id == championship_id)).scalar_one())
+
+
+def test_cancel_running_close_signups_rolls_back(client, handlers, open_championship, monkeypatch):
+    from routers import championship as championship_router
+
+    close_job = championship_router._close_signups_job
+    handlers["close_signups"] = close_job
+    championship_id, admin = open_championship
+    response = client.post(f"/championships/{championship_id}/close_signups?background=true", headers=admin)
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    assert response.headers["Location"] == f"/jobs/{job_id}"
+
+    runner = jobs.job_runner
+    ctx = runner._claim()
+    runner._running[ctx.job_id] = ctx
+    record_new_matches = championship_router.stats_crud.record_new_matches
+
+    def cancel_after_insert(db, created):
+        # O pedido de cancelamento chega depois que a tabela foi inserida, antes do commit
+        record_new_matches(db, created)
+        assert len(created) > 0
+        runner.request_cancel(ctx.job_id)
+
+    monkeypatch.setattr(championship_router.stats_crud, "record_new_matches", cancel_after_insert)
+    runner._run(ctx)
+
+    job = client.get(f"/jobs/{job_id}", headers=admin).json()
+    assert job["status"] == jobs.CANCELLED
+    assert job["message"] == "6 jogos gerados"
+    assert not _is_closed(championship_id)
+    assert _games(championship_id) == 0
+
+    # Nova tentativa, sem cancelamento: fecha e gera os jogos
+    monkeypatch.setattr(championship_router.stats_crud, "record_new_matches", record_new_matches)
+    assert client.post(f"/jobs/{job_id}/retry", headers=admin).status_code == 202
+    _claim_and_run(runner)
+    job = client.get(f"/jobs/{job_id}", headers=admin).json()
+    assert job["status"] == jobs.SUCCEEDED
+    assert job["result"]["created_games"] == _games(championship_id) == 6
+    assert _is_closed(championship_id)
+    assert client.post(f"/jobs/{job_id}/cancel", headers=admin).status_code == 409
+
+
+def test_cancel_route_stops_running_job_at_next_checkpoint(client, make_user, handlers):
+    _, admin = make_user(admin=True)
+    handlers["teste.cancel"] = lambda ctx: ctx.progress(1, 2)
+    job_id = _submit("teste.cancel")
+    runner = jobs.job_runner
+    ctx = runner._claim()
+    runner._running[ctx.job_id] = ctx
+
+    response = client.post(f"/jobs/{job_id}/cancel", headers=admin)
+    assert response.status_code == 200
+    assert ctx.cancel_requested
+    runner._run(ctx)
+
+    assert _job(job_id).status == jobs.CANCELLED
+
+    # Na fila, o cancelamento é imediato
+    queued = _submit("teste.cancel")
+    assert client.post(f"/jobs/{queued}/cancel", headers=admin).json()["status"] == jobs.CANCELLED
+    assert runner._claim() is None
+
+
+def test_download_export_job_output(client, make_user, handlers):
+    from routers import export
+
+    handlers["export_bulk"] = export._export_bulk_job
+    _, admin = make_user(admin=True)
+    response = client.get("/export/bulk/championships?background=true", headers=admin)
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    assert client.get(f"/jobs/{job_id}/download", headers=admin).status_code == 404
+
+    _claim_and_run(jobs.job_runner)
+
+    job = client.get(f"/jobs/{job_id}", headers=admin).json()
+    assert job["status"] == jobs.SUCCEEDED
+    response = client.get(f"/jobs/{job_id}/download", headers=admin)
+    assert response.status_code == 200
+    assert response.headers["content-disposition"] == 'attachment; filename="championships.ndjson"'
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == job["result"]["rows"]
+    with SessionLocal() as db:
+        assert len(rows) == db.execute(select(func.count()).select_from(Championship)).scalar_one()
+    assert client.get(f"/jobs/{job_id}/download", headers=make_user()[1]).status_code == 403
@@ -0,0 +1,96 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import InvalidRequestError
+
+from db import loading
+from db.database import SessionLocal
+from models.championship import Championship
+from models.match import Match
+from models.user import User
+from models.user_championship import UserChampionship
+from models.user_match import UserMatch
+
+
+@pytest.fixture
+def game(make_user):
+    players = [make_user()[0] for _ in range(3)]
+    with SessionLocal() as db:
+        championship = Championship(name="Perfis", number_players=1, is_closed=False, participants_count=len(players))
+        db.add(championship)
+        db.flush()
+        match = Match(championship_id=championship.id, round=1, slot=0, home_team=1, away_team=2, location="Campo")
+        db.add(match)
+        db.flush()
+        for i, player in enumerate(players):
+            db.add(UserChampionship(user_id=player.id, championship_id=championship.id, team=i + 1))
+            db.add(UserMatch(user_id=player.id, match_id=match.id, team_side="home" if i % 2 else "away"))
+        db.commit()
+        return {"championship_id": championship.id, "match_id": match.id, "user_id": players[0].id, "players": len(players)}
+
+
+def _match_card(m):
+    return (m.id, m.championship_id, m.round, m.slot, m.home_team, m.away_team, m.scheduled_at, m.location,
+            m.status, m.score_home, m.score_away)
+
+
+def _championship_state(c):
+    return (c.id, c.name, c.number_players, c.is_closed)
+
+
+# Perfil, entidade, o que a rota lê da entidade carregada e quantos statements o perfil custa
+PROFILES = [
+    ("MATCH_CARD", Match, "match_id", _match_card, 1),
+    ("MATCH_WITH_CHAMPIONSHIP", Match, "match_id", lambda m: (_match_card(m), m.championship.id, m.championship.name), 1),
+    (
+        "MATCH_WITH_PLAYERS",
+        Match,
+        "match_id",
+        lambda m: (_match_card(m), [(link.team_side, link.user.email) for link in m.participants]),
+        2,
+    ),
+    ("CHAMPIONSHIP_STATE", Championship, "championship_id", _championship_state, 1),
+    (
+        "CHAMPIONSHIP_WITH_PARTICIPANTS",
+        Championship,
+        "championship_id",
+        lambda c: (_championship_state(c), [link.user_id for link in c.user_championship_links]),
+        2,
+    ),
+    (
+        "USER_ACCOUNT",
+        User,
+        "user_id",
+        lambda u: (u.id, u.name, u.email, u.phone_number, u.document, u.birth_date, u.admin, u.position),
+        1,
+    ),
+]
+
+
+@pytest.mark.parametrize("profile, model, key, read, expected", PROFILES, ids=[p[0] for p in PROFILES])
+def test_profile_loads_what_the_route_reads(game, count_statements, profile, model, key, read, expected):
+    with SessionLocal() as db:
+        with count_statements() as statements:
+            entity = db.execute(
+                select(model).options(*getattr(loading, profile)).where(model.id == game[key])
+            ).unique().scalar_one()
+            values = read(entity)
+        assert statements.count == expected, statements.statements
+    assert values is not None
+    if profile == "MATCH_WITH_PLAYERS":
+        assert len(values[1]) == game["players"]
+    if profile == "CHAMPIONSHIP_WITH_PARTICIPANTS":
+        assert len(values[1]) == game["players"]
+
+
+@pytest.mark.parametrize("model, key, relationship", [
+    (Match, "match_id", "participants"),
+    (Match, "match_id", "championship"),
+    (Championship, "championship_id", "user_championship_links"),
+    (Championship, "championship_id", "matches"),
+])
+def test_relationships_outside_a_profile_raise(game, model, key, relationship):
+    # lazy='raise': um relacionamento fora do perfil falha em vez de virar uma consulta por linha
+    with SessionLocal() as db:
+        entity = db.get(model, game[key])
+        with pytest.raises(InvalidRequestError):
+            getattr(entity, relationship)
@@ -0,0 +1,71 @@
+from datetime import datetime
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect, select, text
+
+from crud import match as match_crud
+from db import database
+from models.match import Match
+from models.user_championship import UserChampionship
+from models.user_match import UserMatch
+
+# Consultas quentes e o índice que cada uma deve usar (migração 0003 e seguintes)
+INDEXED_QUERIES = [
+    (
+        "jogos de um campeonato",
+        match_crud.page_query(match_crud.championship_games_query(1), 1, 20),
+        "ix_matches_championship_id_scheduled_at",
+    ),
+    (
+        "jogos encerrados numa janela",
+        select(Match.id).where(Match.status == "finished", Match.scheduled_at >= datetime(2026, 1, 1)),
+        "ix_matches_status_scheduled_at",
+    ),
+    (
+        "elenco de um jogo",
+        select(UserMatch.user_id).where(UserMatch.match_id == 1),
+        "ix_user_match_match_id",
+    ),
+    (
+        "inscritas de um campeonato",
+        select(UserChampionship.user_id, UserChampionship.team).where(UserChampionship.championship_id == 1),
+        "ix_user_championship_championship_id_team",
+    ),
+    (
+        "jogos de uma usuária",
+        match_crud.user_games_query(1, ["scheduled", "finished"]),
+        "sqlite_autoindex_user_match_1",
+    ),
+]
+
+
+# EXPLAIN QUERY PLAN é do SQLite; no PostgreSQL o plano depende das estatísticas das tabelas
+@pytest.mark.skipif(database.engine.dialect.name != "sqlite", reason="plano de consulta do SQLite")
+@pytest.mark.parametrize("stmt, index", [q[1:] for q in INDEXED_QUERIES], ids=[q[0] for q in INDEXED_QUERIES])
+def test_hot_queries_use_indexes(stmt, index):
+    with database.engine.connect() as conn:
+        compiled = stmt.compile(conn, compile_kwargs={"literal_binds": True})
+        plan = "\n".join(row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}")))
+    assert index in plan, plan
+
+
+def test_pre_alembic_database_is_stamped(tmp_path, monkeypatch):
+    # Banco criado por create_tables(): o esquema da 0001 sem a tabela alembic_version
+    engine = create_engine(f"sqlite:///{tmp_path}/legacy.db")
+    config = Config(str(database.Path(database.__file__).resolve().parent.parent / "alembic.ini"))
+    config.attributes["configure_logger"] = False
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, "0001")
+        connection.execute(text("DROP TABLE alembic_version"))
+
+    monkeypatch.setattr(database, "engine", engine)
+    database.run_migrations()
+
+    with engine.connect() as conn:
+        head = ScriptDirectory.from_config(config).get_current_head()
+        assert conn.execute(text("SELECT version_num FROM alembic_version")).scalar_one() == head
+        assert "jobs" in inspect(conn).get_table_names()
@@ -0,0 +1,159 @@
+import pytest
+from sqlalchemy import select
+
+from crud import fixtures, standings
+from db.database import SessionLocal
+from models.match import Match
+from models.user_championship import UserChampionship
+from models.user_match import UserMatch
+
+
+def _table(client, headers, championship_id) -> dict:
+    response = client.get(f"/championships/{championship_id}/standings", headers=headers)
+    assert response.status_code == 200
+    return {s["team"]: {k: v for k, v in s.items() if k != "position"} for s in response.json()["items"]}
+
+
+def _score(client, headers, game_id, home, away):
+    return client.patch(f"/games/{game_id}/score", json={"home_score": home, "away_score": away}, headers=headers)
+
+
+def _teams(game_id) -> tuple:
+    with SessionLocal() as db:
+        return db.execute(select(Match.home_team, Match.away_team).where(Match.id == game_id)).one()
+
+
+def test_first_score_updates_both_teams(client, closed_championship):
+    championship_id, admin, games = closed_championship(fixtures.ROUND_ROBIN, 4)
+    game_id = games[(1, 0)]
+    home, away = _teams(game_id)
+
+    assert _score(client, admin, game_id, 2, 1).status_code == 200
+
+    table = _table(client, admin, championship_id)
+    assert table[home] == {
+        "team": home, "team_name": f"Time {home}", "played": 1, "won": 1, "drawn": 0, "lost": 0,
+        "goals_for": 2, "goals_against": 1, "goal_difference": 1, "points": 3,
+    }
+    assert (table[away]["lost"], table[away]["goals_for"], table[away]["goals_against"], table[away]["points"]) == (1, 1, 2, 0)
+    others = [t for t in table if t not in (home, away)]
+    assert all(table[t]["played"] == 0 and table[t]["points"] == 0 for t in others)
+
+
+def test_correction_replaces_the_previous_score(client, closed_championship):
+    championship_id, admin, games = closed_championship(fixtures.ROUND_ROBIN, 4)
+    game_id = games[(1, 0)]
+    assert _score(client, admin, game_id, 2, 1).status_code == 200
+    after_first = _table(client, admin, championship_id)
+
+    # Correção para empate e volta ao placar original: o saldo das duas correções é zero
+    assert _score(client, admin, game_id, 0, 0).status_code == 200
+    drawn = _table(client, admin, championship_id)
+    home, away = _teams(game_id)
+    for team in (home, away):
+        assert (drawn[team]["played"], drawn[team]["drawn"], drawn[team]["points"]) == (1, 1, 1)
+        assert drawn[team]["won"] == drawn[team]["lost"] == 0
+
+    assert _score(client, admin, game_id, 2, 1).status_code == 200
+    assert _table(client, admin, championship_id) == after_first
+
+    # Repetir o mesmo placar não soma o jogo de novo
+    assert _score(client, admin, game_id, 2, 1).status_code == 200
+    assert _table(client, admin, championship_id) == after_first
+
+
+def test_apply_scores_sums_each_team_once(client, closed_championship):
+    championship_id, admin, games = closed_championship(fixtures.ROUND_ROBIN, 3)
+    with SessionLocal() as db:
+        standings.apply_scores(db, [
+            (championship_id, 1, 2, (3, 0), None),
+            (championship_id, 1, 3, (1, 1), None),
+            (championship_id, 1, 3, (0, 2), (1, 1)),
+        ])
+        db.commit()
+    standings.invalidate_standings(championship_id)
+
+    table = _table(client, admin, championship_id)
+    assert [table[1][k] for k in ("played", "won", "drawn", "lost", "goals_for", "goals_against", "points")] == [2, 1, 0, 1, 3, 2, 3]
+    assert [table[3][k] for k in ("played", "won", "drawn", "lost", "goals_for", "goals_against", "points")] == [1, 1, 0, 0, 2, 0, 3]
+
+
+def _roster(game_id, side) -> set:
+    with SessionLocal() as db:
+        return set(db.execute(
+            select(UserMatch.user_id).where(UserMatch.match_id == game_id, UserMatch.team_side == side)
+        ).scalars())
+
+
+def _team_roster(championship_id, team) -> set:
+    with SessionLocal() as db:
+        return set(db.execute(
+            select(UserChampionship.user_id)
+            .where(UserChampionship.championship_id == championship_id, UserChampionship.team == team)
+        ).scalars())
+
+
+def test_knockout_correction_moves_the_winner_until_the_next_game_is_played(client, closed_championship):
+    championship_id, admin, games = closed_championship(fixtures.KNOCKOUT, 4)
+    semifinal, other, final = games[(1, 0)], games[(1, 1)], games[(2, 0)]
+    home, away = _teams(semifinal)
+
+    response = _score(client, admin, semifinal, 2, 0)
+    assert response.status_code == 200
+    assert response.json()["advanced"] is True
+    assert _teams(final)[0] == home
+    assert _roster(final, "home") == _team_roster(championship_id, home)
+
+    # Correção com outro vencedor antes da final: troca o time e o elenco do jogo seguinte
+    assert _score(client, admin, semifinal, 0, 1).status_code == 200
+    assert _teams(final)[0] == away
+    assert _roster(final, "home") == _team_roster(championship_id, away)
+
+    assert _score(client, admin, other, 3, 1).status_code == 200
+    assert _score(client, admin, final, 1, 0).status_code == 200
+    before = _table(client, admin, championship_id)
+
+    # Com a final encerrada, mudar o vencedor da semifinal é conflito e nada é gravado
+    response = _score(client, admin, semifinal, 4, 0)
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Next round game already completed"
+    assert _table(client, admin, championship_id) == before
+    assert _teams(final)[0] == away
+    game = client.get(f"/games/{semifinal}", headers=admin).json()
+    assert (game["home_score"], game["away_score"]) == (0, 1)
+
+    # Corrigir o placar sem mudar o vencedor continua permitido
+    assert _score(client, admin, semifinal, 0, 3).status_code == 200
+    assert _teams(final)[0] == away
+
+
+def test_advance_winner_raises_fixture_conflict(client, closed_championship):
+    championship_id, admin, games = closed_championship(fixtures.KNOCKOUT, 4)
+    semifinal, other, final = games[(1, 0)], games[(1, 1)], games[(2, 0)]
+    for game_id, score in ((semifinal, (1, 0)), (other, (1, 0)), (final, (2, 1))):
+        assert _score(client, admin, game_id, *score).status_code == 200
+    _, away = _teams(semifinal)
+
+    with SessionLocal() as db:
+        match = db.get(Match, semifinal)
+        with pytest.raises(fixtures.FixtureConflict):
+            fixtures.advance_winner(db, match, away)
+        # O vencedor já na final não é conflito; a final não tem jogo seguinte
+        assert fixtures.advance_winner(db, match, _teams(semifinal)[0]) is True
+        assert fixtures.advance_winner(db, db.get(Match, final), 1) is False
+
+
+def test_recompute_matches_incremental_standings(client, closed_championship):
+    championship_id, admin, games = closed_championship(fixtures.ROUND_ROBIN, 5)
+    for i, game_id in enumerate(sorted(games.values())):
+        assert _score(client, admin, game_id, i % 3, (i * 2) % 4).status_code == 200
+    # Algumas correções, inclusive de vitória para empate e de empate para derrota
+    for i, game_id in enumerate(sorted(games.values())[::3]):
+        assert _score(client, admin, game_id, (i + 1) % 2, 1).status_code == 200
+    incremental = _table(client, admin, championship_id)
+    assert sum(t["played"] for t in incremental.values()) == 2 * len(games)
+
+    response = client.post(f"/championships/recompute_standings?championship_id={championship_id}", headers=admin)
+    assert response.json() == {"updated": 1}
+
+    assert _table(client, admin, championship_id) == incremental
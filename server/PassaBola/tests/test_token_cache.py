@@ -0,0 +1,63 @@
+import time
+from datetime import timedelta
+
+import pytest
+from jose import JWTError
+
+from core import security
+
+
+@pytest.fixture
+def decodes(monkeypatch):
+    # Conta as verificações HMAC de fato executadas
+    calls = []
+    original = security.decode_access_token
+
+    def counting(token):
+        calls.append(token)
+        return original(token)
+
+    monkeypatch.setattr(security, "decode_access_token", counting)
+    return calls
+
+
+def test_repeated_token_is_verified_once(decodes):
+    token = security.create_access_token("cache@teste.com")
+    hits = security.verified_token_cache.hits
+
+    first = security.decode_access_token_cached(token)
+    second = security.decode_access_token_cached(token)
+
+    assert first == second
+    assert first["sub"] == "cache@teste.com"
+    assert len(decodes) == 1
+    assert security.verified_token_cache.hits == hits + 1
+
+
+def test_cached_token_expires_with_its_exp(decodes):
+    token = security.create_access_token("expira@teste.com", expires_delta=timedelta(seconds=1))
+    security.decode_access_token_cached(token)
+    # O jose aceita o token até o segundo do exp (inclusive)
+    time.sleep(2.1)
+    # A entrada vale só até o exp: o token volta a ser verificado e é recusado
+    with pytest.raises(JWTError):
+        security.decode_access_token_cached(token)
+    assert len(decodes) == 2
+
+
+def test_expired_token_is_rejected_after_a_cached_request(client, make_user):
+    user, _ = make_user()
+    token = security.create_access_token(user.email, expires_delta=timedelta(seconds=1))
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/championships", headers=headers).status_code == 200
+    time.sleep(2.1)
+    assert client.get("/championships", headers=headers).status_code == 401
+
+
+def test_tampered_token_is_not_served_from_cache(decodes):
+    token = security.create_access_token("assinatura@teste.com")
+    security.decode_access_token_cached(token)
+    header, payload, signature = token.split(".")
+    tampered = ".".join((header, payload, signature[:-2] + ("AA" if signature[-2:] != "AA" else "BB")))
+    with pytest.raises(JWTError):
+        security.decode_access_token_cached(tampered)